@@ -0,0 +1,34 @@
+"""add_game_state_version
+
+Revision ID: 8a9b0c1d2e3f
+Revises: 6e7f8901a2b3, 7f8g9h0i1j2k3
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8a9b0c1d2e3f'
+down_revision: Union[str, Sequence[str], None] = ('6e7f8901a2b3', '7f8g9h0i1j2k3')
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Per-game state version, bumped on every change visible to players.
+    # Used as the ETag for the player state endpoint.
+    from sqlalchemy import inspect
+    conn = op.get_bind()
+    inspector = inspect(conn)
+    columns = [c['name'] for c in inspector.get_columns('games')]
+
+    if 'state_version' not in columns:
+        op.add_column('games', sa.Column('state_version', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column('games', 'state_version')
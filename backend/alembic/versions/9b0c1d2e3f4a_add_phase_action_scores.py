@@ -0,0 +1,601 @@
+"""add_phase_action_scores
+
+Revision ID: 9b0c1d2e3f4a
+Revises: 8a9b0c1d2e3f
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9b0c1d2e3f4a'
+down_revision: Union[str, None] = '8a9b0c1d2e3f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Built-in scoring matrices as of this revision, frozen here so the backfill does not
+# depend on app code: scenario name -> (phase order_index, team role) -> {action: points}
+SCORING_MATRICES = {
+    'Ransomware Incident Response': {
+        (0, 'red'): {
+            'Focus on Marketing Department (WS-MKT-015)': 10,
+            'Focus on Finance Department (WS-FIN-042)': 4,
+            'Split efforts between both departments': 6,
+            'Cover tracks': 7,
+            'Escalate privileges': 3,
+            'Move laterally': 2,
+            'Exfiltrate data': 1,
+            'Establish persistence': 8,
+        },
+        (0, 'blue'): {
+            'Isolate Marketing Department host (WS-MKT-015)': 10,
+            'Isolate Finance Department host (WS-FIN-042)': 6,
+            'Collect forensic evidence': 8,
+            'Block IP address': 6,
+            'Deploy countermeasures': 5,
+            'Escalate to management': 4,
+            'Isolate host': 8,
+        },
+        (1, 'red'): {
+            'Establish persistence': 10,
+            'Move laterally': 9,
+            'Escalate privileges': 7,
+            'Cover tracks': 6,
+            'Exfiltrate data': 2,
+        },
+        (1, 'blue'): {
+            'Block IP address': 10,
+            'Deploy countermeasures': 8,
+            'Collect forensic evidence': 7,
+            'Isolate host': 6,
+            'Escalate to management': 5,
+        },
+        (2, 'red'): {
+            'Escalate privileges on WS-MKT-02 (Marketing)': 10,
+            'Escalate privileges on WS-FIN-01 (Finance)': 3,
+            'Split efforts - escalate on both hosts': 5,
+            'Move laterally': 7,
+            'Cover tracks': 6,
+            'Establish persistence': 4,
+            'Exfiltrate data': 2,
+            'Escalate privileges': 8,
+        },
+        (2, 'blue'): {
+            'Isolate WS-MKT-02 (Marketing host)': 10,
+            'Isolate WS-FIN-01 (Finance host)': 6,
+            'Deploy countermeasures': 9,
+            'Escalate to management': 8,
+            'Collect forensic evidence': 6,
+            'Block IP address': 5,
+            'Isolate host': 8,
+        },
+        (3, 'red'): {
+            'Exfiltrate data from FS-02 (HR/Operations)': 10,
+            'Exfiltrate data from FS-01 (Finance)': 4,
+            'Exfiltrate from both servers simultaneously': 6,
+            'Cover tracks': 8,
+            'Establish persistence': 7,
+            'Move laterally': 4,
+            'Escalate privileges': 3,
+            'Exfiltrate data': 8,
+        },
+        (3, 'blue'): {
+            'Block exfiltration from FS-01 (Finance)': 10,
+            'Block exfiltration from FS-02 (HR/Operations)': 6,
+            'Collect forensic evidence': 9,
+            'Escalate to management': 8,
+            'Deploy countermeasures': 5,
+            'Isolate host': 4,
+            'Block IP address': 8,
+        },
+        (4, 'red'): {
+            'Move laterally': 10,
+            'Cover tracks': 9,
+            'Establish persistence': 8,
+            'Exfiltrate data': 6,
+            'Escalate privileges': 5,
+        },
+        (4, 'blue'): {
+            'Isolate host': 10,
+            'Deploy countermeasures': 9,
+            'Escalate to management': 8,
+            'Collect forensic evidence': 6,
+            'Block IP address': 4,
+        },
+    },
+    'Ransomware Attack: Advanced Persistent Threat': {
+        (0, 'red'): {
+            'Focus on Sales Department (WS-SLS-203)': 10,
+            'Focus on IT Department (WS-IT-089)': 4,
+            'Split efforts between both departments': 6,
+            'Cover tracks': 7,
+            'Escalate privileges': 3,
+        },
+        (0, 'blue'): {
+            'Isolate Sales Department host (WS-SLS-203)': 10,
+            'Isolate IT Department host (WS-IT-089)': 6,
+            'Collect forensic evidence': 8,
+            'Deploy countermeasures': 5,
+        },
+        (1, 'red'): {
+            'Deploy Registry Run Key persistence': 10,
+            'Deploy Scheduled Task persistence': 7,
+            'Deploy Service Creation persistence': 2,
+            'Move laterally': 6,
+            'Cover tracks': 7,
+        },
+        (1, 'blue'): {
+            'Audit and clean registry': 10,
+            'Remove scheduled tasks': 8,
+            'Monitor and block services': 6,
+            'Collect forensic evidence': 8,
+            'Deploy countermeasures': 7,
+        },
+        (2, 'red'): {
+            'Escalate privileges on APP-02 (Application Server)': 10,
+            'Escalate privileges on FS-01 (File Server)': 3,
+            'Attempt escalation on both servers': 5,
+            'Move laterally': 7,
+            'Cover tracks': 6,
+        },
+        (2, 'blue'): {
+            'Isolate APP-02 (Application Server)': 10,
+            'Isolate FS-01 (File Server)': 6,
+            'Patch vulnerabilities': 9,
+            'Collect forensic evidence': 7,
+        },
+        (3, 'red'): {
+            'Target DB-FIN-02 (Financial Records)': 10,
+            'Target DB-CUST-01 (Customer Database)': 2,
+            'Target both databases': 4,
+            'Cover tracks': 8,
+            'Establish persistence': 7,
+        },
+        (3, 'blue'): {
+            'Isolate DB-FIN-02 (Financial Records)': 10,
+            'Isolate DB-CUST-01 (Customer Database)': 6,
+            'Block database access': 9,
+            'Collect forensic evidence': 8,
+        },
+        (4, 'red'): {
+            'Use DNS tunneling': 10,
+            'Use HTTPS encrypted tunnel': 6,
+            'Split data across both methods': 7,
+            'Cover tracks': 8,
+            'Establish persistence': 7,
+        },
+        (4, 'blue'): {
+            'Block DNS tunneling': 10,
+            'Block HTTPS exfiltration': 8,
+            'Deploy DLP countermeasures': 9,
+            'Collect forensic evidence': 8,
+            'Escalate to management': 7,
+        },
+    },
+    'Ransomware Attack: Corporate Network Compromise': {
+        (0, 'red'): {
+            'Focus on Operations Department (WS-OPS-089)': 10,
+            'Focus on HR Department (WS-HR-042)': 4,
+            'Split efforts between both departments': 6,
+            'Cover tracks': 7,
+            'Escalate privileges': 3,
+        },
+        (0, 'blue'): {
+            'Isolate Operations Department host (WS-OPS-089)': 10,
+            'Isolate HR Department host (WS-HR-042)': 6,
+            'Collect forensic evidence': 8,
+            'Deploy countermeasures': 5,
+        },
+        (1, 'red'): {
+            'Deploy Registry Run Key': 10,
+            'Deploy Scheduled Task': 7,
+            'Deploy WMI Event Subscription': 2,
+            'Move laterally': 5,
+            'Cover tracks': 6,
+        },
+        (1, 'blue'): {
+            'Audit and clean registry': 10,
+            'Remove scheduled tasks': 7,
+            'Block WMI subscriptions': 4,
+            'Collect forensic evidence': 8,
+            'Deploy countermeasures': 6,
+        },
+        (2, 'red'): {
+            'Escalate on APP-DEV-02': 10,
+            'Escalate on FS-PROD-01': 3,
+            'Attempt both': 5,
+            'Move laterally': 6,
+            'Cover tracks': 5,
+        },
+        (2, 'blue'): {
+            'Isolate APP-DEV-02': 10,
+            'Isolate FS-PROD-01': 4,
+            'Patch vulnerabilities': 9,
+            'Collect forensic evidence': 7,
+        },
+        (3, 'red'): {
+            'Target DB-HR-PROD': 10,
+            'Target DB-CUST-PROD': 2,
+            'Target both': 4,
+            'Cover tracks': 6,
+            'Establish persistence': 7,
+        },
+        (3, 'blue'): {
+            'Isolate DB-HR-PROD': 10,
+            'Isolate DB-CUST-PROD': 4,
+            'Block database access': 8,
+            'Collect forensic evidence': 7,
+        },
+        (4, 'red'): {
+            'Monitor recovery attempts and collect intelligence': 10,
+            'Cover tracks and remove evidence': 7,
+            'Attempt to disrupt recovery operations': 4,
+            'Establish persistence in recovery infrastructure': 1,
+            'Negotiate ransom payment': 0,
+        },
+        (4, 'blue'): {
+            'Restore from offsite backups (critical systems first)': 10,
+            'Full system recovery from offsite backups': 7,
+            'Verify backup integrity before restoration': 4,
+            'Attempt to decrypt onsite backups': 1,
+            'Pay ransom and use decryption keys': 0,
+        },
+    },
+    'Email Bomb & Social Engineering Attack': {
+        (0, 'red'): {
+            'Monitor recipient engagement metrics': 7,
+            'Initialize VOIP infrastructure': 9,
+            'Maintain SMTP relay throughput': 10,
+            'Increase message volume parameters': 8,
+            'Execute log sanitization procedure': 5,
+        },
+        (0, 'blue'): {
+            'Collect EOP telemetry data': 6,
+            'Initiate user security awareness protocol': 10,
+            'Update transport rule policies': 8,
+            'Enable enhanced monitoring protocols': 7,
+            'Execute account isolation procedure': 4,
+        },
+        (1, 'red'): {
+            'Monitor user response': 6,
+            'Establish remote assistance session': 10,
+            'Intensify social engineering': 8,
+            'Execute log sanitization procedure': 5,
+            'Initiate credential collection workflow': 7,
+        },
+        (1, 'blue'): {
+            'Review Teams call logs and caller metadata': 8,
+            'Terminate active remote assistance connections': 10,
+            'Disable remote support protocols': 9,
+            'Collect forensic evidence': 6,
+            'Enable credential harvesting monitoring': 5,
+        },
+        (2, 'red'): {
+            'Execute log sanitization procedure': 5,
+            'Perform account verification procedure': 10,
+            'Deploy authentication capture module': 8,
+            'Initiate credential validation process': 9,
+            'Execute credential extraction utility': 6,
+        },
+        (2, 'blue'): {
+            'Collect forensic evidence': 6,
+            'Execute credential rotation procedure': 10,
+            'Initiate account security remediation': 9,
+            'Review account activity logs': 8,
+            'Enable persistence mechanism monitoring': 5,
+        },
+        (3, 'red'): {
+            'Execute log sanitization procedure': 5,
+            'Configure scheduled task automation': 10,
+            'Modify registry startup parameters': 9,
+            'Deploy email routing configuration': 8,
+            'Initialize payload deployment': 7,
+        },
+        (3, 'blue'): {
+            'Collect forensic evidence': 5,
+            'Execute persistence removal procedure': 10,
+            'Quarantine detected malware artifacts': 9,
+            'Terminate remote access sessions': 8,
+            'Execute network isolation protocol': 7,
+        },
+        (4, 'red'): {
+            'Execute log sanitization procedure': 5,
+            'Verify C2 channel stability': 10,
+            'Execute credential extraction utility': 8,
+            'Initiate network reconnaissance scan': 7,
+            'Begin data transfer operations': 6,
+        },
+        (4, 'blue'): {
+            'Collect forensic evidence': 5,
+            'Execute network isolation protocol': 10,
+            'Deploy firewall blocking rules': 9,
+            'Terminate malicious process execution': 8,
+            'Analyze data exfiltration patterns': 7,
+        },
+    },
+    'Operation Inbox Overload': {
+        (0, 'red'): {
+            'Use look-alike IT domain without links': 10,
+            'Vary sender display name and timing': 7,
+            'Send from generic/free mailbox': 4,
+            'Include suspicious links in email body': 0,
+        },
+        (0, 'blue'): {
+            'Purge messages and block sending domain': 10,
+            'Notify affected users about suspicious emails': 4,
+            'Block sender address only': 1,
+            'Do nothing and continue monitoring': 0,
+        },
+        (1, 'red'): {
+            'Send Teams DM first, then place a call': 10,
+            'Call user directly with no prior context': 4,
+            'Send additional email claiming IT will call': 1,
+            'Send Teams message with external support link': 0,
+        },
+        (1, 'blue'): {
+            'Send org-wide Teams broadcast about phishing/callback': 10,
+            'Reset user password only': 4,
+            'Disable user account preemptively': 7,
+            'Do nothing and continue monitoring': 0,
+        },
+        (2, 'red'): {
+            'Ask user to share screen to show the issue': 10,
+            'Provide fake ticket number and internal jargon': 7,
+            'Ask user directly for MFA reset code': 4,
+            'Ask user to install remote support tool': 1,
+        },
+        (2, 'blue'): {
+            'Disable user account immediately': 10,
+            'Validate caller via Teams tenant and internal directory': 7,
+            'Allow screen share with external caller': 1,
+            'Monitor call and collect more evidence only': 0,
+        },
+        (3, 'red'): {
+            'Trick user into approving MFA reset prompt': 10,
+            'Ask user to navigate to Security and Privacy settings': 7,
+            'Access SharePoint/OneDrive from compromised session': 4,
+            'Attempt to install malicious support application': 1,
+        },
+        (3, 'blue'): {
+            'Isolate host in Defender for Endpoint': 10,
+            'Disable user account': 7,
+            'Revoke active sessions only': 4,
+            'Take no action until more logs are collected': 0,
+        },
+        (4, 'red'): {
+            'Create app password for IMAP/legacy auth': 10,
+            'Create mailbox forwarding rule to external address': 7,
+            'Perform one-time data exfiltration only': 4,
+            'Attempt another MFA reset after being blocked': 1,
+        },
+        (4, 'blue'): {
+            'Full token revoke and add Conditional Access block': 10,
+            'Disable user account only': 7,
+            'Reset user password only': 4,
+            'Enable extra logging and auditing only': 1,
+        },
+    },
+    'SharePoint RCE Zero-Day Exploitation': {
+        (0, 'red'): {
+            'Conduct version detection and endpoint mapping': 10,
+            'Test vulnerability without detection': 9,
+            'Prepare exploitation payload': 8,
+            'Gather server configuration details': 7,
+            'Cover tracks': 6,
+        },
+        (0, 'blue'): {
+            'Monitor threat intelligence and assess vulnerability': 10,
+            'Review SharePoint logs for reconnaissance activity': 9,
+            'Prepare emergency mitigation procedures': 8,
+            'Assess business impact and patch readiness': 7,
+            'Update monitoring and alerting': 6,
+        },
+        (1, 'red'): {
+            'Execute RCE exploit and establish reverse shell': 10,
+            'Enumerate server environment': 9,
+            'Prepare for privilege escalation': 8,
+            'Evade WAF and security detection': 7,
+            'Cover tracks': 6,
+        },
+        (1, 'blue'): {
+            'Isolate SharePoint server immediately': 10,
+            'Collect forensic evidence': 9,
+            'Block attacker IP and C2 communications': 8,
+            'Deploy countermeasures': 7,
+            'Escalate to management': 5,
+        },
+        (2, 'red'): {
+            'Escalate to farm administrator': 10,
+            'Deploy multiple persistence mechanisms': 10,
+            'Maintain access through backdoors': 8,
+            'Reconnaissance for lateral movement': 7,
+            'Cover tracks': 6,
+        },
+        (2, 'blue'): {
+            'Remove all persistence mechanisms': 10,
+            'Revoke compromised credentials': 9,
+            'Prevent lateral movement': 8,
+            'Document attacker modifications': 7,
+            'Isolate server': 6,
+        },
+        (3, 'red'): {
+            'Exfiltrate data via multiple methods': 10,
+            'Access and catalog sensitive data': 9,
+            'Prioritize high-value data': 8,
+            'Maintain access during exfiltration': 7,
+            'Cover tracks': 6,
+        },
+        (3, 'blue'): {
+            'Block data exfiltration immediately': 10,
+            'Assess data breach scope': 9,
+            'Prepare regulatory notifications': 8,
+            'Isolate server': 7,
+            'Collect forensic evidence': 6,
+        },
+        (4, 'red'): {
+            'Cover tracks and hide remaining access': 10,
+            'Maintain persistence if possible': 9,
+            'Assess attack success and document techniques': 8,
+            'Identify remaining access methods': 7,
+            'Prepare final attack report': 6,
+        },
+        (4, 'blue'): {
+            'Deploy security patches': 10,
+            'Complete remediation and cleanup': 9,
+            'Conduct full forensic investigation': 8,
+            'Assess regulatory compliance requirements': 7,
+            'Create after-action report': 6,
+        },
+    },
+    'AI Application Data Leakage & Permission Misconfiguration': {
+        (0, 'red'): {
+            'Reconnaissance AI application architecture': 10,
+            'Test document access permissions': 9,
+            'Map document sources and categories': 8,
+            'Identify permission inheritance issues': 7,
+            'Cover tracks': 6,
+        },
+        (0, 'blue'): {
+            'Investigate unusual API activity': 10,
+            'Audit access control configurations': 9,
+            'Review document access logs': 8,
+            'Assess permission misconfigurations': 7,
+            'Verify user account legitimacy': 6,
+        },
+        (1, 'red'): {
+            'Exploit permission misconfiguration': 10,
+            'Access sensitive document categories': 9,
+            'Catalog accessible documents': 8,
+            'Test document retrieval via AI API': 7,
+            'Cover tracks': 6,
+        },
+        (1, 'blue'): {
+            'Investigate unauthorized document access': 10,
+            'Identify permission misconfiguration root cause': 9,
+            'Assess compliance impact': 8,
+            'Prepare remediation actions': 7,
+            'Review security configuration': 6,
+        },
+        (2, 'red'): {
+            'Extract sensitive data via prompt injection': 10,
+            'Extract data from multiple categories': 9,
+            'Use instruction override techniques': 8,
+            'Catalog extracted information': 7,
+            'Cover tracks': 6,
+        },
+        (2, 'blue'): {
+            'Confirm data leakage through AI API': 10,
+            'Detect and analyze prompt injection attacks': 9,
+            'Block unauthorized AI API calls': 8,
+            'Assess compliance violations': 7,
+            'Prepare regulatory notifications': 6,
+        },
+        (3, 'red'): {
+            'Attempt to maintain access through alternative methods': 10,
+            'Test remaining vulnerabilities': 9,
+            'Assess attack success and document techniques': 8,
+            'Cover tracks and hide remaining access': 7,
+            'Catalog extracted data': 6,
+        },
+        (3, 'blue'): {
+            'Fix permission misconfigurations': 10,
+            'Revoke all unauthorized access': 9,
+            'Implement remaining security improvements': 8,
+            'Conduct comprehensive access review': 7,
+            'Assess compliance impact and prepare notifications': 6,
+        },
+        (4, 'red'): {
+            'Assess overall attack success': 10,
+            'Document successful attack techniques': 9,
+            'Identify areas for improvement': 8,
+            'Prepare final attack summary report': 7,
+            'Catalog lessons learned': 6,
+        },
+        (4, 'blue'): {
+            'Implement security improvements plan': 10,
+            'Complete compliance assessments': 9,
+            'Prepare and send regulatory notifications': 8,
+            'Conduct after-action review': 7,
+            'Implement long-term security hardening': 6,
+        },
+    },
+    'Tutorial: Basic Security Incident': {
+        (0, 'red'): {
+            'Establish persistence': 8,
+            'Cover tracks': 7,
+            'Escalate privileges': 4,
+            'Move laterally': 3,
+            'Exfiltrate data': 1,
+        },
+        (0, 'blue'): {
+            'Isolate host': 9,
+            'Collect forensic evidence': 8,
+            'Block IP address': 6,
+            'Deploy countermeasures': 5,
+            'Escalate to management': 4,
+        },
+        (1, 'red'): {
+            'Establish persistence': 8,
+            'Cover tracks': 9,
+            'Escalate privileges': 6,
+            'Move laterally': 5,
+            'Exfiltrate data': 2,
+        },
+        (1, 'blue'): {
+            'Isolate host': 10,
+            'Block IP address': 9,
+            'Collect forensic evidence': 8,
+            'Deploy countermeasures': 7,
+            'Escalate to management': 6,
+        },
+    },
+}
+
+
+def upgrade() -> None:
+    # Scoring weights per phase action: {"red": {"action name": points}, "blue": {...}}
+    from sqlalchemy import inspect
+    conn = op.get_bind()
+    inspector = inspect(conn)
+    columns = [c['name'] for c in inspector.get_columns('scenario_phases')]
+
+    if 'action_scores' not in columns:
+        op.add_column('scenario_phases', sa.Column('action_scores', postgresql.JSON(astext_type=sa.Text()), nullable=True))
+
+    # Backfill existing scenarios from the built-in scoring matrices
+    scenarios = sa.table('scenarios', sa.column('id', sa.Integer), sa.column('name', sa.String))
+    phases = sa.table(
+        'scenario_phases',
+        sa.column('id', sa.Integer),
+        sa.column('scenario_id', sa.Integer),
+        sa.column('order_index', sa.Integer),
+        sa.column('action_scores', sa.JSON),
+    )
+    rows = conn.execute(
+        sa.select(phases.c.id, phases.c.order_index, scenarios.c.name)
+        .select_from(phases.join(scenarios, phases.c.scenario_id == scenarios.c.id))
+        .where(phases.c.action_scores.is_(None))
+    ).fetchall()
+
+    for phase_id, order_index, scenario_name in rows:
+        matrix = SCORING_MATRICES.get(scenario_name)
+        if not matrix:
+            continue
+        action_scores = {
+            team_role: dict(actions)
+            for (phase_order, team_role), actions in matrix.items()
+            if phase_order == order_index
+        }
+        if action_scores:
+            conn.execute(
+                phases.update().where(phases.c.id == phase_id).values(action_scores=action_scores)
+            )
+
+
+def downgrade() -> None:
+    op.drop_column('scenario_phases', 'action_scores')
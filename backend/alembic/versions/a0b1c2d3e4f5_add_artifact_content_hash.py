@@ -0,0 +1,57 @@
+"""add_artifact_content_hash
+
+Revision ID: a0b1c2d3e4f5
+Revises: 9b0c1d2e3f4a
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a0b1c2d3e4f5'
+down_revision: Union[str, None] = '9b0c1d2e3f4a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # sha256 of artifacts.content, used as the cache key for /artifacts/content/{id}
+    from sqlalchemy import inspect
+    conn = op.get_bind()
+    inspector = inspect(conn)
+    columns = [c['name'] for c in inspector.get_columns('artifacts')]
+
+    if 'content_hash' not in columns:
+        op.add_column('artifacts', sa.Column('content_hash', sa.String(length=64), nullable=True))
+
+    # Backfill hashes for existing content
+    from app.models import artifact_content_hash
+
+    artifacts = sa.table(
+        'artifacts',
+        sa.column('id', sa.Integer),
+        sa.column('content', sa.Text),
+        sa.column('content_hash', sa.String),
+    )
+    rows = conn.execute(
+        sa.select(artifacts.c.id, artifacts.c.content)
+        .where(artifacts.c.content.isnot(None))
+        .where(artifacts.c.content_hash.is_(None))
+    ).fetchall()
+
+    for artifact_id, content in rows:
+        content_hash = artifact_content_hash(content)
+        if content_hash:
+            conn.execute(
+                artifacts.update()
+                .where(artifacts.c.id == artifact_id)
+                .values(content_hash=content_hash)
+            )
+
+
+def downgrade() -> None:
+    op.drop_column('artifacts', 'content_hash')
@@ -0,0 +1,33 @@
+"""add_vote_previous_action
+
+Revision ID: a6b7c8d9e0f1
+Revises: f5a6b7c8d9e0
+Create Date: 2026-10-18 19:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a6b7c8d9e0f1'
+down_revision: Union[str, None] = 'f5a6b7c8d9e0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Action replaced by a re-vote, returned by the vote upsert to keep vote_tallies in step
+    from sqlalchemy import inspect
+    conn = op.get_bind()
+    inspector = inspect(conn)
+    columns = [col['name'] for col in inspector.get_columns('player_votes')]
+
+    if 'previous_action' not in columns:
+        op.add_column('player_votes', sa.Column('previous_action', sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('player_votes', 'previous_action')
@@ -0,0 +1,99 @@
+"""compress_artifact_content
+
+Revision ID: b1c2d3e4f5a6
+Revises: a0b1c2d3e4f5
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+import gzip
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b1c2d3e4f5a6'
+down_revision: Union[str, None] = 'a0b1c2d3e4f5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+artifacts = sa.table(
+    'artifacts',
+    sa.column('id', sa.Integer),
+    sa.column('content', sa.Text),
+    sa.column('content_blob', sa.LargeBinary),
+    sa.column('content_encoding', sa.String),
+)
+
+
+# The storage format at this revision, kept here rather than imported from
+# app.artifact_storage so the migration stays reproducible as the app changes
+def _compress(content):
+    raw = content.encode('utf-8')
+    # mtime=0 keeps the output deterministic for identical content
+    compressed = gzip.compress(raw, compresslevel=9, mtime=0)
+    if len(compressed) >= len(raw):
+        return None, None
+    return 'gzip', compressed
+
+
+def _decompress(encoding, blob):
+    if encoding != 'gzip':
+        raise ValueError(f"Unsupported artifact content encoding: {encoding}")
+    return gzip.decompress(bytes(blob)).decode('utf-8')
+
+
+def upgrade() -> None:
+    # Compressed artifact content; content_encoding is the codec (HTTP content-coding) of content_blob
+    from sqlalchemy import inspect
+    conn = op.get_bind()
+    inspector = inspect(conn)
+    columns = [c['name'] for c in inspector.get_columns('artifacts')]
+
+    if 'content_blob' not in columns:
+        op.add_column('artifacts', sa.Column('content_blob', sa.LargeBinary(), nullable=True))
+    if 'content_encoding' not in columns:
+        op.add_column('artifacts', sa.Column('content_encoding', sa.String(length=16), nullable=True))
+
+    # Compress existing content
+    artifact_ids = conn.execute(
+        sa.select(artifacts.c.id)
+        .where(artifacts.c.content.isnot(None))
+        .where(artifacts.c.content_encoding.is_(None))
+    ).scalars().all()
+
+    for artifact_id in artifact_ids:
+        content = conn.execute(
+            sa.select(artifacts.c.content).where(artifacts.c.id == artifact_id)
+        ).scalar()
+        encoding, blob = _compress(content) if content else (None, None)
+        if blob is not None:
+            conn.execute(
+                artifacts.update()
+                .where(artifacts.c.id == artifact_id)
+                .values(content=None, content_blob=blob, content_encoding=encoding)
+            )
+
+
+def downgrade() -> None:
+    # Restore uncompressed content before dropping the columns
+    conn = op.get_bind()
+    rows = conn.execute(
+        sa.select(artifacts.c.id, artifacts.c.content_encoding)
+        .where(artifacts.c.content_encoding.isnot(None))
+    ).fetchall()
+
+    for artifact_id, encoding in rows:
+        blob = conn.execute(
+            sa.select(artifacts.c.content_blob).where(artifacts.c.id == artifact_id)
+        ).scalar()
+        conn.execute(
+            artifacts.update()
+            .where(artifacts.c.id == artifact_id)
+            .values(content=_decompress(encoding, blob))
+        )
+
+    op.drop_column('artifacts', 'content_encoding')
+    op.drop_column('artifacts', 'content_blob')
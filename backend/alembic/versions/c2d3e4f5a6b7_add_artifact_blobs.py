@@ -0,0 +1,48 @@
+"""add_artifact_blobs
+
+Revision ID: c2d3e4f5a6b7
+Revises: b1c2d3e4f5a6
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c2d3e4f5a6b7'
+down_revision: Union[str, None] = 'b1c2d3e4f5a6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Content-addressed upload store: one row per distinct file, keyed by sha256
+    from sqlalchemy import inspect
+    conn = op.get_bind()
+    inspector = inspect(conn)
+    tables = inspector.get_table_names()
+
+    if 'artifact_blobs' not in tables:
+        op.create_table(
+            'artifact_blobs',
+            sa.Column('sha256', sa.String(length=64), nullable=False),
+            sa.Column('size', sa.Integer(), nullable=False),
+            sa.Column('media_type', sa.String(), nullable=True),
+            sa.Column('ref_count', sa.Integer(), server_default='0', nullable=False),
+            sa.Column('uploaded_at', sa.DateTime(timezone=True), server_default=sa.text('now()')),
+            sa.PrimaryKeyConstraint('sha256')
+        )
+
+    columns = [c['name'] for c in inspector.get_columns('artifacts')]
+    if 'blob_sha256' not in columns:
+        op.add_column('artifacts', sa.Column('blob_sha256', sa.String(length=64), nullable=True))
+        op.create_index(op.f('ix_artifacts_blob_sha256'), 'artifacts', ['blob_sha256'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_artifacts_blob_sha256'), table_name='artifacts')
+    op.drop_column('artifacts', 'blob_sha256')
+    op.drop_table('artifact_blobs')
@@ -0,0 +1,68 @@
+"""add_hot_path_indexes
+
+Revision ID: d3e4f5a6b7c8
+Revises: c2d3e4f5a6b7
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+import logging
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd3e4f5a6b7c8'
+down_revision: Union[str, None] = 'c2d3e4f5a6b7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+logger = logging.getLogger('alembic.runtime.migration')
+
+
+# (index name, table, columns, unique) for the queries run on every poll/vote
+INDEXES = [
+    ('ix_player_votes_game_phase_team', 'player_votes', ['game_id', 'phase_id', 'team_id'], False),
+    ('uq_player_votes_player_phase', 'player_votes', ['player_id', 'phase_id'], True),
+    ('ix_score_events_game_team_phase', 'score_events', ['game_id', 'team_id', 'phase_id'], False),
+    ('ix_phase_decisions_game_phase_team', 'phase_decisions', ['game_id', 'phase_id', 'team_id'], False),
+    ('ix_players_game_team', 'players', ['game_id', 'team_id'], False),
+    ('ix_teams_code', 'teams', ['code'], False),
+    ('ix_scenario_phases_scenario_order', 'scenario_phases', ['scenario_id', 'order_index'], False),
+]
+
+
+def upgrade() -> None:
+    from sqlalchemy import inspect
+    conn = op.get_bind()
+    inspector = inspect(conn)
+
+    # One vote per player per phase: keep each player's latest vote before enforcing it.
+    # The older duplicates are deleted for good (downgrade cannot bring them back), so
+    # record what goes; vote tallies are built from the remaining votes in f5a6b7c8d9e0.
+    duplicates = conn.execute(sa.text(
+        "SELECT player_id, phase_id, COUNT(id) - 1 AS extra FROM player_votes "
+        "GROUP BY player_id, phase_id HAVING COUNT(id) > 1 ORDER BY player_id, phase_id"
+    )).fetchall()
+    if duplicates:
+        deleted = conn.execute(sa.text(
+            "DELETE FROM player_votes WHERE id NOT IN "
+            "(SELECT MAX(id) FROM player_votes GROUP BY player_id, phase_id)"
+        )).rowcount
+        logger.warning(
+            "Deleted %d superseded player_votes rows (latest vote kept) for %d (player_id, phase_id) pairs: %s",
+            deleted, len(duplicates),
+            ", ".join(f"({row.player_id}, {row.phase_id}) x{row.extra}" for row in duplicates)
+        )
+
+    for name, table, columns, unique in INDEXES:
+        existing = [index['name'] for index in inspector.get_indexes(table)]
+        if name not in existing:
+            op.create_index(name, table, columns, unique=unique)
+
+
+def downgrade() -> None:
+    # Only the indexes are dropped: duplicate votes deleted by upgrade are not restored
+    for name, table, columns, unique in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
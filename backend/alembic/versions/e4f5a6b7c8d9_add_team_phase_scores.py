@@ -0,0 +1,57 @@
+"""add_team_phase_scores
+
+Revision ID: e4f5a6b7c8d9
+Revises: d3e4f5a6b7c8
+Create Date: 2026-10-18 17:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4f5a6b7c8d9'
+down_revision: Union[str, None] = 'd3e4f5a6b7c8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Per-team, per-phase score totals, maintained alongside score_events
+    from sqlalchemy import inspect
+    conn = op.get_bind()
+    inspector = inspect(conn)
+
+    if 'team_phase_scores' not in inspector.get_table_names():
+        op.create_table(
+            'team_phase_scores',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('game_id', sa.Integer(), nullable=False),
+            sa.Column('team_id', sa.Integer(), nullable=False),
+            sa.Column('phase_id', sa.Integer(), nullable=False),
+            sa.Column('score', sa.Integer(), server_default='0', nullable=False),
+            sa.Column('event_count', sa.Integer(), server_default='0', nullable=False),
+            sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()')),
+            sa.ForeignKeyConstraint(['game_id'], ['games.id']),
+            sa.ForeignKeyConstraint(['team_id'], ['teams.id']),
+            sa.ForeignKeyConstraint(['phase_id'], ['scenario_phases.id']),
+            sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index(op.f('ix_team_phase_scores_id'), 'team_phase_scores', ['id'], unique=False)
+        op.create_index('uq_team_phase_scores_game_team_phase', 'team_phase_scores', ['game_id', 'team_id', 'phase_id'], unique=True)
+
+    # Backfill from existing events
+    op.execute("DELETE FROM team_phase_scores")
+    op.execute(
+        "INSERT INTO team_phase_scores (game_id, team_id, phase_id, score, event_count, updated_at) "
+        "SELECT game_id, team_id, phase_id, SUM(delta), COUNT(id), MAX(created_at) "
+        "FROM score_events GROUP BY game_id, team_id, phase_id"
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('uq_team_phase_scores_game_team_phase', table_name='team_phase_scores')
+    op.drop_index(op.f('ix_team_phase_scores_id'), table_name='team_phase_scores')
+    op.drop_table('team_phase_scores')
@@ -0,0 +1,86 @@
+"""add_vote_tallies
+
+Revision ID: f5a6b7c8d9e0
+Revises: e4f5a6b7c8d9
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+from collections import defaultdict
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f5a6b7c8d9e0'
+down_revision: Union[str, None] = 'e4f5a6b7c8d9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Per-team vote counts for a phase, maintained alongside player_votes
+    from sqlalchemy import inspect
+    conn = op.get_bind()
+    inspector = inspect(conn)
+
+    if 'vote_tallies' not in inspector.get_table_names():
+        op.create_table(
+            'vote_tallies',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('game_id', sa.Integer(), nullable=False),
+            sa.Column('phase_id', sa.Integer(), nullable=False),
+            sa.Column('team_id', sa.Integer(), nullable=False),
+            sa.Column('votes_submitted', sa.Integer(), server_default='0', nullable=False),
+            sa.Column('total_players', sa.Integer(), server_default='0', nullable=False),
+            sa.Column('action_counts', sa.JSON(), nullable=False),
+            sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()')),
+            sa.ForeignKeyConstraint(['game_id'], ['games.id']),
+            sa.ForeignKeyConstraint(['phase_id'], ['scenario_phases.id']),
+            sa.ForeignKeyConstraint(['team_id'], ['teams.id']),
+            sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index(op.f('ix_vote_tallies_id'), 'vote_tallies', ['id'], unique=False)
+        op.create_index('uq_vote_tallies_game_phase_team', 'vote_tallies', ['game_id', 'phase_id', 'team_id'], unique=True)
+
+    # Backfill from existing votes (action counts are JSON, so tally them here)
+    op.execute("DELETE FROM vote_tallies")
+    roster_sizes = {
+        (row.game_id, row.team_id): row.players
+        for row in conn.execute(sa.text(
+            "SELECT game_id, team_id, COUNT(id) AS players FROM players GROUP BY game_id, team_id"
+        ))
+    }
+    action_counts = defaultdict(dict)
+    for row in conn.execute(sa.text(
+        "SELECT game_id, phase_id, team_id, selected_action, COUNT(id) AS votes "
+        "FROM player_votes GROUP BY game_id, phase_id, team_id, selected_action"
+    )):
+        action_counts[(row.game_id, row.phase_id, row.team_id)][row.selected_action] = row.votes
+
+    vote_tallies = sa.table(
+        'vote_tallies',
+        sa.column('game_id', sa.Integer()),
+        sa.column('phase_id', sa.Integer()),
+        sa.column('team_id', sa.Integer()),
+        sa.column('votes_submitted', sa.Integer()),
+        sa.column('total_players', sa.Integer()),
+        sa.column('action_counts', sa.JSON()),
+    )
+    rows = [{
+        'game_id': game_id,
+        'phase_id': phase_id,
+        'team_id': team_id,
+        'votes_submitted': sum(counts.values()),
+        'total_players': roster_sizes.get((game_id, team_id), 0),
+        'action_counts': counts,
+    } for (game_id, phase_id, team_id), counts in action_counts.items()]
+    if rows:
+        op.bulk_insert(vote_tallies, rows)
+
+
+def downgrade() -> None:
+    op.drop_index('uq_vote_tallies_game_phase_team', table_name='vote_tallies')
+    op.drop_index(op.f('ix_vote_tallies_id'), table_name='vote_tallies')
+    op.drop_table('vote_tallies')
@@ -0,0 +1,209 @@
+"""
+Content-addressed store for uploaded artifact files.
+Each distinct file is stored once under its sha256 and recorded in
+artifact_blobs. Artifact.file_url points at the content address, so identical
+uploads share one file, a name can never overwrite another upload, and files
+can be cached forever. ArtifactBlob.ref_count tracks referencing artifacts;
+unreferenced blobs are removed by collect_garbage().
+"""
+import codecs
+import hashlib
+import logging
+import mimetypes
+import os
+import tempfile
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import BinaryIO, List, Optional
+
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.artifact_storage import BLOB_URL_PREFIX
+from app.models import Artifact, ArtifactBlob
+
+logger = logging.getLogger(__name__)
+
+BLOBS_DIR = Path(os.getenv("ARTIFACT_BLOBS_DIR", "/app/artifacts/blobs"))
+BLOBS_DIR.mkdir(exist_ok=True, parents=True)
+
+# Bytes read per chunk while hashing/copying an upload
+CHUNK_SIZE = 1024 * 1024
+
+# Unreferenced blobs younger than this are kept: they may have just been uploaded
+# for an artifact that hasn't been saved yet
+GC_GRACE_PERIOD = timedelta(hours=24)
+
+
+def blob_path(sha256: str) -> Path:
+    return BLOBS_DIR / sha256[:2] / sha256
+
+
+def blob_url(sha256: str, filename: Optional[str] = None) -> str:
+    """Content address for a blob; the file extension only helps clients pick a viewer."""
+    extension = Path(filename).suffix.lower() if filename else ""
+    if not extension.lstrip(".").isalnum():
+        extension = ""
+    return f"{BLOB_URL_PREFIX}{sha256}{extension}"
+
+
+class BlobTooLarge(ValueError):
+    """Raised by store_blob when the source exceeds max_size."""
+
+
+def store_blob(
+    db: Session,
+    source: BinaryIO,
+    filename: Optional[str] = None,
+    max_size: Optional[int] = None
+) -> ArtifactBlob:
+    """
+    Store a file by content. The source is copied in chunks to a temp file while
+    it is hashed, size-checked and its type sniffed, then renamed into place.
+    Identical content is stored once; the existing blob is returned.
+    Blocking: call from a worker thread, not the event loop.
+    """
+    BLOBS_DIR.mkdir(exist_ok=True, parents=True)
+    digest = hashlib.sha256()
+    size = 0
+    sniffed_type = None
+    fd, tmp_path = tempfile.mkstemp(dir=BLOBS_DIR, suffix=".upload")
+    try:
+        with os.fdopen(fd, "wb") as tmp:
+            while True:
+                chunk = source.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                if sniffed_type is None:
+                    sniffed_type = sniff_media_type(chunk)
+                size += len(chunk)
+                if max_size is not None and size > max_size:
+                    raise BlobTooLarge(f"File exceeds the {max_size} byte upload limit")
+                digest.update(chunk)
+                tmp.write(chunk)
+            tmp.flush()
+            os.fsync(tmp.fileno())
+        # Trust the bytes over the client's declared type; fall back to the file extension
+        media_type = sniffed_type or _guess_media_type(filename) or "application/octet-stream"
+        return _commit_blob(db, tmp_path, digest.hexdigest(), size, media_type)
+    finally:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+
+
+# Leading bytes of the file types artifacts are uploaded as
+_MAGIC_NUMBERS = [
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+    (b"%PDF-", "application/pdf"),
+    (b"PK\x03\x04", "application/zip"),
+    (b"\x1f\x8b", "application/gzip"),
+]
+
+
+def sniff_media_type(head: bytes) -> Optional[str]:
+    """Media type from a file's first bytes, or None if unrecognized."""
+    for magic, media_type in _MAGIC_NUMBERS:
+        if head.startswith(magic):
+            return media_type
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+    if b"\x00" in head:
+        return None
+    try:
+        # Incremental decode: a multi-byte character may be cut at the chunk boundary
+        codecs.getincrementaldecoder("utf-8")().decode(head, final=False)
+    except UnicodeDecodeError:
+        return None
+    return "text/plain"
+
+
+def _guess_media_type(filename: Optional[str]) -> Optional[str]:
+    # Only types that can't be confused with active content
+    media_type = mimetypes.guess_type(filename)[0] if filename else None
+    if media_type and media_type.split("/")[0] in ("image", "text") and media_type not in ("image/svg+xml", "text/html"):
+        return media_type
+    return None
+
+
+def _commit_blob(db: Session, tmp_path: str, sha256: str, size: int, media_type: Optional[str]) -> ArtifactBlob:
+    """Move a fully written temp file to its content address and record it."""
+    path = blob_path(sha256)
+    if not path.exists():
+        path.parent.mkdir(exist_ok=True, parents=True)
+        os.replace(tmp_path, path)
+
+    blob = db.query(ArtifactBlob).filter(ArtifactBlob.sha256 == sha256).first()
+    if blob:
+        # Restart the grace period so garbage collection can't remove it before it is referenced
+        blob.uploaded_at = func.now()
+        return blob
+    try:
+        # Savepoint: a concurrent upload of the same content may insert the row first
+        with db.begin_nested():
+            blob = ArtifactBlob(sha256=sha256, size=size, media_type=media_type)
+            db.add(blob)
+    except IntegrityError:
+        blob = db.query(ArtifactBlob).filter(ArtifactBlob.sha256 == sha256).one()
+    return blob
+
+
+def verify_blob(blob: ArtifactBlob, rehash: bool = False) -> bool:
+    """
+    Check a stored blob against its record. The size check is a single stat;
+    rehash=True also recomputes the digest.
+    """
+    path = blob_path(blob.sha256)
+    try:
+        if path.stat().st_size != blob.size:
+            return False
+    except FileNotFoundError:
+        return False
+    if not rehash:
+        return True
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest() == blob.sha256
+
+
+def recount_references(db: Session):
+    """Recompute ArtifactBlob.ref_count from the artifacts table."""
+    counts = dict(db.query(Artifact.blob_sha256, func.count(Artifact.id)).filter(
+        Artifact.blob_sha256.isnot(None)
+    ).group_by(Artifact.blob_sha256).all())
+    for blob in db.query(ArtifactBlob).all():
+        blob.ref_count = counts.get(blob.sha256, 0)
+    db.flush()
+
+
+def collect_garbage(db: Session, grace_period: timedelta = GC_GRACE_PERIOD, dry_run: bool = False) -> List[str]:
+    """Delete blobs no artifact references (older than grace_period). Returns their digests."""
+    recount_references(db)
+    cutoff = datetime.now(timezone.utc) - grace_period
+    unreferenced = [
+        blob for blob in db.query(ArtifactBlob).filter(ArtifactBlob.ref_count <= 0).all()
+        if blob.uploaded_at is None or _as_utc(blob.uploaded_at) < cutoff
+    ]
+    removed = [blob.sha256 for blob in unreferenced]
+    if dry_run:
+        db.rollback()
+        return removed
+
+    for blob in unreferenced:
+        db.delete(blob)
+    db.commit()
+    # Files go after the rows are gone, so a crash never leaves a row without its file
+    for sha256 in removed:
+        blob_path(sha256).unlink(missing_ok=True)
+    logger.info(f"Removed {len(removed)} unreferenced artifact blobs")
+    return removed
+
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite returns naive UTC timestamps
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
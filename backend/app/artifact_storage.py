@@ -0,0 +1,55 @@
+"""
+Compressed storage for artifact text content.
+Artifact bodies (generated SIEM logs, scan output, email headers) are highly
+repetitive, so they are stored compressed in artifacts.content_blob with the
+codec recorded in artifacts.content_encoding. The encoding names are HTTP
+content-codings, so a stored body can be sent as-is to a client that
+accepts that encoding.
+"""
+import gzip
+from typing import Optional, Tuple
+
+CONTENT_ENCODING_GZIP = "gzip"
+
+# Stored encoding -> decoder; content_encoding NULL means plain text in artifacts.content
+_DECODERS = {
+    CONTENT_ENCODING_GZIP: gzip.decompress,
+}
+
+
+def compress_content(content: str) -> Tuple[Optional[str], Optional[bytes]]:
+    """
+    Compress artifact text for storage.
+    Returns (content_encoding, content_blob), or (None, None) when compression
+    doesn't save space and the text should be stored as-is.
+    """
+    raw = content.encode("utf-8")
+    # mtime=0 keeps the output deterministic for identical content
+    compressed = gzip.compress(raw, compresslevel=9, mtime=0)
+    if len(compressed) >= len(raw):
+        return None, None
+    return CONTENT_ENCODING_GZIP, compressed
+
+
+def decompress_content(content_encoding: Optional[str], content_blob: Optional[bytes], content_text: Optional[str]) -> Optional[str]:
+    """Return artifact text from its stored representation."""
+    if content_encoding is None or content_blob is None:
+        return content_text
+    decoder = _DECODERS.get(content_encoding)
+    if decoder is None:
+        raise ValueError(f"Unsupported artifact content encoding: {content_encoding}")
+    return decoder(bytes(content_blob)).decode("utf-8")
+
+
+# Uploaded files are content-addressed: /api/artifacts/blobs/{sha256}{extension}
+BLOB_URL_PREFIX = "/api/artifacts/blobs/"
+
+
+def blob_sha256_from_url(file_url: Optional[str]) -> Optional[str]:
+    """The blob digest a file_url points at, or None for other URLs."""
+    if not file_url or not file_url.startswith(BLOB_URL_PREFIX):
+        return None
+    digest = file_url[len(BLOB_URL_PREFIX):].split(".", 1)[0].lower()
+    if len(digest) != 64 or not all(c in "0123456789abcdef" for c in digest):
+        return None
+    return digest
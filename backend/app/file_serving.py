@@ -0,0 +1,45 @@
+"""
+File responses for stored artifacts and exports.
+Behind nginx the backend only authorizes and resolves the file, then hands the
+transfer to nginx with X-Accel-Redirect (sendfile, Range requests). Without
+ACCEL_REDIRECT_PREFIX set (local dev, tests) files are streamed by the app.
+"""
+import os
+from pathlib import Path
+from typing import Dict, Optional
+from urllib.parse import quote
+
+from fastapi import Response
+from fastapi.responses import FileResponse
+
+# Directory nginx exposes through its internal location
+ACCEL_ROOT = Path(os.getenv("ACCEL_REDIRECT_ROOT", "/app/artifacts"))
+
+# Internal nginx location mapped to ACCEL_ROOT, e.g. /_protected_artifacts/ (empty: disabled)
+ACCEL_REDIRECT_PREFIX = os.getenv("ACCEL_REDIRECT_PREFIX", "")
+
+
+def attachment_disposition(filename: str) -> str:
+    """Content-Disposition for a download, as FileResponse(filename=...) builds it."""
+    quoted = quote(filename)
+    if quoted != filename:
+        return f"attachment; filename*=utf-8''{quoted}"
+    return f'attachment; filename="{filename}"'
+
+
+def file_response(path: Path, media_type: Optional[str] = None, headers: Optional[Dict[str, str]] = None) -> Response:
+    """
+    Serve a file. With X-Accel-Redirect nginx sends the body and keeps our
+    Content-Type, Content-Disposition and Cache-Control; the ETag is passed on
+    by the internal location.
+    """
+    headers = dict(headers or {})
+    if ACCEL_REDIRECT_PREFIX:
+        try:
+            relative = Path(path).relative_to(ACCEL_ROOT)
+        except ValueError:
+            relative = None
+        if relative is not None:
+            headers["X-Accel-Redirect"] = ACCEL_REDIRECT_PREFIX.rstrip("/") + "/" + quote(relative.as_posix())
+            return Response(media_type=media_type or "application/octet-stream", headers=headers)
+    return FileResponse(path, media_type=media_type, headers=headers)
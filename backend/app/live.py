@@ -0,0 +1,281 @@
+"""
+Live game event channel.
+Keeps an in-process registry of subscribers per game and pushes small state
+diffs to them whenever a game changes, so clients don't have to poll for
+full state.
+
+With several uvicorn workers, events are relayed through Postgres
+LISTEN/NOTIFY so that every worker delivers them to its own subscribers.
+"""
+import asyncio
+import json
+import logging
+import select
+import threading
+from collections import defaultdict
+from typing import Any, Callable, Dict, Optional, Set, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.database import engine
+from app.models import Game, Team
+
+logger = logging.getLogger(__name__)
+
+# Max pending events per subscriber; slow consumers drop their oldest event
+SUBSCRIBER_QUEUE_SIZE = 100
+
+# Postgres notification channel for game events, shared by all workers
+NOTIFY_CHANNEL = "game_events"
+
+# Seconds between listener wake-ups (checks for shutdown) and reconnect attempts
+LISTEN_POLL_SECONDS = 5
+
+
+class GameEventBroker:
+    """Fan-out of game events to subscribers attached to this process."""
+
+    def __init__(self):
+        self._subscribers: Dict[int, Set[Tuple[asyncio.AbstractEventLoop, asyncio.Queue]]] = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def subscribe(self, game_id: int) -> asyncio.Queue:
+        """Register a subscriber for a game. Must be called from the event loop."""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        with self._lock:
+            self._subscribers[game_id].add((asyncio.get_running_loop(), queue))
+        return queue
+
+    def unsubscribe(self, game_id: int, queue: asyncio.Queue):
+        with self._lock:
+            subscribers = self._subscribers.get(game_id)
+            if not subscribers:
+                return
+            subscribers.difference_update({s for s in subscribers if s[1] is queue})
+            if not subscribers:
+                del self._subscribers[game_id]
+
+    def subscriber_count(self, game_id: int) -> int:
+        with self._lock:
+            return len(self._subscribers.get(game_id, ()))
+
+    def publish(self, game_id: int, event: Dict[str, Any]):
+        """
+        Deliver an event to every subscriber of a game.
+        Safe to call from sync route handlers running in the threadpool.
+        """
+        with self._lock:
+            subscribers = list(self._subscribers.get(game_id, ()))
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(_deliver, queue, event)
+            except RuntimeError:
+                # Subscriber's loop is closed; it will be unsubscribed on disconnect
+                pass
+
+
+def _deliver(queue: asyncio.Queue, event: Dict[str, Any]):
+    if queue.full():
+        queue.get_nowait()
+    queue.put_nowait(event)
+
+
+broker = GameEventBroker()
+
+
+class PostgresEventRelay:
+    """
+    Cross-worker fan-out over Postgres LISTEN/NOTIFY.
+    Writers NOTIFY instead of handling a message locally; a listener thread in
+    every worker (including the writer's) passes notifications to the handler
+    registered for their channel.
+    """
+
+    def __init__(self, engine):
+        self._engine = engine
+        self._handlers: Dict[str, Callable[[Dict[str, Any]], None]] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._notify_conn = None
+        self._notify_lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def add_channel(self, channel: str, handler: Callable[[Dict[str, Any]], None]):
+        """Register the local handler for a channel. Must be called before start()."""
+        self._handlers[channel] = handler
+
+    def start(self):
+        if self._engine.dialect.name != "postgresql" or self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._listen, name="game-event-relay", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=LISTEN_POLL_SECONDS + 1)
+            self._thread = None
+        with self._notify_lock:
+            self._close_notify_connection()
+
+    def notify(self, channel: str, message: Dict[str, Any]):
+        # Own connection rather than a pooled one: the request publishing usually
+        # still holds its session's connection, and waiting on the pool for a
+        # second one deadlocks once every pooled connection is held that way
+        with self._notify_lock:
+            try:
+                if self._notify_conn is None:
+                    self._notify_conn = self._raw_connection()
+                with self._notify_conn.cursor() as cursor:
+                    cursor.execute("SELECT pg_notify(%s, %s)", (channel, json.dumps(message)))
+            except Exception:
+                self._close_notify_connection()
+                raise
+
+    def _close_notify_connection(self):
+        if self._notify_conn is not None:
+            try:
+                self._notify_conn.close()
+            except Exception:
+                pass
+            self._notify_conn = None
+
+    def send(self, channel: str, message: Dict[str, Any]):
+        """
+        Deliver a message to the channel's handler in every worker.
+        Falls back to handling it in this process only when the relay isn't running.
+        """
+        if self.running:
+            try:
+                self.notify(channel, message)
+                return
+            except Exception as e:
+                logger.error(f"Failed to NOTIFY on '{channel}', handling locally: {e}")
+        self.handle_locally(channel, message)
+
+    async def notify_async(self, db: AsyncSession, channel: str, message: Dict[str, Any]) -> bool:
+        """
+        send() for async handlers, as part of the caller's transaction: NOTIFY is
+        transactional, so the message goes out when the caller commits (and not at
+        all if it rolls back) for one extra statement and no extra commit.
+        Returns False when the relay isn't running; the caller then hands the
+        message to handle_locally() after committing.
+        """
+        if not self.running:
+            return False
+        await db.execute(
+            text("SELECT pg_notify(:channel, :payload)"),
+            {"channel": channel, "payload": json.dumps(message)}
+        )
+        return True
+
+    def handle_locally(self, channel: str, message: Dict[str, Any]):
+        self._handlers[channel](message)
+
+    def _raw_connection(self):
+        # Autocommit DBAPI connection outside the engine's pool
+        dialect = self._engine.dialect
+        cargs, cparams = dialect.create_connect_args(self._engine.url)
+        conn = dialect.dbapi.connect(*cargs, **cparams)
+        conn.autocommit = True
+        return conn
+
+    def _connect(self):
+        # Dedicated DBAPI connection so LISTEN doesn't pin a pooled connection
+        conn = self._raw_connection()
+        with conn.cursor() as cursor:
+            for channel in self._handlers:
+                cursor.execute(f"LISTEN {channel}")
+        return conn
+
+    def _listen(self):
+        while not self._stop.is_set():
+            conn = None
+            try:
+                conn = self._connect()
+                logger.info(f"Listening for notifications on channels {list(self._handlers)}")
+                while not self._stop.is_set():
+                    if select.select([conn], [], [], LISTEN_POLL_SECONDS) == ([], [], []):
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        notification = conn.notifies.pop(0)
+                        handler = self._handlers.get(notification.channel)
+                        if handler:
+                            handler(json.loads(notification.payload))
+            except Exception as e:
+                logger.error(f"Event relay listener error, reconnecting: {e}")
+                self._stop.wait(LISTEN_POLL_SECONDS)
+            finally:
+                if conn is not None:
+                    try:
+                        conn.close()
+                    except Exception:
+                        pass
+
+
+event_relay = PostgresEventRelay(engine)
+event_relay.add_channel(NOTIFY_CHANNEL, lambda event: broker.publish(event["game_id"], event))
+
+
+def publish_game_event(game_id: int, event_type: str, **payload):
+    """Publish an event of the given type for a game to subscribers on all workers."""
+    event_relay.send(NOTIFY_CHANNEL, {"type": event_type, "game_id": game_id, **payload})
+
+
+async def publish_game_event_async(db: AsyncSession, game_id: int, event_type: str, **payload) -> Callable[[], None]:
+    """
+    publish_game_event for async route handlers, sent with the handler's own
+    transaction (see PostgresEventRelay.notify_async). Call before committing,
+    and call the returned function after committing: it delivers the event in
+    this process when there is no Postgres relay, and does nothing otherwise.
+    """
+    event = {"type": event_type, "game_id": game_id, **payload}
+    if await event_relay.notify_async(db, NOTIFY_CHANNEL, event):
+        return lambda: None
+    return lambda: event_relay.handle_locally(NOTIFY_CHANNEL, event)
+
+
+def bump_state_version(db: Session, game_id: int):
+    """
+    Invalidate cached player state for a game (the state ETag).
+    Call before committing any change that all players can see; changes only
+    one team sees (its votes, roster, decision) use bump_team_state_version.
+    """
+    db.query(Game).filter(Game.id == game_id).update(
+        {Game.state_version: Game.state_version + 1},
+        synchronize_session=False
+    )
+
+
+def bump_team_state_version(db: Session, team_id: int):
+    """Invalidate cached player state for one team, leaving the other team's ETags valid."""
+    db.query(Team).filter(Team.id == team_id).update(
+        {Team.state_version: Team.state_version + 1},
+        synchronize_session=False
+    )
+
+
+def bump_scenario_state_versions(db: Session, scenario_id: int):
+    """Invalidate cached player state for every game running a scenario."""
+    db.query(Game).filter(Game.scenario_id == scenario_id).update(
+        {Game.state_version: Game.state_version + 1},
+        synchronize_session=False
+    )
+
+
+def publish_game_state(game: Game):
+    """Publish the game's current status/phase after a state transition."""
+    publish_game_event(
+        game.id,
+        "game_state",
+        status=game.status.value if game.status else None,
+        phase_state=game.phase_state.value if game.phase_state else None,
+        current_phase_id=game.current_phase_id,
+    )
@@ -1,8 +1,15 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from fastapi.staticfiles import StaticFiles
-from app.database import engine, Base
-from app.routers import auth, scenarios, games, players, decisions, scoreboard, artifacts, ce_plus
+from app.database import engine, async_engine, Base, SessionLocal
+from app.pool_metrics import pool_status
+from app.request_metrics import RequestMetricsMiddleware, instrument_engine, request_metrics
+from app.live import event_relay
+from app.report_exports import shutdown_render_pool
+from app.models import Scenario
+from app.scoring import validate_scoring_index
+from app.routers import auth, scenarios, games, players, decisions, scoreboard, artifacts, ce_plus, live
 
 # Create tables
 Base.metadata.create_all(bind=engine)
@@ -11,6 +18,7 @@ app = FastAPI(title="Cyber Tabletop API", version="1.0.0")
 
 # CORS middleware
 import os
+import logging
 cors_origins = os.getenv("CORS_ORIGINS", "http://localhost:5173,http://localhost:3000").split(",")
 app.add_middleware(
     CORSMiddleware,
@@ -20,6 +28,11 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-route latency and SQL statement counts, served by /metrics
+app.add_middleware(RequestMetricsMiddleware)
+instrument_engine(engine)
+instrument_engine(async_engine.sync_engine)
+
 # Include routers
 app.include_router(auth.router, prefix="/auth", tags=["auth"])
 app.include_router(scenarios.router, prefix="/scenarios", tags=["scenarios"])
@@ -27,10 +40,50 @@ app.include_router(games.router, prefix="/games", tags=["games"])
 app.include_router(players.router, prefix="", tags=["players"])
 app.include_router(decisions.router, prefix="/games", tags=["decisions"])
 app.include_router(scoreboard.router, prefix="/games", tags=["scoreboard"])
+app.include_router(live.router, prefix="/games", tags=["live"])
 app.include_router(artifacts.router, prefix="/artifacts", tags=["artifacts"])
 app.include_router(ce_plus.router, prefix="/ce-plus", tags=["ce-plus"])
 
 
+@app.on_event("startup")
+def start_event_relay():
+    # Relay live game events between workers (no-op unless using Postgres)
+    event_relay.start()
+
+
+@app.on_event("startup")
+def check_scoring_matrices():
+    # Surface scoring matrix / available_actions drift before a live game
+    db = SessionLocal()
+    try:
+        validate_scoring_index(db.query(Scenario).all())
+    except Exception as e:
+        logging.getLogger(__name__).error(f"Could not validate scoring matrices: {e}")
+    finally:
+        db.close()
+
+
+@app.on_event("startup")
+def build_ce_plus_catalog():
+    # Build the CE Plus test files once, before the first download
+    ce_plus.get_catalog()
+
+
+@app.on_event("shutdown")
+def stop_event_relay():
+    event_relay.stop()
+
+
+@app.on_event("shutdown")
+def stop_report_renderers():
+    shutdown_render_pool()
+
+
+@app.on_event("shutdown")
+async def close_async_engine():
+    await async_engine.dispose()
+
+
 @app.get("/")
 def root():
     return {"message": "Cyber Tabletop API"}
@@ -40,3 +93,15 @@ def root():
 def health():
     return {"status": "healthy"}
 
+
+@app.get("/internal/pool")
+def db_pool_status():
+    # This worker's connection pools; not proxied by nginx (see nginx.conf)
+    return {"sync": pool_status(engine), "async": pool_status(async_engine)}
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    # Prometheus scrape target for this worker; not proxied by nginx (see nginx.conf)
+    return PlainTextResponse(request_metrics.render(), media_type="text/plain; version=0.0.4")
+
@@ -1,9 +1,12 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, JSON, Enum as SQLEnum, Boolean
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, JSON, LargeBinary, Enum as SQLEnum, Boolean, Index
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import relationship, deferred, validates
 from sqlalchemy.sql import func
 from datetime import datetime
 import enum
-from app.database import Base
+import hashlib
+from app.database import Base, dialect_insert
+from app.artifact_storage import compress_content, decompress_content, blob_sha256_from_url
 
 
 class GameStatus(str, enum.Enum):
@@ -60,6 +63,9 @@ class Scenario(Base):
 
 class ScenarioPhase(Base):
     __tablename__ = "scenario_phases"
+    __table_args__ = (
+        Index("ix_scenario_phases_scenario_order", "scenario_id", "order_index"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     scenario_id = Column(Integer, ForeignKey("scenarios.id"), nullable=False)
@@ -72,6 +78,7 @@ class ScenarioPhase(Base):
     miro_frame_url = Column(String, nullable=True)
     available_actions = Column(JSON, nullable=True)  # Phase-specific actions: {"red": [...], "blue": [...]}
     gm_prompt_questions = Column(JSON, nullable=True)  # List of 2 prompt questions for GM: ["question1", "question2"]
+    action_scores = Column(JSON, nullable=True)  # Scoring weights per action: {"red": {"action": 10, ...}, "blue": {...}}
 
     scenario = relationship("Scenario", back_populates="phases")
     artifacts = relationship("Artifact", secondary="scenario_phase_artifacts", back_populates="phases")
@@ -85,12 +92,83 @@ class Artifact(Base):
     type = Column(SQLEnum(ArtifactType), nullable=False)
     description = Column(Text)
     file_url = Column(String, nullable=True)
+    blob_sha256 = Column(String(64), nullable=True, index=True)  # Uploaded file this artifact references (set from file_url)
     embed_url = Column(String, nullable=True)
-    content = Column(Text, nullable=True)  # Store text content directly in database
+    # Text content stored in database, compressed when that saves space (see app.artifact_storage).
+    # Read and write it through the content property; columns are deferred so listing artifacts doesn't load them
+    content_text = deferred(Column("content", Text, nullable=True))  # Uncompressed content
+    content_blob = deferred(Column(LargeBinary, nullable=True))  # Compressed content
+    content_encoding = Column(String(16), nullable=True)  # Codec of content_blob, e.g. "gzip"; NULL means content_text
+    content_hash = Column(String(64), nullable=True)  # sha256 of the uncompressed content
     notes_for_gm = Column(Text, nullable=True)
 
     phases = relationship("ScenarioPhase", secondary="scenario_phase_artifacts", back_populates="artifacts")
 
+    @property
+    def content(self):
+        return decompress_content(self.content_encoding, self.content_blob, self.content_text)
+
+    @content.setter
+    def content(self, content):
+        self.content_hash = artifact_content_hash(content)
+        encoding, blob = compress_content(content) if content else (None, None)
+        self.content_encoding = encoding
+        self.content_blob = blob
+        self.content_text = content if blob is None else None
+
+    @validates("file_url")
+    def set_blob_sha256(self, key, file_url):
+        self.blob_sha256 = blob_sha256_from_url(file_url)
+        return file_url
+
+
+def artifact_content_hash(content):
+    """sha256 hex digest of artifact text content, or None if there is no content."""
+    if not content:
+        return None
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+class ArtifactBlob(Base):
+    """An uploaded file, stored once under its sha256 (see app.artifact_blobs)."""
+    __tablename__ = "artifact_blobs"
+
+    sha256 = Column(String(64), primary_key=True)
+    size = Column(Integer, nullable=False)
+    media_type = Column(String, nullable=True)
+    ref_count = Column(Integer, nullable=False, default=0, server_default="0")  # Artifacts referencing this blob
+    uploaded_at = Column(DateTime(timezone=True), server_default=func.now())  # Last time these bytes were uploaded
+
+
+def _adjust_blob_refs(connection, blob_sha256, delta):
+    if blob_sha256:
+        connection.execute(
+            ArtifactBlob.__table__.update()
+            .where(ArtifactBlob.sha256 == blob_sha256)
+            .values(ref_count=ArtifactBlob.ref_count + delta)
+        )
+
+
+# Blob reference counts follow Artifact.blob_sha256 in the same transaction
+@event.listens_for(Artifact, "after_insert")
+def _artifact_inserted(mapper, connection, artifact):
+    _adjust_blob_refs(connection, artifact.blob_sha256, 1)
+
+
+@event.listens_for(Artifact, "after_update")
+def _artifact_updated(mapper, connection, artifact):
+    history = inspect(artifact).attrs.blob_sha256.history
+    if history.has_changes():
+        for old_sha256 in history.deleted:
+            _adjust_blob_refs(connection, old_sha256, -1)
+        for new_sha256 in history.added:
+            _adjust_blob_refs(connection, new_sha256, 1)
+
+
+@event.listens_for(Artifact, "after_delete")
+def _artifact_deleted(mapper, connection, artifact):
+    _adjust_blob_refs(connection, artifact.blob_sha256, -1)
+
 
 # Join table for scenario phases and artifacts
 from sqlalchemy import Table
@@ -113,12 +191,14 @@ class Game(Base):
     current_phase_id = Column(Integer, ForeignKey("scenario_phases.id"), nullable=True)
     phase_state = Column(SQLEnum(PhaseState), default=PhaseState.NOT_STARTED)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    finished_at = Column(DateTime(timezone=True), nullable=True)  # Set when the game is finished
     gm_id = Column(Integer, ForeignKey("gm_users.id"), nullable=False)
     red_team_code = Column(String, unique=True, nullable=False)
     blue_team_code = Column(String, unique=True, nullable=False)
     audience_code = Column(String, unique=True, nullable=True)
     miro_session_url = Column(String, nullable=True)
     settings = Column(JSON, default={})
+    state_version = Column(Integer, nullable=False, default=0, server_default="0")  # Bumped on every player-visible change (ETag)
 
     scenario = relationship("Scenario")
     current_phase = relationship("ScenarioPhase", foreign_keys=[current_phase_id])
@@ -128,12 +208,16 @@ class Game(Base):
 
 class Team(Base):
     __tablename__ = "teams"
+    __table_args__ = (
+        Index("ix_teams_code", "code"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     game_id = Column(Integer, ForeignKey("games.id"), nullable=False)
     name = Column(String, nullable=False)
     code = Column(String, nullable=False)
     role = Column(String, nullable=False)  # "red" or "blue"
+    state_version = Column(Integer, nullable=False, default=0, server_default="0")  # Bumped on changes only this team's players see (ETag)
 
     game = relationship("Game", back_populates="teams")
     players = relationship("Player", back_populates="team", cascade="all, delete-orphan")
@@ -141,6 +225,9 @@ class Team(Base):
 
 class Player(Base):
     __tablename__ = "players"
+    __table_args__ = (
+        Index("ix_players_game_team", "game_id", "team_id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     game_id = Column(Integer, ForeignKey("games.id"), nullable=False)
@@ -154,6 +241,9 @@ class Player(Base):
 
 class PhaseDecision(Base):
     __tablename__ = "phase_decisions"
+    __table_args__ = (
+        Index("ix_phase_decisions_game_phase_team", "game_id", "phase_id", "team_id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     game_id = Column(Integer, ForeignKey("games.id"), nullable=False)
@@ -173,6 +263,11 @@ class PhaseDecision(Base):
 
 class PlayerVote(Base):
     __tablename__ = "player_votes"
+    __table_args__ = (
+        Index("ix_player_votes_game_phase_team", "game_id", "phase_id", "team_id"),
+        # One vote per player per phase (re-voting updates it)
+        Index("uq_player_votes_player_phase", "player_id", "phase_id", unique=True),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     game_id = Column(Integer, ForeignKey("games.id"), nullable=False)
@@ -183,6 +278,7 @@ class PlayerVote(Base):
     justification = Column(Text, nullable=True)  # Kept for backward compatibility
     effectiveness_rating = Column(Integer, nullable=True)  # 1-10 rating
     comments = Column(String(500), nullable=True)  # Max 500 characters
+    previous_action = Column(String, nullable=True)  # Action replaced by the last re-vote (NULL until then)
     voted_at = Column(DateTime(timezone=True), server_default=func.now())
 
     game = relationship("Game")
@@ -191,8 +287,102 @@ class PlayerVote(Base):
     player = relationship("Player")
 
 
+class VoteTally(Base):
+    """Running vote counts per team and phase, kept in step with PlayerVote and Player rows."""
+    __tablename__ = "vote_tallies"
+    __table_args__ = (
+        Index("uq_vote_tallies_game_phase_team", "game_id", "phase_id", "team_id", unique=True),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    game_id = Column(Integer, ForeignKey("games.id"), nullable=False)
+    phase_id = Column(Integer, ForeignKey("scenario_phases.id"), nullable=False)
+    team_id = Column(Integer, ForeignKey("teams.id"), nullable=False)
+    votes_submitted = Column(Integer, nullable=False, default=0, server_default="0")
+    total_players = Column(Integer, nullable=False, default=0, server_default="0")  # Team roster size
+    action_counts = Column(JSON, nullable=False, default=dict)  # {selected_action: votes}
+    updated_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+def _adjust_vote_tally(connection, game_id, phase_id, team_id, voted, action_changes):
+    # Returns the team's (votes_submitted, total_players) after the change
+    insert = dialect_insert(connection)
+    table = VoteTally.__table__
+    key = (table.c.game_id == game_id, table.c.phase_id == phase_id, table.c.team_id == team_id)
+    roster = select(func.count(Player.id)).where(
+        Player.game_id == game_id, Player.team_id == team_id
+    ).scalar_subquery()
+    statement = insert(table).values(
+        game_id=game_id, phase_id=phase_id, team_id=team_id, votes_submitted=voted,
+        total_players=roster, action_counts={}, updated_at=func.now()
+    )
+    # The upsert locks the tally row, so the read-modify-write of action_counts
+    # below can't interleave with another vote for the same team
+    tally = connection.execute(statement.on_conflict_do_update(
+        index_elements=[table.c.game_id, table.c.phase_id, table.c.team_id],
+        set_={
+            "votes_submitted": table.c.votes_submitted + statement.excluded.votes_submitted,
+            "updated_at": statement.excluded.updated_at,
+        }
+    ).returning(table.c.id, table.c.votes_submitted, table.c.total_players, table.c.action_counts)).one()
+
+    if tally.votes_submitted <= 0:
+        # Last vote for this team and phase gone: drop the row, as a rebuild would
+        connection.execute(table.delete().where(table.c.id == tally.id))
+        return (0, tally.total_players)
+    action_counts = dict(tally.action_counts or {})
+    for action, change in action_changes.items():
+        action_counts[action] = action_counts.get(action, 0) + change
+        if action_counts[action] <= 0:
+            del action_counts[action]
+    connection.execute(table.update().where(table.c.id == tally.id).values(action_counts=action_counts))
+    return (tally.votes_submitted, tally.total_players)
+
+
+def _adjust_roster_size(connection, game_id, team_id, change):
+    table = VoteTally.__table__
+    connection.execute(table.update().where(
+        table.c.game_id == game_id, table.c.team_id == team_id
+    ).values(total_players=table.c.total_players + change))
+
+
+# Vote tallies follow PlayerVote and Player rows in the same transaction.
+# Bulk query deletes bypass these events: delete the game's VoteTally rows alongside.
+@event.listens_for(PlayerVote, "after_insert")
+def _player_vote_inserted(mapper, connection, vote):
+    _adjust_vote_tally(connection, vote.game_id, vote.phase_id, vote.team_id, 1, {vote.selected_action: 1})
+
+
+@event.listens_for(PlayerVote, "after_update")
+def _player_vote_updated(mapper, connection, vote):
+    history = inspect(vote).attrs.selected_action.history
+    if not history.deleted or history.deleted[0] == vote.selected_action:
+        return
+    _adjust_vote_tally(connection, vote.game_id, vote.phase_id, vote.team_id, 0, {
+        history.deleted[0]: -1, vote.selected_action: 1
+    })
+
+
+@event.listens_for(PlayerVote, "after_delete")
+def _player_vote_deleted(mapper, connection, vote):
+    _adjust_vote_tally(connection, vote.game_id, vote.phase_id, vote.team_id, -1, {vote.selected_action: -1})
+
+
+@event.listens_for(Player, "after_insert")
+def _player_inserted(mapper, connection, player):
+    _adjust_roster_size(connection, player.game_id, player.team_id, 1)
+
+
+@event.listens_for(Player, "after_delete")
+def _player_deleted(mapper, connection, player):
+    _adjust_roster_size(connection, player.game_id, player.team_id, -1)
+
+
 class ScoreEvent(Base):
     __tablename__ = "score_events"
+    __table_args__ = (
+        Index("ix_score_events_game_team_phase", "game_id", "team_id", "phase_id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     game_id = Column(Integer, ForeignKey("games.id"), nullable=False)
@@ -205,6 +395,73 @@ class ScoreEvent(Base):
     game = relationship("Game")
 
 
+class TeamPhaseScore(Base):
+    """Running SUM(score_events.delta) per team and phase, kept in step with ScoreEvent rows."""
+    __tablename__ = "team_phase_scores"
+    __table_args__ = (
+        Index("uq_team_phase_scores_game_team_phase", "game_id", "team_id", "phase_id", unique=True),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    game_id = Column(Integer, ForeignKey("games.id"), nullable=False)
+    team_id = Column(Integer, ForeignKey("teams.id"), nullable=False)
+    phase_id = Column(Integer, ForeignKey("scenario_phases.id"), nullable=False)
+    score = Column(Integer, nullable=False, default=0, server_default="0")
+    event_count = Column(Integer, nullable=False, default=0, server_default="0")
+    updated_at = Column(DateTime(timezone=True), server_default=func.now())  # Last score event change
+
+
+def _adjust_team_phase_score(connection, game_id, team_id, phase_id, delta, events):
+    # Atomic upsert, so concurrent scoring of the same team and phase can't lose an update
+    insert = dialect_insert(connection)
+    table = TeamPhaseScore.__table__
+    statement = insert(table).values(
+        game_id=game_id, team_id=team_id, phase_id=phase_id, score=delta, event_count=events, updated_at=func.now()
+    )
+    connection.execute(statement.on_conflict_do_update(
+        index_elements=[table.c.game_id, table.c.team_id, table.c.phase_id],
+        set_={
+            "score": table.c.score + statement.excluded.score,
+            "event_count": table.c.event_count + statement.excluded.event_count,
+            "updated_at": statement.excluded.updated_at,
+        }
+    ))
+    if events < 0:
+        # Last event for this team and phase gone: drop the row, as a rebuild would
+        connection.execute(table.delete().where(
+            table.c.game_id == game_id,
+            table.c.team_id == team_id,
+            table.c.phase_id == phase_id,
+            table.c.event_count <= 0
+        ))
+
+
+# Team phase totals follow ScoreEvent rows in the same transaction.
+# Bulk query deletes bypass these events: delete the game's TeamPhaseScore rows alongside.
+@event.listens_for(ScoreEvent, "after_insert")
+def _score_event_inserted(mapper, connection, score_event):
+    _adjust_team_phase_score(connection, score_event.game_id, score_event.team_id, score_event.phase_id, score_event.delta, 1)
+
+
+@event.listens_for(ScoreEvent, "after_update")
+def _score_event_updated(mapper, connection, score_event):
+    state = inspect(score_event)
+    keys = ("game_id", "team_id", "phase_id", "delta")
+    if not any(state.attrs[key].history.has_changes() for key in keys):
+        return
+    old = {
+        key: state.attrs[key].history.deleted[0] if state.attrs[key].history.deleted else getattr(score_event, key)
+        for key in keys
+    }
+    _adjust_team_phase_score(connection, old["game_id"], old["team_id"], old["phase_id"], -old["delta"], -1)
+    _adjust_team_phase_score(connection, score_event.game_id, score_event.team_id, score_event.phase_id, score_event.delta, 1)
+
+
+@event.listens_for(ScoreEvent, "after_delete")
+def _score_event_deleted(mapper, connection, score_event):
+    _adjust_team_phase_score(connection, score_event.game_id, score_event.team_id, score_event.phase_id, -score_event.delta, -1)
+
+
 class PhaseGMNotes(Base):
     __tablename__ = "phase_gm_notes"
 
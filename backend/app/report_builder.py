@@ -0,0 +1,176 @@
+"""
+After Action Report builder.
+Computes the AAR data for a game from two bulk queries (phases with GM notes,
+votes with players and teams) in a single pass, and reuses the persisted
+report while nothing it depends on has changed.
+"""
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.models import Game, ScenarioPhase, Player, Team, PlayerVote, PhaseGMNotes, AfterActionReport
+
+
+def risk_rating_for(average_rating: Optional[float]) -> str:
+    """Convert an average effectiveness rating to a risk rating (industry standard: NIST/FIRST)."""
+    if not average_rating:
+        return "Not Rated"
+    if average_rating <= 2:
+        return "Critical"
+    elif average_rating <= 4:
+        return "High"
+    elif average_rating <= 6:
+        return "Medium"
+    elif average_rating <= 8:
+        return "Low"
+    return "Very Low"
+
+
+def build_report_data(db: Session, game: Game, gm_id: int) -> Dict[str, Any]:
+    """Compute the full AAR data for a game."""
+    phase_rows = db.query(ScenarioPhase.id, ScenarioPhase.name, ScenarioPhase.order_index, PhaseGMNotes.notes).outerjoin(
+        PhaseGMNotes,
+        (PhaseGMNotes.phase_id == ScenarioPhase.id) &
+        (PhaseGMNotes.game_id == game.id) &
+        (PhaseGMNotes.gm_id == gm_id)
+    ).filter(
+        ScenarioPhase.scenario_id == game.scenario_id
+    ).order_by(ScenarioPhase.order_index, PhaseGMNotes.id).all()
+
+    vote_rows = db.query(
+        PlayerVote.phase_id,
+        PlayerVote.effectiveness_rating,
+        PlayerVote.comments,
+        Player.display_name,
+        Team.role
+    ).outerjoin(
+        Player, Player.id == PlayerVote.player_id
+    ).outerjoin(
+        Team, Team.id == PlayerVote.team_id
+    ).filter(
+        PlayerVote.game_id == game.id
+    ).order_by(PlayerVote.id).all()
+
+    # Single pass over votes: per-phase response count, ratings and comments
+    responses = defaultdict(int)
+    ratings = defaultdict(list)
+    comments = defaultdict(list)
+    for row in vote_rows:
+        responses[row.phase_id] += 1
+        if row.effectiveness_rating is not None:
+            ratings[row.phase_id].append(row.effectiveness_rating)
+        if row.comments:
+            comments[row.phase_id].append({
+                "player_name": row.display_name or "Unknown",
+                "team_role": row.role or "unknown",
+                "rating": row.effectiveness_rating,
+                "comments": row.comments
+            })
+
+    phase_analyses = []
+    all_ratings = []
+    seen_phases = set()
+    for phase in phase_rows:
+        # Outer join yields one row per phase (first matching note wins)
+        if phase.id in seen_phases:
+            continue
+        seen_phases.add(phase.id)
+
+        if not responses[phase.id]:
+            phase_analyses.append({
+                "phase_id": phase.id,
+                "phase_name": phase.name,
+                "phase_order": phase.order_index,
+                "average_rating": None,
+                "risk_rating": "Not Rated",
+                "total_responses": 0,
+                "comments": [],
+                "gm_notes": None
+            })
+            continue
+
+        phase_ratings = ratings[phase.id]
+        avg_rating = sum(phase_ratings) / len(phase_ratings) if phase_ratings else None
+        if avg_rating:
+            all_ratings.append(avg_rating)
+
+        phase_analyses.append({
+            "phase_id": phase.id,
+            "phase_name": phase.name,
+            "phase_order": phase.order_index,
+            "average_rating": round(avg_rating, 2) if avg_rating else None,
+            "risk_rating": risk_rating_for(avg_rating),
+            "total_responses": responses[phase.id],
+            "comments": comments[phase.id],
+            "gm_notes": phase.notes
+        })
+
+    overall_avg = sum(all_ratings) / len(all_ratings) if all_ratings else 0
+
+    return {
+        "game_id": game.id,
+        "scenario_name": game.scenario.name if game.scenario else "Unknown",
+        "generated_at": datetime.now().isoformat(),
+        "overall_risk_rating": risk_rating_for(overall_avg),
+        "overall_risk_score": round(overall_avg, 2),
+        "phase_analyses": phase_analyses,
+        # State versions the report was built from (see report_state_version)
+        "state_version": report_state_version(db, game)
+    }
+
+
+def report_state_version(db: Session, game: Game) -> str:
+    """The game's and its teams' state versions: changes with any player-visible state (votes included)."""
+    team_versions = db.query(Team.state_version).filter(Team.game_id == game.id).order_by(Team.id).all()
+    return "-".join(str(version) for version in [game.state_version, *(row[0] for row in team_versions)])
+
+
+def _report_is_current(db: Session, report: AfterActionReport, game: Game, gm_id: int) -> bool:
+    """
+    A stored report is current if no player-visible state changed since it was
+    built (votes, phases, scenario) and no GM note was written after generated_at.
+    Notes written in the same second as the report count as changed, since
+    SQLite timestamps only have second resolution.
+    """
+    if not report.report_data or report.report_data.get("state_version") != report_state_version(db, game):
+        return False
+    # Compare against the stored column rather than a bound value so both sides
+    # use the database's own timestamp representation
+    notes_changed = db.query(func.count(PhaseGMNotes.id)).join(
+        AfterActionReport, AfterActionReport.id == report.id
+    ).filter(
+        PhaseGMNotes.game_id == game.id,
+        PhaseGMNotes.gm_id == gm_id,
+        func.coalesce(PhaseGMNotes.updated_at, PhaseGMNotes.created_at) >= AfterActionReport.generated_at
+    ).scalar()
+    return not notes_changed
+
+
+def get_or_build_report(db: Session, game: Game, gm_id: int) -> Dict[str, Any]:
+    """Return the persisted report data for a game, rebuilding and saving it if stale."""
+    existing_report = db.query(AfterActionReport).filter(
+        AfterActionReport.game_id == game.id
+    ).first()
+
+    if existing_report and _report_is_current(db, existing_report, game, gm_id):
+        return existing_report.report_data
+
+    report_data = build_report_data(db, game, gm_id)
+    if existing_report:
+        existing_report.report_data = report_data
+        existing_report.overall_risk_rating = report_data["overall_risk_rating"]
+        existing_report.overall_risk_score = report_data["overall_risk_score"]
+        existing_report.generated_at = func.now()
+    else:
+        db.add(AfterActionReport(
+            game_id=game.id,
+            overall_risk_rating=report_data["overall_risk_rating"],
+            overall_risk_score=report_data["overall_risk_score"],
+            report_data=report_data,
+            gm_id=gm_id
+        ))
+    db.commit()
+    return report_data
@@ -0,0 +1,211 @@
+"""
+Rendered After Action Report exports.
+Word/PDF files are rendered once per distinct report and kept on disk, named by
+a fingerprint of the report data, so repeated downloads are a file read.
+
+Rendering runs in a small process pool rather than in the request worker.
+Export jobs are tracked on disk next to the rendered files (a marker while
+rendering, an error file on failure), so any uvicorn worker can answer a
+job's status regardless of which worker started it.
+"""
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from app.report_generator import generate_word_report, generate_pdf_report
+
+logger = logging.getLogger(__name__)
+
+# Stored alongside uploaded artifacts so exports survive container restarts
+EXPORTS_DIR = Path(os.getenv("REPORT_EXPORTS_DIR", "/app/artifacts/exports"))
+EXPORTS_DIR.mkdir(exist_ok=True, parents=True)
+
+# Renderer processes per uvicorn worker
+RENDER_WORKERS = int(os.getenv("REPORT_RENDER_WORKERS", "1"))
+
+# A render marker older than this is assumed to belong to a crashed worker
+RENDER_TIMEOUT_SECONDS = 300
+
+# How often a request waiting on a render checks for the finished file
+RENDER_POLL_SECONDS = 0.2
+
+# Bump when report_generator output changes so stale renders are not served
+RENDER_VERSION = 1
+
+# Export format -> (file extension, media type, renderer)
+EXPORT_FORMATS = {
+    "word": ("docx", "application/vnd.openxmlformats-officedocument.wordprocessingml.document", generate_word_report),
+    "pdf": ("pdf", "application/pdf", generate_pdf_report),
+}
+
+# Export job statuses
+JOB_PENDING = "pending"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+
+
+def report_fingerprint(report_data: Dict[str, Any]) -> str:
+    """Stable hash of the report data (and renderer version)."""
+    payload = json.dumps(report_data, sort_keys=True, default=str)
+    return hashlib.sha256(f"{RENDER_VERSION}:{payload}".encode("utf-8")).hexdigest()[:32]
+
+
+def export_etag(fingerprint: str, fmt: str) -> str:
+    """Strong ETag for a rendered export: identical report data renders identical bytes."""
+    return f'"{fingerprint}-{fmt}"'
+
+
+def export_job_id(fingerprint: str, fmt: str) -> str:
+    """Job ids name the render they produce, so they are the same in every worker."""
+    return f"{fmt}-{fingerprint}"
+
+
+def parse_export_job_id(job_id: str) -> Optional[tuple]:
+    """Split a job id into (fmt, fingerprint), or None if it is malformed."""
+    fmt, _, fingerprint = job_id.partition("-")
+    if fmt not in EXPORT_FORMATS or len(fingerprint) != 32 or not all(c in "0123456789abcdef" for c in fingerprint):
+        return None
+    return fmt, fingerprint
+
+
+def export_path(game_id: int, fingerprint: str, fmt: str) -> Path:
+    extension = EXPORT_FORMATS[fmt][0]
+    return EXPORTS_DIR / f"aar-{game_id}-{fingerprint}.{extension}"
+
+
+def _marker_path(path: Path) -> Path:
+    return path.with_name(path.name + ".rendering")
+
+
+def _error_path(path: Path) -> Path:
+    return path.with_name(path.name + ".error")
+
+
+def render_export(report_data: Dict[str, Any], fmt: str, path: str):
+    """
+    Render an export to path. Runs in a renderer process.
+    Writes to a temp file and renames so readers never see a partial file.
+    """
+    path = Path(path)
+    extension, _, renderer = EXPORT_FORMATS[fmt]
+    rendered = renderer(report_data)
+
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(rendered.getvalue())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+    # Older renders of this game's report are superseded
+    game_prefix = path.name.rsplit("-", 1)[0]
+    for stale in path.parent.glob(f"{game_prefix}-*.{extension}"):
+        if stale != path:
+            stale.unlink(missing_ok=True)
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn: forking a worker that has DB connections and threads is unsafe
+            _pool = ProcessPoolExecutor(
+                max_workers=RENDER_WORKERS,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return _pool
+
+
+def shutdown_render_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+def _start_render(game_id: int, report_data: Dict[str, Any], fingerprint: str, fmt: str) -> Future:
+    path = export_path(game_id, fingerprint, fmt)
+    marker = _marker_path(path)
+    marker.touch()
+    _error_path(path).unlink(missing_ok=True)
+
+    future = _get_pool().submit(render_export, report_data, fmt, str(path))
+
+    def finished(f: Future):
+        error = f.exception() if not f.cancelled() else None
+        if error is not None:
+            logger.error(f"Rendering {fmt} export for game {game_id} failed: {error}")
+            _error_path(path).write_text(str(error) or error.__class__.__name__)
+        marker.unlink(missing_ok=True)
+
+    future.add_done_callback(finished)
+    return future
+
+
+def _is_rendering(path: Path) -> bool:
+    try:
+        return time.time() - _marker_path(path).stat().st_mtime < RENDER_TIMEOUT_SECONDS
+    except FileNotFoundError:
+        return False
+
+
+def submit_export(game_id: int, report_data: Dict[str, Any], fingerprint: str, fmt: str) -> str:
+    """Start rendering an export in the background unless it is rendered or rendering already."""
+    path = export_path(game_id, fingerprint, fmt)
+    if not path.exists() and not _is_rendering(path):
+        _start_render(game_id, report_data, fingerprint, fmt)
+    return export_job_id(fingerprint, fmt)
+
+
+def wait_for_export(game_id: int, report_data: Dict[str, Any], fingerprint: str, fmt: str) -> Path:
+    """
+    Return the rendered export file, rendering it (and waiting) if needed.
+    Joins a render already in flight in any worker instead of starting a second one.
+    """
+    submit_export(game_id, report_data, fingerprint, fmt)
+    path = export_path(game_id, fingerprint, fmt)
+    deadline = time.monotonic() + RENDER_TIMEOUT_SECONDS
+    while not path.exists():
+        if not _is_rendering(path) and not path.exists():
+            error_path = _error_path(path)
+            error = error_path.read_text() if error_path.exists() else "render did not finish"
+            raise RuntimeError(f"Rendering {fmt} export for game {game_id} failed: {error}")
+        if time.monotonic() > deadline:
+            raise TimeoutError(f"Rendering {fmt} export for game {game_id} timed out")
+        time.sleep(RENDER_POLL_SECONDS)
+    return path
+
+
+def export_job_status(game_id: int, fingerprint: str, fmt: str) -> Optional[Dict[str, Any]]:
+    """Status of an export job, or None if no such job exists."""
+    path = export_path(game_id, fingerprint, fmt)
+    if path.exists():
+        return {"status": JOB_DONE, "error": None}
+    if _is_rendering(path):
+        return {"status": JOB_PENDING, "error": None}
+    error_path = _error_path(path)
+    if error_path.exists():
+        return {"status": JOB_FAILED, "error": error_path.read_text()}
+    return None
+
+
+def remove_exports(game_id: int):
+    """Delete all rendered exports (and job files) for a game."""
+    for path in EXPORTS_DIR.glob(f"aar-{game_id}-*"):
+        path.unlink(missing_ok=True)
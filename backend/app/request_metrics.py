@@ -0,0 +1,208 @@
+"""
+Per-route request metrics.
+RequestMetricsMiddleware times each request and, through SQLAlchemy cursor
+events, counts the SQL statements it runs and the time spent in them. Figures
+are kept per route template (/games/{game_id}/scoreboard, not the raw path)
+and served in Prometheus text format by /metrics. With SERVER_TIMING enabled
+each response also carries a Server-Timing header for the browser dev tools.
+Like the pool stats, figures are per process: each uvicorn worker has its own.
+"""
+import os
+import threading
+import time
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import event
+
+SERVER_TIMING = os.getenv("SERVER_TIMING", "false").lower() in ("1", "true", "yes")
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+class RequestTimings:
+    """SQL statements and DB time of one request."""
+    __slots__ = ("statements", "db_seconds")
+
+    def __init__(self):
+        self.statements = 0
+        self.db_seconds = 0.0
+
+
+# Set by the middleware; sync endpoints (threadpool) and the async engine's
+# greenlets run in a copy of the request's context, so they see the same object
+_current_timings: ContextVar[Optional[RequestTimings]] = ContextVar("request_timings", default=None)
+
+
+class Histogram:
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.bucket_counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.count += 1
+        self.sum += value
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.bucket_counts[index] += 1
+                break
+
+
+class RouteMetrics:
+    def __init__(self):
+        self.responses: Dict[int, int] = {}
+        self.duration = Histogram(DURATION_BUCKETS)
+        self.statements = Histogram(STATEMENT_BUCKETS)
+        self.db_duration = Histogram(DURATION_BUCKETS)
+
+
+class RequestMetrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.routes: Dict[Tuple[str, str], RouteMetrics] = {}
+
+    def record(self, method: str, route: str, status: int, seconds: float, timings: RequestTimings):
+        with self._lock:
+            metrics = self.routes.get((method, route))
+            if metrics is None:
+                metrics = self.routes[(method, route)] = RouteMetrics()
+            metrics.responses[status] = metrics.responses.get(status, 0) + 1
+            metrics.duration.observe(seconds)
+            metrics.statements.observe(timings.statements)
+            metrics.db_duration.observe(timings.db_seconds)
+
+    def render(self) -> str:
+        """All routes in Prometheus text exposition format."""
+        with self._lock:
+            routes = sorted(self.routes.items())
+            lines = [
+                "# HELP http_requests_total Responses by route and status code.",
+                "# TYPE http_requests_total counter",
+            ]
+            for (method, route), metrics in routes:
+                for status, count in sorted(metrics.responses.items()):
+                    lines.append(f"http_requests_total{_labels(method, route, status=status)} {count}")
+            for name, help_text, attribute in (
+                ("http_request_duration_seconds", "Time to the response headers.", "duration"),
+                ("http_request_db_statements", "SQL statements run per request.", "statements"),
+                ("http_request_db_duration_seconds", "Time spent in SQL statements per request.", "db_duration"),
+            ):
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} histogram")
+                for (method, route), metrics in routes:
+                    lines.extend(_histogram_lines(name, method, route, getattr(metrics, attribute)))
+        return "\n".join(lines) + "\n"
+
+
+request_metrics = RequestMetrics()
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(method: str, route: str, **extra) -> str:
+    labels = {"method": method, "route": route, **extra}
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+def _histogram_lines(name: str, method: str, route: str, histogram: Histogram) -> List[str]:
+    lines = []
+    cumulative = 0
+    for bound, count in zip(histogram.buckets, histogram.bucket_counts):
+        cumulative += count
+        lines.append(f"{name}_bucket{_labels(method, route, le=bound)} {cumulative}")
+    lines.append(f"{name}_bucket{_labels(method, route, le='+Inf')} {histogram.count}")
+    lines.append(f"{name}_sum{_labels(method, route)} {histogram.sum:.6f}")
+    lines.append(f"{name}_count{_labels(method, route)} {histogram.count}")
+    return lines
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    timings = _current_timings.get()
+    if timings is not None and context is not None:
+        timings.statements += 1
+        context._request_metrics_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    timings = _current_timings.get()
+    started = getattr(context, "_request_metrics_started", None)
+    if timings is not None and started is not None:
+        timings.db_seconds += time.perf_counter() - started
+
+
+def instrument_engine(engine):
+    """Count an engine's statements in the current request (pass async_engine.sync_engine for async engines)."""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+_route_templates: Dict[object, str] = {}
+
+
+def _route_template(scope) -> str:
+    # The router puts the matched endpoint in the scope; map it back to its path template
+    endpoint = scope.get("endpoint")
+    if endpoint is None:
+        return UNMATCHED_ROUTE
+    if endpoint not in _route_templates and "app" in scope:
+        for route in scope["app"].routes:
+            _route_templates[getattr(route, "endpoint", None) or getattr(route, "app", None)] = route.path
+    return _route_templates.get(endpoint, UNMATCHED_ROUTE)
+
+
+def _server_timing(seconds: float, timings: RequestTimings) -> str:
+    statements = f"{timings.statements} SQL statement{'' if timings.statements == 1 else 's'}"
+    return f'app;dur={seconds * 1000:.1f}, db;dur={timings.db_seconds * 1000:.1f};desc="{statements}"'
+
+
+class RequestMetricsMiddleware:
+    """
+    Records each HTTP request's latency and SQL usage when its response starts
+    (for streamed responses such as the live event stream, the time to the
+    headers). Requests that fail without a response are recorded as 500s.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings()
+        token = _current_timings.set(timings)
+        started = time.perf_counter()
+        recorded = False
+
+        async def send_with_metrics(message):
+            nonlocal recorded
+            if message["type"] == "http.response.start" and not recorded:
+                recorded = True
+                seconds = time.perf_counter() - started
+                request_metrics.record(scope["method"], _route_template(scope), message["status"], seconds, timings)
+                if SERVER_TIMING:
+                    headers = list(message.get("headers", []))
+                    headers.append((b"server-timing", _server_timing(seconds, timings).encode("latin-1")))
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_metrics)
+        finally:
+            if not recorded:
+                request_metrics.record(
+                    scope["method"], _route_template(scope), 500, time.perf_counter() - started, timings
+                )
+            _current_timings.reset(token)
@@ -1,21 +1,32 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Request, Response
 from sqlalchemy.orm import Session
 from typing import Optional
-import shutil
+import os
 from pathlib import Path
 from app.database import get_db
 from app.auth import get_current_gm
-from app.models import Artifact
+from app.models import Artifact, ArtifactBlob, ScenarioPhase, scenario_phase_artifacts
 from app.schemas import ArtifactResponse
+from app.http_cache import etag_matches, accepts_encoding
+from app.live import bump_scenario_state_versions
+from app.artifact_storage import decompress_content, blob_sha256_from_url, BLOB_URL_PREFIX
+from app.artifact_blobs import store_blob, blob_url, blob_path, BlobTooLarge
+from app.file_serving import file_response, attachment_disposition
 
 router = APIRouter()
 
 # Create artifacts directory if it doesn't exist
-# Files are stored in /app/artifacts/files/ to match URLs like /api/artifacts/files/{filename}
+# Legacy uploads are stored in /app/artifacts/files/ to match URLs like /api/artifacts/files/{filename};
+# new uploads go to the content-addressed blob store (app.artifact_blobs)
 ARTIFACTS_DIR = Path("/app/artifacts/files")
 ARTIFACTS_DIR.mkdir(exist_ok=True, parents=True)
 
+# Maximum artifact upload size (keep nginx client_max_body_size in line)
+MAX_UPLOAD_BYTES = int(os.getenv("ARTIFACT_MAX_UPLOAD_MB", "25")) * 1024 * 1024
+
+# Content-addressed URLs (blobs, content?v={hash}) never change, so browsers may keep them for a year
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
 
 @router.get("/debug/list")
 async def list_artifact_files():
@@ -44,21 +55,21 @@ async def list_artifact_files():
 
 
 @router.post("/upload")
-async def upload_artifact(
+def upload_artifact(
     file: UploadFile = File(...),
     artifact_id: Optional[int] = Form(None),
     db: Session = Depends(get_db),
     current_gm=Depends(get_current_gm)
 ):
     """Upload an artifact file. If artifact_id is provided, update that artifact's file_url."""
-    # Save file with a safe filename
+    # Sync handler: the chunked copy and DB work run in the threadpool, never on the event loop.
+    # Stored by content: identical files are kept once and names never collide
     safe_filename = file.filename.replace(" ", "_")
-    file_path = ARTIFACTS_DIR / safe_filename
-    
-    with open(file_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
-    
-    file_url = f"/api/artifacts/files/{safe_filename}"
+    try:
+        blob = store_blob(db, file.file, safe_filename, max_size=MAX_UPLOAD_BYTES)
+    except BlobTooLarge:
+        raise HTTPException(status_code=413, detail=f"File too large (limit {MAX_UPLOAD_BYTES // (1024 * 1024)} MB)")
+    file_url = blob_url(blob.sha256, safe_filename)
     
     if artifact_id:
         # Update existing artifact
@@ -66,6 +77,13 @@ async def upload_artifact(
         if not artifact:
             raise HTTPException(status_code=404, detail="Artifact not found")
         artifact.file_url = file_url
+        # Player state returns file_url: games running a scenario that shows this
+        # artifact must not keep answering 304 with the old URL
+        linked_scenarios = db.query(ScenarioPhase.scenario_id).join(
+            scenario_phase_artifacts, scenario_phase_artifacts.c.phase_id == ScenarioPhase.id
+        ).filter(scenario_phase_artifacts.c.artifact_id == artifact.id).distinct().all()
+        for (scenario_id,) in linked_scenarios:
+            bump_scenario_state_versions(db, scenario_id)
         db.commit()
         db.refresh(artifact)
         return ArtifactResponse(
@@ -77,37 +95,90 @@ async def upload_artifact(
             embed_url=artifact.embed_url
         )
     
+    db.commit()
+    
     # Return file info
-    return {"filename": safe_filename, "file_url": file_url, "message": "File uploaded successfully"}
+    return {
+        "filename": safe_filename,
+        "file_url": file_url,
+        "sha256": blob.sha256,
+        "size": blob.size,
+        "message": "File uploaded successfully"
+    }
+
+
+@router.get("/blobs/{blob_name}")
+def get_artifact_blob(blob_name: str, request: Request, db: Session = Depends(get_db)):
+    """Serve an uploaded file by content address. Content never changes, so it is cacheable forever."""
+    # Sync handler (like get_artifact_content, which calls it): the query and
+    # file stat run in the threadpool, not on the event loop
+    sha256 = blob_sha256_from_url(BLOB_URL_PREFIX + blob_name)
+    blob = db.query(ArtifactBlob).filter(ArtifactBlob.sha256 == sha256).first() if sha256 else None
+    if not blob or not blob_path(blob.sha256).is_file():
+        raise HTTPException(status_code=404, detail=f"File not found: {blob_name}")
+    
+    headers = {"ETag": f'"{blob.sha256}"', "Cache-Control": IMMUTABLE_CACHE_CONTROL}
+    if etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    return file_response(blob_path(blob.sha256), media_type=blob.media_type, headers=headers)
 
 
 @router.get("/content/{artifact_id}")
-async def get_artifact_content(artifact_id: int, db: Session = Depends(get_db)):
-    """Get artifact content from database."""
-    artifact = db.query(Artifact).filter(Artifact.id == artifact_id).first()
+def get_artifact_content(
+    artifact_id: int,
+    request: Request,
+    v: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    Get artifact content from database. Pass v={content_hash} for a long-lived cacheable response.
+    Compressed content is sent as stored (with Content-Encoding) to clients that accept its encoding.
+    """
+    # Metadata first; the content columns are only read when the body is actually sent
+    artifact = db.query(
+        Artifact.id, Artifact.name, Artifact.file_url, Artifact.content_hash, Artifact.content_encoding
+    ).filter(Artifact.id == artifact_id).first()
     if not artifact:
         raise HTTPException(status_code=404, detail=f"Artifact not found: {artifact_id}")
     
     # Return content from database if available
-    if artifact.content:
-        from fastapi.responses import Response
-        return Response(
-            content=artifact.content,
-            media_type="text/plain",
-            headers={"Content-Disposition": f'inline; filename="{artifact.name}.txt"'}
+    if artifact.content_hash:
+        pass_through = bool(artifact.content_encoding) and accepts_encoding(
+            request.headers.get("accept-encoding"), artifact.content_encoding
         )
+        # Each representation (encoded or not) gets its own strong ETag
+        etag = f'"{artifact.content_hash}-{artifact.content_encoding}"' if pass_through else f'"{artifact.content_hash}"'
+        headers = {
+            "ETag": etag,
+            "Cache-Control": IMMUTABLE_CACHE_CONTROL if v == artifact.content_hash else "no-cache",
+            "Content-Disposition": f'inline; filename="{artifact.name}.txt"',
+            "Vary": "Accept-Encoding"
+        }
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers=headers)
+        
+        if pass_through:
+            content_blob = db.query(Artifact.content_blob).filter(Artifact.id == artifact_id).scalar()
+            headers["Content-Encoding"] = artifact.content_encoding
+            return Response(content=bytes(content_blob), media_type="text/plain", headers=headers)
+        
+        stored = db.query(Artifact.content_text, Artifact.content_blob).filter(Artifact.id == artifact_id).first()
+        content = decompress_content(artifact.content_encoding, stored.content_blob, stored.content_text)
+        return Response(content=content, media_type="text/plain", headers=headers)
     
     # Fallback to file URL if content not in database
+    if artifact.file_url and blob_sha256_from_url(artifact.file_url):
+        return get_artifact_blob(artifact.file_url.rsplit("/", 1)[-1], request, db)
     if artifact.file_url:
         # Try to serve from file system as fallback
         filename = artifact.file_url.split("/")[-1]
-        return await get_artifact_file(filename)
+        return get_artifact_file(filename)
     
     raise HTTPException(status_code=404, detail="Artifact content not available")
 
 
 @router.get("/files/{filename}")
-async def get_artifact_file(filename: str, db: Session = Depends(get_db)):
+def get_artifact_file(filename: str, db: Session = Depends(get_db)):
     """Serve artifact files from filesystem (fallback for legacy artifacts)."""
     # Security: prevent directory traversal
     safe_filename = Path(filename).name
@@ -126,10 +197,10 @@ async def get_artifact_file(filename: str, db: Session = Depends(get_db)):
         elif safe_filename.endswith('.pdf'):
             media_type = 'application/pdf'
         
-        return FileResponse(
+        return file_response(
             file_path,
             media_type=media_type,
-            filename=safe_filename
+            headers={"Content-Disposition": attachment_disposition(safe_filename)}
         )
     
     raise HTTPException(status_code=404, detail=f"File not found: {safe_filename}")
@@ -1,9 +1,13 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Request
 from fastapi.responses import Response
+from functools import lru_cache
 from pathlib import Path
+from typing import Dict, NamedTuple, Optional, Tuple
+import hashlib
 import zipfile
 import io
 import gzip
+from app.http_cache import etag_matches
 
 router = APIRouter()
 
@@ -15,18 +19,35 @@ CE_PLUS_DIR = Path("/app/ce_plus_tests")
 CE_PLUS_DIR.mkdir(exist_ok=True, parents=True)
 
 
-def create_zip_with_eicar(filename_in_zip: str = "EICAR.TXT"):
-    """Create a ZIP file containing EICAR test string."""
+# Fixed timestamp for archive entries, so every worker builds byte-identical files (stable ETags)
+ZIP_ENTRY_DATE = (1980, 1, 1, 0, 0, 0)
+
+
+def _writestr(zip_file: zipfile.ZipFile, name: str, data):
+    """ZipFile.writestr with a fixed entry timestamp."""
+    info = zipfile.ZipInfo(name, date_time=ZIP_ENTRY_DATE)
+    info.compress_type = zip_file.compression
+    info.external_attr = 0o600 << 16
+    zip_file.writestr(info, data)
+
+
+def create_zip_with_file(filename_in_zip: str, data):
+    """Create a ZIP file containing a single file."""
     zip_buffer = io.BytesIO()
     with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-        zip_file.writestr(filename_in_zip, EICAR_TEST_STRING)
+        _writestr(zip_file, filename_in_zip, data)
     return zip_buffer.getvalue()
 
 
+def create_zip_with_eicar(filename_in_zip: str = "EICAR.TXT"):
+    """Create a ZIP file containing EICAR test string."""
+    return create_zip_with_file(filename_in_zip, EICAR_TEST_STRING)
+
+
 def create_gzip_with_eicar():
     """Create a GZIP file containing EICAR test string."""
     gzip_buffer = io.BytesIO()
-    with gzip.GzipFile(fileobj=gzip_buffer, mode='wb') as gz_file:
+    with gzip.GzipFile(fileobj=gzip_buffer, mode='wb', mtime=0) as gz_file:
         gz_file.write(EICAR_TEST_STRING.encode('utf-8'))
     return gzip_buffer.getvalue()
 
@@ -62,17 +83,17 @@ def create_docx_with_eicar():
     zip_buffer = io.BytesIO()
     with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
         # Minimal DOCX structure
-        zip_file.writestr('[Content_Types].xml', '''<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+        _writestr(zip_file, '[Content_Types].xml', '''<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
 <Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">
 <Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>
 <Default Extension="xml" ContentType="application/xml"/>
 <Override PartName="/word/document.xml" ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>
 </Types>''')
-        zip_file.writestr('_rels/.rels', '''<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+        _writestr(zip_file, '_rels/.rels', '''<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
 <Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
 <Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="word/document.xml"/>
 </Relationships>''')
-        zip_file.writestr('word/document.xml', f'''<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+        _writestr(zip_file, 'word/document.xml', f'''<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
 <w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">
 <w:body>
 <w:p><w:r><w:t>{EICAR_TEST_STRING}</w:t></w:r></w:p>
@@ -87,21 +108,21 @@ def create_xlsx_with_eicar():
     # XLSX is a ZIP file with specific structure
     zip_buffer = io.BytesIO()
     with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-        zip_file.writestr('[Content_Types].xml', '''<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+        _writestr(zip_file, '[Content_Types].xml', '''<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
 <Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">
 <Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>
 <Default Extension="xml" ContentType="application/xml"/>
 <Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>
 </Types>''')
-        zip_file.writestr('_rels/.rels', '''<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+        _writestr(zip_file, '_rels/.rels', '''<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
 <Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
 <Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>
 </Relationships>''')
-        zip_file.writestr('xl/workbook.xml', f'''<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+        _writestr(zip_file, 'xl/workbook.xml', f'''<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
 <workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">
 <sheets><sheet name="Sheet1" sheetId="1" r:id="rId1"/></sheets>
 </workbook>''')
-        zip_file.writestr('xl/worksheets/sheet1.xml', f'''<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+        _writestr(zip_file, 'xl/worksheets/sheet1.xml', f'''<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
 <worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">
 <sheetData>
 <row r="1"><c r="A1" t="inlineStr"><is><t>{EICAR_TEST_STRING}</t></is></c></row>
@@ -180,14 +201,14 @@ def create_apk_with_eicar():
     zip_buffer = io.BytesIO()
     with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
         # Minimal APK structure
-        zip_file.writestr('AndroidManifest.xml', '''<?xml version="1.0" encoding="utf-8"?>
+        _writestr(zip_file, 'AndroidManifest.xml', '''<?xml version="1.0" encoding="utf-8"?>
 <manifest xmlns:android="http://schemas.android.com/apk/res/android"
     package="com.ceplus.test">
     <application android:label="CE Plus Test">
     </application>
 </manifest>''')
-        zip_file.writestr('classes.dex', b'dex\n035\x00' + EICAR_TEST_STRING.encode('utf-8'))
-        zip_file.writestr('META-INF/MANIFEST.MF', f'Manifest-Version: 1.0\n{EICAR_TEST_STRING}\n')
+        _writestr(zip_file, 'classes.dex', b'dex\n035\x00' + EICAR_TEST_STRING.encode('utf-8'))
+        _writestr(zip_file, 'META-INF/MANIFEST.MF', f'Manifest-Version: 1.0\n{EICAR_TEST_STRING}\n')
     return zip_buffer.getvalue()
 
 
@@ -197,13 +218,13 @@ def create_jar_with_eicar():
     zip_buffer = io.BytesIO()
     with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
         # Minimal JAR structure with manifest
-        zip_file.writestr('META-INF/MANIFEST.MF', f'''Manifest-Version: 1.0
+        _writestr(zip_file, 'META-INF/MANIFEST.MF', f'''Manifest-Version: 1.0
 {EICAR_TEST_STRING}
 Main-Class: Test
 ''')
         # Create a simple Java class file placeholder
-        zip_file.writestr('Test.class', b'\xca\xfe\xba\xbe' + EICAR_TEST_STRING.encode('utf-8')[:60])
-        zip_file.writestr('Test.java', f'// {EICAR_TEST_STRING}\npublic class Test {{ public static void main(String[] args) {{ }} }}')
+        _writestr(zip_file, 'Test.class', b'\xca\xfe\xba\xbe' + EICAR_TEST_STRING.encode('utf-8')[:60])
+        _writestr(zip_file, 'Test.java', f'// {EICAR_TEST_STRING}\npublic class Test {{ public static void main(String[] args) {{ }} }}')
     return zip_buffer.getvalue()
 
 
@@ -224,8 +245,8 @@ def create_msi_zip():
     # MSI files are complex, so we'll create a ZIP that simulates it
     zip_buffer = io.BytesIO()
     with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-        zip_file.writestr('test.msi', EICAR_TEST_STRING)
-        zip_file.writestr('META-INF/manifest.xml', f'<?xml version="1.0"?><manifest>{EICAR_TEST_STRING}</manifest>')
+        _writestr(zip_file, 'test.msi', EICAR_TEST_STRING)
+        _writestr(zip_file, 'META-INF/manifest.xml', f'<?xml version="1.0"?><manifest>{EICAR_TEST_STRING}</manifest>')
     return zip_buffer.getvalue()
 
 
@@ -348,8 +369,94 @@ async def get_ce_plus_info():
     }
 
 
+# Test files: (category, platform, test_id) -> (download filename, media type, builder)
+TEST_FILES = {
+    # EICAR category
+    ("eicar", "all", "eicar_com"): ("EICAR.COM", "application/x-msdownload", lambda: EICAR_TEST_STRING.encode('utf-8')),
+    ("eicar", "all", "eicar_txt"): ("EICAR.TXT", "text/plain", lambda: EICAR_TEST_STRING.encode('utf-8')),
+    ("eicar", "all", "eicar_zip"): ("EICAR.ZIP", "application/zip", create_zip_with_eicar),
+    # Executables category
+    ("executables", "windows", "bat_file"): ("test.bat", "application/x-msdos-program", create_batch_file),
+    ("executables", "windows", "ps1_file"): ("test.ps1", "application/x-powershell", create_powershell_file),
+    ("executables", "windows", "vbs_file"): ("test.vbs", "application/x-vbs", create_vbs_file),
+    ("executables", "windows", "scr_file"): ("test.scr", "application/x-msdownload", create_scr_file),
+    ("executables", "windows", "msi_zip"): ("test.zip", "application/zip", create_msi_zip),
+    # Create ZIP containing a .bat file (simulating .exe in ZIP)
+    ("executables", "windows", "exe_zip"): ("test.zip", "application/zip", lambda: create_zip_with_file("test.bat", create_batch_file())),
+    ("executables", "mac", "sh_file"): ("test.sh", "application/x-sh", create_bash_file),
+    ("executables", "mac", "py_file"): ("test.py", "text/x-python", create_python_file),
+    # DMG file (simplified - ZIP format)
+    ("executables", "mac", "dmg_file"): ("test.dmg", "application/x-apple-diskimage", create_zip_with_eicar),
+    ("executables", "mac", "pkg_zip"): ("test.zip", "application/zip", lambda: create_zip_with_file("test.pkg", EICAR_TEST_STRING)),
+    ("executables", "android", "malicious_apk"): ("malicious.apk", "application/vnd.android.package-archive", create_apk_with_eicar),
+    ("executables", "android", "apk_zip"): ("malicious.zip", "application/zip", lambda: create_zip_with_file("malicious.apk", create_apk_with_eicar())),
+    ("executables", "java", "jar_file"): ("test.jar", "application/java-archive", create_jar_with_eicar),
+    ("executables", "java", "jar_zip"): ("test.zip", "application/zip", lambda: create_zip_with_file("test.jar", create_jar_with_eicar())),
+    ("executables", "scripts", "py_file"): ("test.py", "text/x-python", create_python_file),
+    ("executables", "scripts", "js_file"): ("test.js", "application/javascript", create_javascript_file),
+    # Containers category
+    ("containers", "all", "zip_eicar"): ("EICAR.ZIP", "application/zip", create_zip_with_eicar),
+    ("containers", "all", "gz_eicar"): ("EICAR.gz", "application/gzip", create_gzip_with_eicar),
+    # Nested ZIP: ZIP containing a ZIP containing EICAR
+    ("containers", "all", "zip_nested"): ("nested.zip", "application/zip", lambda: create_zip_with_file("inner.zip", create_zip_with_eicar())),
+    # Documents category
+    ("documents", "all", "docx_eicar"): ("test.docx", "application/vnd.openxmlformats-officedocument.wordprocessingml.document", create_docx_with_eicar),
+    ("documents", "all", "xlsx_eicar"): ("test.xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", create_xlsx_with_eicar),
+    ("documents", "all", "pdf_eicar"): ("test.pdf", "application/pdf", create_pdf_with_eicar),
+}
+
+# Container and document tests are the same file on every platform
+PLATFORM_INDEPENDENT_CATEGORIES = ("containers", "documents")
+
+
+class CatalogEntry(NamedTuple):
+    filename: str
+    media_type: str
+    content: bytes
+    size: int
+    etag: str
+
+
+def _catalog_entry(filename: str, media_type: str, content: bytes) -> CatalogEntry:
+    return CatalogEntry(filename, media_type, content, len(content), f'"{hashlib.sha256(content).hexdigest()[:32]}"')
+
+
+@lru_cache(maxsize=None)
+def get_catalog() -> Dict[Tuple[str, str, str], CatalogEntry]:
+    """Build every test file once per process; downloads are then a dict lookup."""
+    return {
+        key: _catalog_entry(filename, media_type, builder())
+        for key, (filename, media_type, builder) in TEST_FILES.items()
+    }
+
+
+@lru_cache(maxsize=None)
+def get_bundle(category: Optional[str] = None) -> CatalogEntry:
+    """All test files (optionally one category) in a single ZIP, as category/platform/test_id/filename."""
+    zip_buffer = io.BytesIO()
+    with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
+        for (entry_category, platform, test_id), entry in get_catalog().items():
+            if category is None or entry_category == category:
+                _writestr(zip_file, f"{entry_category}/{platform}/{test_id}/{entry.filename}", entry.content)
+    filename = f"ce-plus-{category}-tests.zip" if category else "ce-plus-tests.zip"
+    return _catalog_entry(filename, "application/zip", zip_buffer.getvalue())
+
+
+def _test_file_response(entry: CatalogEntry, if_none_match: Optional[str]) -> Response:
+    headers = {
+        "ETag": entry.etag,
+        # Revalidate so an assessor's repeated download still reaches the endpoint protection
+        "Cache-Control": "no-cache",
+        "Content-Disposition": f'attachment; filename="{entry.filename}"',
+        "X-Content-Type-Options": "nosniff"
+    }
+    if etag_matches(if_none_match, entry.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=entry.content, media_type=entry.media_type, headers=headers)
+
+
 @router.get("/download/{category}/{platform}/{test_id}")
-async def download_test_file(category: str, platform: str, test_id: str):
+async def download_test_file(category: str, platform: str, test_id: str, request: Request):
     """Download test file for specified category, platform and test type."""
     
     # Validate category
@@ -368,196 +475,31 @@ async def download_test_file(category: str, platform: str, test_id: str):
             status_code=400
         )
     
-    # EICAR category
-    if category == "eicar":
-        if test_id == "eicar_com" and platform == "all":
-            content = EICAR_TEST_STRING.encode('utf-8')
-            filename = "EICAR.COM"
-            media_type = "application/x-msdownload"
-            
-        elif test_id == "eicar_txt" and platform == "all":
-            content = EICAR_TEST_STRING.encode('utf-8')
-            filename = "EICAR.TXT"
-            media_type = "text/plain"
-            
-        elif test_id == "eicar_zip" and platform == "all":
-            content = create_zip_with_eicar()
-            filename = "EICAR.ZIP"
-            media_type = "application/zip"
-            
-        else:
-            return Response(
-                content=f"Invalid test_id '{test_id}' for platform '{platform}' in category '{category}'",
-                status_code=400
-            )
-    
-    # Executables category
-    elif category == "executables":
-        if test_id == "bat_file" and platform == "windows":
-            content = create_batch_file()
-            filename = "test.bat"
-            media_type = "application/x-msdos-program"
-            
-        elif test_id == "ps1_file" and platform == "windows":
-            content = create_powershell_file()
-            filename = "test.ps1"
-            media_type = "application/x-powershell"
-            
-        elif test_id == "vbs_file" and platform == "windows":
-            content = create_vbs_file()
-            filename = "test.vbs"
-            media_type = "application/x-vbs"
-            
-        elif test_id == "scr_file" and platform == "windows":
-            content = create_scr_file()
-            filename = "test.scr"
-            media_type = "application/x-msdownload"
-            
-        elif test_id == "msi_zip" and platform == "windows":
-            content = create_msi_zip()
-            filename = "test.zip"
-            media_type = "application/zip"
-            
-        elif test_id == "exe_zip" and platform == "windows":
-            # Create ZIP containing a .bat file (simulating .exe in ZIP)
-            zip_buffer = io.BytesIO()
-            with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-                zip_file.writestr("test.bat", create_batch_file().decode('utf-8'))
-            content = zip_buffer.getvalue()
-            filename = "test.zip"
-            media_type = "application/zip"
-            
-        elif test_id == "sh_file" and platform == "mac":
-            content = create_bash_file()
-            filename = "test.sh"
-            media_type = "application/x-sh"
-            
-        elif test_id == "py_file" and platform == "mac":
-            content = create_python_file()
-            filename = "test.py"
-            media_type = "text/x-python"
-            
-        elif test_id == "dmg_file" and platform == "mac":
-            # DMG file (simplified - ZIP format)
-            content = create_zip_with_eicar("EICAR.TXT")
-            filename = "test.dmg"
-            media_type = "application/x-apple-diskimage"
-            
-        elif test_id == "pkg_zip" and platform == "mac":
-            zip_buffer = io.BytesIO()
-            with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-                zip_file.writestr("test.pkg", EICAR_TEST_STRING)
-            content = zip_buffer.getvalue()
-            filename = "test.zip"
-            media_type = "application/zip"
-            
-        elif test_id == "malicious_apk" and platform == "android":
-            content = create_apk_with_eicar()
-            filename = "malicious.apk"
-            media_type = "application/vnd.android.package-archive"
-            
-        elif test_id == "apk_zip" and platform == "android":
-            zip_buffer = io.BytesIO()
-            with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-                zip_file.writestr("malicious.apk", create_apk_with_eicar())
-            content = zip_buffer.getvalue()
-            filename = "malicious.zip"
-            media_type = "application/zip"
-            
-        elif test_id == "jar_file" and platform == "java":
-            content = create_jar_with_eicar()
-            filename = "test.jar"
-            media_type = "application/java-archive"
-            
-        elif test_id == "jar_zip" and platform == "java":
-            zip_buffer = io.BytesIO()
-            with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-                zip_file.writestr("test.jar", create_jar_with_eicar())
-            content = zip_buffer.getvalue()
-            filename = "test.zip"
-            media_type = "application/zip"
-            
-        elif test_id == "py_file" and platform == "scripts":
-            content = create_python_file()
-            filename = "test.py"
-            media_type = "text/x-python"
-            
-        elif test_id == "js_file" and platform == "scripts":
-            content = create_javascript_file()
-            filename = "test.js"
-            media_type = "application/javascript"
-            
-        else:
-            return Response(
-                content=f"Invalid test_id '{test_id}' for platform '{platform}' in category '{category}'",
-                status_code=400
-            )
-    
-    # Containers category
-    elif category == "containers":
-        if test_id == "zip_eicar":
-            content = create_zip_with_eicar()
-            filename = "EICAR.ZIP"
-            media_type = "application/zip"
-            
-        elif test_id == "gz_eicar":
-            content = create_gzip_with_eicar()
-            filename = "EICAR.gz"
-            media_type = "application/gzip"
-            
-        elif test_id == "zip_nested":
-            # Nested ZIP: ZIP containing a ZIP containing EICAR
-            inner_zip = create_zip_with_eicar()
-            outer_zip_buffer = io.BytesIO()
-            with zipfile.ZipFile(outer_zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-                zip_file.writestr("inner.zip", inner_zip)
-            content = outer_zip_buffer.getvalue()
-            filename = "nested.zip"
-            media_type = "application/zip"
-            
-        else:
+    catalog = get_catalog()
+    if category in PLATFORM_INDEPENDENT_CATEGORIES:
+        entry = catalog.get((category, "all", test_id))
+        if not entry:
             return Response(
                 content=f"Invalid test_id '{test_id}' for category '{category}'",
                 status_code=400
             )
-    
-    # Documents category
-    elif category == "documents":
-        if test_id == "docx_eicar":
-            content = create_docx_with_eicar()
-            filename = "test.docx"
-            media_type = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
-            
-        elif test_id == "xlsx_eicar":
-            content = create_xlsx_with_eicar()
-            filename = "test.xlsx"
-            media_type = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-            
-        elif test_id == "pdf_eicar":
-            content = create_pdf_with_eicar()
-            filename = "test.pdf"
-            media_type = "application/pdf"
-            
-        else:
+    else:
+        entry = catalog.get((category, platform, test_id))
+        if not entry:
             return Response(
-                content=f"Invalid test_id '{test_id}' for category '{category}'",
+                content=f"Invalid test_id '{test_id}' for platform '{platform}' in category '{category}'",
                 status_code=400
             )
     
-    else:
-        return Response(
-            content=f"Invalid category '{category}'",
-            status_code=400
-        )
-    
-    return Response(
-        content=content,
-        media_type=media_type,
-        headers={
-            "Content-Disposition": f'attachment; filename="{filename}"',
-            "X-Content-Type-Options": "nosniff"
-        }
-    )
+    return _test_file_response(entry, request.headers.get("if-none-match"))
+
+
+@router.get("/bundle")
+async def download_test_bundle(request: Request, category: Optional[str] = None):
+    """Download every test file (or every file in one category) as a single ZIP."""
+    if category is not None and category not in {key[0] for key in TEST_FILES}:
+        return Response(content=f"Invalid category '{category}'", status_code=400)
+    return _test_file_response(get_bundle(category), request.headers.get("if-none-match"))
 
 
 @router.get("/test-status")
@@ -1,193 +1,243 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, literal, select
 from typing import List
-from collections import Counter
-from app.database import get_db
+from collections import Counter, defaultdict
+from app.database import get_db, get_async_db, dialect_insert
 from app.auth import get_current_gm
-from app.models import Game, Player, PhaseDecision, Team, ScoreEvent, PhaseState, DecisionStatus, PlayerVote
+from app.models import Game, Player, PhaseDecision, Team, ScoreEvent, PhaseState, DecisionStatus, PlayerVote, VoteTally
 from app.schemas import VoteSubmit, DecisionSubmit, DecisionResponse, DecisionScore, VotingStatusResponse, PlayerVoteResponse
+from app.live import publish_game_event_async, bump_state_version, bump_team_state_version
+from app.vote_tallies import all_voted, record_vote
 
 router = APIRouter()
 
 
-@router.post("/{game_id}/phases/{phase_id}/votes", response_model=PlayerVoteResponse)
-def submit_vote(
-    game_id: int,
-    phase_id: int,
-    vote_data: VoteSubmit,
-    db: Session = Depends(get_db)
-):
-    # Verify player exists and belongs to game
-    player = db.query(Player).filter(
+def _vote_upsert(bind, game_id: int, phase_id: int, vote_data: VoteSubmit):
+    """
+    INSERT ... SELECT ... ON CONFLICT (player_id, phase_id) DO UPDATE for a vote.
+    The player/game/phase checks are the WHERE of the SELECT, so a rejected vote
+    returns no row. A re-vote records the action it replaced in previous_action.
+    """
+    insert = dialect_insert(bind)
+    votes = PlayerVote.__table__
+    comments = vote_data.comments[:500] if vote_data.comments else None  # Enforce 500 char limit
+    source = select(
+        literal(game_id, votes.c.game_id.type),
+        Player.team_id,
+        literal(phase_id, votes.c.phase_id.type),
+        Player.id,
+        literal(vote_data.selected_action, votes.c.selected_action.type),
+        literal(vote_data.effectiveness_rating, votes.c.effectiveness_rating.type),
+        literal(comments, votes.c.comments.type),
+        literal(vote_data.justification, votes.c.justification.type)  # Keep for backward compatibility
+    ).join(Game, Game.id == Player.game_id).where(
         Player.id == vote_data.player_id,
+        Player.game_id == game_id,
+        Game.current_phase_id == phase_id,
+        Game.phase_state == PhaseState.OPEN_FOR_DECISIONS
+    )
+    statement = insert(votes).from_select([
+        votes.c.game_id, votes.c.team_id, votes.c.phase_id, votes.c.player_id, votes.c.selected_action,
+        votes.c.effectiveness_rating, votes.c.comments, votes.c.justification
+    ], source)
+    return statement.on_conflict_do_update(
+        index_elements=[votes.c.player_id, votes.c.phase_id],
+        set_={
+            "previous_action": votes.c.selected_action,
+            "selected_action": statement.excluded.selected_action,
+            "effectiveness_rating": statement.excluded.effectiveness_rating,
+            "comments": statement.excluded.comments,
+            "justification": statement.excluded.justification,
+        }
+    ).returning(
+        votes.c.id, votes.c.team_id, votes.c.player_id, votes.c.selected_action, votes.c.previous_action,
+        votes.c.effectiveness_rating, votes.c.comments, votes.c.justification, votes.c.voted_at,
+        # The voting player is the source row's player: look the name up by id rather
+        # than correlating with the target table, which RETURNING renders unqualified
+        select(Player.display_name).where(
+            Player.id == vote_data.player_id
+        ).scalar_subquery().label("player_name")
+    )
+
+
+async def _vote_rejection(db: AsyncSession, game_id: int, phase_id: int, player_id: int) -> HTTPException:
+    # Only reached when the upsert wrote nothing: work out which check failed
+    player = await db.scalar(select(Player).where(
+        Player.id == player_id,
         Player.game_id == game_id
-    ).first()
+    ))
     if not player:
-        raise HTTPException(status_code=404, detail="Player not found")
+        return HTTPException(status_code=404, detail="Player not found")
 
-    # Verify game and phase
-    game = db.query(Game).filter(Game.id == game_id).first()
+    game = await db.scalar(select(Game).where(Game.id == game_id))
     if not game:
-        raise HTTPException(status_code=404, detail="Game not found")
+        return HTTPException(status_code=404, detail="Game not found")
 
     if game.current_phase_id != phase_id:
-        raise HTTPException(status_code=400, detail="Phase mismatch")
+        return HTTPException(status_code=400, detail="Phase mismatch")
 
-    if game.phase_state != PhaseState.OPEN_FOR_DECISIONS:
-        raise HTTPException(status_code=400, detail=f"Cannot submit vote in state: {game.phase_state}")
+    return HTTPException(status_code=400, detail=f"Cannot submit vote in state: {game.phase_state}")
 
-    # Check if vote already exists
-    existing_vote = db.query(PlayerVote).filter(
-        PlayerVote.player_id == vote_data.player_id,
-        PlayerVote.phase_id == phase_id
-    ).first()
 
-    if existing_vote:
-        # Update existing vote
-        existing_vote.selected_action = vote_data.selected_action
-        existing_vote.effectiveness_rating = vote_data.effectiveness_rating
-        existing_vote.comments = vote_data.comments[:500] if vote_data.comments else None  # Enforce 500 char limit
-        existing_vote.justification = vote_data.justification  # Keep for backward compatibility
-        db.commit()
-        db.refresh(existing_vote)
-    else:
-        # Create new vote
-        vote = PlayerVote(
-            game_id=game_id,
-            team_id=player.team_id,
-            phase_id=phase_id,
-            player_id=vote_data.player_id,
-            selected_action=vote_data.selected_action,
-            effectiveness_rating=vote_data.effectiveness_rating,
-            comments=vote_data.comments[:500] if vote_data.comments else None,  # Enforce 500 char limit
-            justification=vote_data.justification  # Keep for backward compatibility
-        )
-        db.add(vote)
-        db.commit()
-        db.refresh(vote)
-        existing_vote = vote
-
-    # Check if all players have voted, if so, aggregate votes into decision
-    _check_and_aggregate_votes(game_id, phase_id, player.team_id, db)
+@router.post("/{game_id}/phases/{phase_id}/votes", response_model=PlayerVoteResponse)
+async def submit_vote(
+    game_id: int,
+    phase_id: int,
+    vote_data: VoteSubmit,
+    db: AsyncSession = Depends(get_async_db)
+):
+    # Every player votes at once when a phase opens: runs on the async engine.
+    # One upsert statement validates and writes the vote; resubmitting (double
+    # clicks, client retries) updates the same row.
+    vote = (await db.execute(_vote_upsert(db.bind, game_id, phase_id, vote_data))).one_or_none()
+    if vote is None:
+        raise await _vote_rejection(db, game_id, phase_id, vote_data.player_id)
+
+    # Tally the vote and, if the team is complete, aggregate its decision in the same transaction
+    votes_submitted, total_players = await db.run_sync(
+        lambda sync_db: _record_vote(game_id, phase_id, vote, sync_db)
+    )
+    # NOTIFY is transactional: the event is queued here and sent by the one commit below
+    deliver_event = await publish_game_event_async(
+        db,
+        game_id,
+        "vote",
+        phase_id=phase_id,
+        team_id=vote.team_id,
+        player_id=vote.player_id,
+        votes_submitted=votes_submitted,
+        total_players=total_players,
+        all_voted=total_players > 0 and votes_submitted >= total_players
+    )
+    await db.commit()
+    deliver_event()
 
     return PlayerVoteResponse(
-        id=existing_vote.id,
-        player_id=existing_vote.player_id,
-        player_name=player.display_name,
-        selected_action=existing_vote.selected_action,
-        effectiveness_rating=existing_vote.effectiveness_rating,
-        comments=existing_vote.comments,
-        justification=existing_vote.justification,
-        voted_at=existing_vote.voted_at
+        id=vote.id,
+        player_id=vote.player_id,
+        player_name=vote.player_name,
+        selected_action=vote.selected_action,
+        effectiveness_rating=vote.effectiveness_rating,
+        comments=vote.comments,
+        justification=vote.justification,
+        voted_at=vote.voted_at
     )
 
 
-def _check_and_aggregate_votes(game_id: int, phase_id: int, team_id: int, db: Session):
-    """Check if all players have voted and aggregate votes into a PhaseDecision"""
-    # Get all players in the team
-    team_players = db.query(Player).filter(
-        Player.game_id == game_id,
-        Player.team_id == team_id
-    ).all()
-    
-    if not team_players:
-        return
-    
-    # Get all votes for this phase from this team
-    votes = db.query(PlayerVote).filter(
-        PlayerVote.game_id == game_id,
-        PlayerVote.phase_id == phase_id,
-        PlayerVote.team_id == team_id
-    ).all()
-    
-    # Check if all players have voted
-    voted_player_ids = {vote.player_id for vote in votes}
-    all_player_ids = {player.id for player in team_players}
-    
-    if voted_player_ids == all_player_ids and len(voted_player_ids) > 0:
-        # Aggregate votes - count votes per action
-        action_counts = Counter(vote.selected_action for vote in votes)
-        winning_action = action_counts.most_common(1)[0][0] if action_counts else None
-        
-        # Get all justifications
-        justifications = [v.justification for v in votes if v.justification]
-        combined_justification = "\n\n".join(justifications) if justifications else "Team vote"
-        
+def _record_vote(game_id: int, phase_id: int, vote, db: Session):
+    """
+    Count an upserted vote in its team's tally and aggregate the team's votes
+    into a PhaseDecision once all players have voted.
+    Returns (votes_submitted, total_players) for the team.
+    """
+    votes_submitted, total_players = record_vote(
+        db.connection(), game_id, phase_id, vote.team_id, vote.selected_action, vote.previous_action
+    )
+    # Votes and the aggregated decision are only shown to the voting team
+    bump_team_state_version(db, vote.team_id)
+
+    if total_players > 0 and votes_submitted >= total_players:
         # Check if decision already exists
         existing_decision = db.query(PhaseDecision).filter(
             PhaseDecision.game_id == game_id,
-            PhaseDecision.team_id == team_id,
+            PhaseDecision.team_id == vote.team_id,
             PhaseDecision.phase_id == phase_id
         ).first()
-        
+
         if not existing_decision:
+            # Aggregate votes - count votes per action (ties go to the earliest vote, as in lock_decisions)
+            votes = db.query(PlayerVote.selected_action, PlayerVote.justification).filter(
+                PlayerVote.game_id == game_id,
+                PlayerVote.phase_id == phase_id,
+                PlayerVote.team_id == vote.team_id
+            ).order_by(PlayerVote.id).all()
+            action_counts = Counter(v.selected_action for v in votes)
+            winning_action = action_counts.most_common(1)[0][0] if action_counts else None
+
+            # Get all justifications
+            justifications = [v.justification for v in votes if v.justification]
+            combined_justification = "\n\n".join(justifications) if justifications else "Team vote"
+
             # Create decision from aggregated votes
-            decision = PhaseDecision(
+            db.add(PhaseDecision(
                 game_id=game_id,
-                team_id=team_id,
+                team_id=vote.team_id,
                 phase_id=phase_id,
                 actions={"selected": [winning_action], "vote_counts": dict(action_counts)},
                 free_text_justification=combined_justification,
                 status=DecisionStatus.SUBMITTED
-            )
-            db.add(decision)
-            db.commit()
+            ))
+            db.flush()
+
+    return (votes_submitted, total_players)
 
 
 @router.get("/{game_id}/phases/{phase_id}/voting-status", response_model=List[VotingStatusResponse])
-def get_voting_status(
+async def get_voting_status(
     game_id: int,
     phase_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get voting status for all teams in the current phase"""
-    game = db.query(Game).filter(Game.id == game_id).first()
+    game = await db.scalar(select(Game).where(Game.id == game_id))
     if not game:
         raise HTTPException(status_code=404, detail="Game not found")
     
     if game.current_phase_id != phase_id:
         raise HTTPException(status_code=400, detail="Phase mismatch")
     
-    teams = db.query(Team).filter(Team.game_id == game_id).all()
-    status_list = []
+    teams = (await db.scalars(select(Team).where(Team.game_id == game_id).order_by(Team.id))).all()
     
+    # Counts come from the tallies; the vote list is one joined query for all teams
+    tallies = {
+        tally.team_id: tally
+        for tally in await db.scalars(select(VoteTally).where(
+            VoteTally.game_id == game_id,
+            VoteTally.phase_id == phase_id
+        ))
+    }
+    
+    votes_by_team = defaultdict(list)
+    votes = await db.execute(select(PlayerVote, Player.display_name).outerjoin(
+        Player, Player.id == PlayerVote.player_id
+    ).where(
+        PlayerVote.game_id == game_id,
+        PlayerVote.phase_id == phase_id
+    ).order_by(PlayerVote.id))
+    for vote, player_name in votes:
+        votes_by_team[vote.team_id].append(PlayerVoteResponse(
+            id=vote.id,
+            player_id=vote.player_id,
+            player_name=player_name or "Unknown",
+            selected_action=vote.selected_action,
+            effectiveness_rating=vote.effectiveness_rating,
+            comments=vote.comments,
+            justification=vote.justification,
+            voted_at=vote.voted_at
+        ))
+    
+    # Teams nobody has voted for yet have no tally: one roster count for those
+    untallied = [team.id for team in teams if team.id not in tallies]
+    roster_sizes = {}
+    if untallied:
+        roster_sizes = dict((await db.execute(select(Player.team_id, func.count(Player.id)).where(
+            Player.team_id.in_(untallied)
+        ).group_by(Player.team_id))).all())
+    
+    status_list = []
     for team in teams:
-        # Get all players in team
-        players = db.query(Player).filter(
-            Player.game_id == game_id,
-            Player.team_id == team.id
-        ).all()
-        
-        # Get all votes for this team and phase
-        votes = db.query(PlayerVote).filter(
-            PlayerVote.game_id == game_id,
-            PlayerVote.phase_id == phase_id,
-            PlayerVote.team_id == team.id
-        ).all()
-        
-        vote_responses = []
-        for vote in votes:
-            player = db.query(Player).filter(Player.id == vote.player_id).first()
-            vote_responses.append(PlayerVoteResponse(
-                id=vote.id,
-                player_id=vote.player_id,
-                player_name=player.display_name if player else "Unknown",
-                selected_action=vote.selected_action,
-                effectiveness_rating=vote.effectiveness_rating,
-                comments=vote.comments,
-                justification=vote.justification,
-                voted_at=vote.voted_at
-            ))
-        
+        tally = tallies.get(team.id)
         status_list.append(VotingStatusResponse(
             team_id=team.id,
             team_name=team.name,
             team_role=team.role,
-            total_players=len(players),
-            votes_submitted=len(votes),
-            votes=vote_responses,
-            all_voted=len(votes) == len(players) and len(players) > 0
+            total_players=tally.total_players if tally else roster_sizes.get(team.id, 0),
+            votes_submitted=tally.votes_submitted if tally else 0,
+            votes=votes_by_team[team.id],
+            vote_counts=tally.action_counts if tally else {},
+            all_voted=all_voted(tally)
         ))
     
     return status_list
@@ -256,6 +306,7 @@ def score_decision(
         reason=f"Phase {phase_id} decision scored"
     )
     db.add(score_event)
+    bump_state_version(db, game_id)
     db.commit()
 
     return {"message": "Decision scored", "decision_id": decision_id}
@@ -1,19 +1,30 @@
-from fastapi import APIRouter, Depends, HTTPException
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.orm import Session
 from typing import List
 from collections import Counter
 from datetime import datetime
+import logging
 import secrets
 from sqlalchemy import func
 from app.database import get_db
 from app.auth import get_current_gm
 from app.models import Game, Scenario, ScenarioPhase, Team, GameStatus, PhaseState, Player, PlayerVote, PhaseDecision, DecisionStatus, ScoreEvent, PhaseGMNotes, AfterActionReport
-from app.schemas import GameCreate, GameResponse, PhaseCommentsResponse, PhaseCommentResponse, GMNotesUpdate, AfterActionReportResponse, PhaseAnalysis
-from app.scoring import calculate_team_decision_score, calculate_weighted_score
-from app.report_generator import generate_word_report, generate_pdf_report
+from app.schemas import GameCreate, GameResponse, PhaseCommentsResponse, PhaseCommentResponse, GMNotesUpdate, AfterActionReportResponse, PhaseAnalysis, ExportJobResponse
+from app.scoring import calculate_weighted_score
+from app.scoring_rules import scoring_rules
+from app.report_builder import get_or_build_report
+from app.score_totals import delete_team_phase_scores
+from app.vote_tallies import delete_vote_tallies
+from app.report_exports import (
+    EXPORT_FORMATS, JOB_DONE, JOB_PENDING, report_fingerprint, export_etag, export_path,
+    submit_export, wait_for_export, export_job_status, parse_export_job_id, remove_exports
+)
+from app.http_cache import etag_matches
+from app.file_serving import file_response
+from app.live import publish_game_state, bump_state_version
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
 
 
 def generate_team_code() -> str:
@@ -93,7 +104,9 @@ def start_game(game_id: int, db: Session = Depends(get_db), current_gm=Depends(g
     game.status = GameStatus.IN_PROGRESS
     game.current_phase_id = first_phase.id
     game.phase_state = PhaseState.BRIEFING
+    bump_state_version(db, game.id)
     db.commit()
+    publish_game_state(game)
 
     return {"message": "Game started", "current_phase_id": first_phase.id}
 
@@ -108,10 +121,21 @@ def open_for_decisions(game_id: int, db: Session = Depends(get_db), current_gm=D
         raise HTTPException(status_code=400, detail=f"Cannot open decisions in state: {game.phase_state}")
 
     game.phase_state = PhaseState.OPEN_FOR_DECISIONS
+    bump_state_version(db, game.id)
     db.commit()
+    publish_game_state(game)
     return {"message": "Phase opened for decisions"}
 
 
+def _selected_actions(decision: PhaseDecision) -> List[str]:
+    """Extract the list of selected actions from a decision's actions payload."""
+    if isinstance(decision.actions, dict):
+        return decision.actions.get("selected", []) or []
+    if isinstance(decision.actions, list):
+        return decision.actions
+    return []
+
+
 @router.post("/{game_id}/phase/lock_decisions")
 def lock_decisions(game_id: int, db: Session = Depends(get_db), current_gm=Depends(get_current_gm)):
     game = db.query(Game).filter(Game.id == game_id).first()
@@ -126,149 +150,105 @@ def lock_decisions(game_id: int, db: Session = Depends(get_db), current_gm=Depen
     if not current_phase:
         raise HTTPException(status_code=404, detail="Current phase not found")
 
-    # Aggregate votes for all teams before locking
+    # Load everything the lock needs for all teams up front
     teams = db.query(Team).filter(Team.game_id == game_id).all()
-    for team in teams:
-        # Get all players in team
-        players = db.query(Player).filter(
-            Player.game_id == game_id,
-            Player.team_id == team.id
-        ).all()
-        
-        if not players:
-            continue
-        
-        # Get all votes for this team and phase
-        votes = db.query(PlayerVote).filter(
-            PlayerVote.game_id == game_id,
-            PlayerVote.phase_id == game.current_phase_id,
-            PlayerVote.team_id == team.id
-        ).all()
-        
-        if votes:
-            # Aggregate votes - count votes per action
-            action_counts = Counter(vote.selected_action for vote in votes)
-            winning_action = action_counts.most_common(1)[0][0] if action_counts else None
-            
-            # Get all justifications
-            justifications = [v.justification for v in votes if v.justification]
-            combined_justification = "\n\n".join(justifications) if justifications else "Team vote"
-            
-            # Check if decision already exists
-            existing_decision = db.query(PhaseDecision).filter(
-                PhaseDecision.game_id == game_id,
-                PhaseDecision.team_id == team.id,
-                PhaseDecision.phase_id == game.current_phase_id
-            ).first()
-            
-            if not existing_decision:
-                # Create decision from aggregated votes
-                decision = PhaseDecision(
-                    game_id=game_id,
-                    team_id=team.id,
-                    phase_id=game.current_phase_id,
-                    actions={"selected": [winning_action], "vote_counts": dict(action_counts)},
-                    free_text_justification=combined_justification,
-                    status=DecisionStatus.SUBMITTED
-                )
-                db.add(decision)
-    
-    db.flush()  # Ensure decisions are in database before scoring
-    
-    # Get all decisions for this phase and auto-score them
+    teams_by_id = {team.id: team for team in teams}
+
+    team_sizes = {team.id: 0 for team in teams}
+    for team_id, player_count in db.query(Player.team_id, func.count(Player.id)).filter(
+        Player.game_id == game_id
+    ).group_by(Player.team_id).all():
+        team_sizes[team_id] = player_count
+
+    votes_by_team = {}
+    for vote in db.query(PlayerVote).filter(
+        PlayerVote.game_id == game_id,
+        PlayerVote.phase_id == current_phase.id
+    ).order_by(PlayerVote.id).all():
+        votes_by_team.setdefault(vote.team_id, []).append(vote)
+
     decisions = db.query(PhaseDecision).filter(
         PhaseDecision.game_id == game_id,
-        PhaseDecision.phase_id == current_phase.id,
-        PhaseDecision.status == DecisionStatus.SUBMITTED
+        PhaseDecision.phase_id == current_phase.id
     ).all()
-    
-    # Calculate average team size for weighting
-    team_sizes = {}
+    teams_with_decision = {decision.team_id for decision in decisions}
+
+    # Aggregate votes into a decision for every team that doesn't have one yet
     for team in teams:
-        player_count = db.query(Player).filter(Player.team_id == team.id).count()
-        team_sizes[team.id] = player_count
-    
+        votes = votes_by_team.get(team.id)
+        if not team_sizes.get(team.id) or not votes or team.id in teams_with_decision:
+            continue
+
+        action_counts = Counter(vote.selected_action for vote in votes)
+        winning_action = action_counts.most_common(1)[0][0]
+        justifications = [v.justification for v in votes if v.justification]
+        decision = PhaseDecision(
+            game_id=game_id,
+            team_id=team.id,
+            phase_id=current_phase.id,
+            actions={"selected": [winning_action], "vote_counts": dict(action_counts)},
+            free_text_justification="\n\n".join(justifications) if justifications else "Team vote",
+            status=DecisionStatus.SUBMITTED
+        )
+        db.add(decision)
+        decisions.append(decision)
+
     average_team_size = sum(team_sizes.values()) / len(team_sizes) if team_sizes else 1
-    
-    # Auto-score each decision
+
+    # Scoring weights for this scenario (cached per process)
+    rules = scoring_rules.get_rules(db, game.scenario_id)
+
+    # Auto-score every submitted decision in memory; rows are written in one flush below
+    score_events = []
     for decision in decisions:
-        # Get team role
-        team = db.query(Team).filter(Team.id == decision.team_id).first()
+        if decision.status != DecisionStatus.SUBMITTED:
+            continue
+        team = teams_by_id.get(decision.team_id)
         if not team:
             continue
-        
-        # Extract selected action from decision.actions
-        selected_actions = []
-        if isinstance(decision.actions, dict):
-            if "selected" in decision.actions:
-                selected_actions = decision.actions["selected"]
-            elif isinstance(decision.actions, list):
-                selected_actions = decision.actions
-        elif isinstance(decision.actions, list):
-            selected_actions = decision.actions
-        
-        # Get scenario name for scoring
-        scenario = db.query(Scenario).filter(Scenario.id == game.scenario_id).first()
-        scenario_name = scenario.name if scenario else "Ransomware Incident Response"
-        
-        # Debug logging
-        import logging
-        logger = logging.getLogger(__name__)
-        logger.info(f"Scoring decision: scenario={scenario_name}, phase={current_phase.order_index}, team_role={team.role}, actions={selected_actions}")
-        
-        # Calculate base score
+
         try:
-            base_score, explanation = calculate_team_decision_score(
-                scenario_name=scenario_name,
+            base_score, explanation = rules.calculate_team_decision_score(
                 phase_order_index=current_phase.order_index,
                 team_role=team.role,
-                selected_actions=selected_actions
+                selected_actions=_selected_actions(decision)
             )
         except Exception as e:
-            logger.error(f"Error calculating score: {e}")
+            logger.error(f"Error calculating score for team {team.id}: {e}")
             base_score = 0
             explanation = f"Error calculating score: {str(e)}"
-        
-        # Ensure base_score is a number
-        if base_score is None:
-            base_score = 0
-            explanation = explanation or "No score calculated"
-        
-        logger.info(f"Calculated score: base_score={base_score}, explanation={explanation}")
-        
+
         # Apply team size weighting (set normalize=True to enable, False to disable)
         try:
             final_score = calculate_weighted_score(
-                base_score=base_score,
+                base_score=base_score or 0,
                 team_size=team_sizes.get(team.id, 1),
                 average_team_size=average_team_size,
                 normalize=False  # Set to True to enable team size normalization
             )
         except Exception as e:
-            logger.error(f"Error applying team size weighting: {e}")
-            final_score = base_score
-        
-        # Ensure final_score is a number
-        if final_score is None:
-            final_score = 0
-        
-        logger.info(f"Final score after weighting: {final_score}")
-        
-        # Update decision
+            logger.error(f"Error applying team size weighting for team {team.id}: {e}")
+            final_score = base_score or 0
+
         decision.score_awarded = final_score
         decision.gm_notes = f"Auto-scored: {explanation}"
         decision.status = DecisionStatus.SCORED
-        
+
         # Always create score event, even if score is 0
-        score_event = ScoreEvent(
+        score_events.append(ScoreEvent(
             game_id=game_id,
             team_id=decision.team_id,
             phase_id=current_phase.id,
-            delta=int(final_score),  # Ensure it's an integer
+            delta=int(final_score),
             reason=f"Phase {current_phase.order_index + 1} auto-scored: {explanation}"
-        )
-        db.add(score_event)
-        logger.info(f"Created ScoreEvent: game_id={game_id}, team_id={decision.team_id}, phase_id={current_phase.id}, delta={final_score}")
+        ))
+    db.add_all(score_events)
+
+    logger.info(
+        f"Locked game {game_id} phase {current_phase.order_index}: "
+        f"scored {len(score_events)} decision(s) "
+        f"({', '.join(f'team {e.team_id}={e.delta}' for e in score_events)})"
+    )
 
     # After auto-scoring, automatically move to next phase
     # Find next phase
@@ -282,10 +262,11 @@ def lock_decisions(game_id: int, db: Session = Depends(get_db), current_gm=Depen
         game.phase_state = PhaseState.BRIEFING
     else:
         # No more phases, end game
-        game.status = GameStatus.FINISHED
-        game.phase_state = PhaseState.COMPLETE
+        _finish_game(game)
 
+    bump_state_version(db, game.id)
     db.commit()
+    publish_game_state(game)
     return {"message": "Decisions locked, auto-scored, and moved to next phase", "next_phase_id": next_phase.id if next_phase else None}
 
 
@@ -296,7 +277,9 @@ def resolve_phase(game_id: int, db: Session = Depends(get_db), current_gm=Depend
         raise HTTPException(status_code=404, detail="Game not found")
 
     game.phase_state = PhaseState.RESOLUTION
+    bump_state_version(db, game.id)
     db.commit()
+    publish_game_state(game)
     return {"message": "Phase in resolution"}
 
 
@@ -325,10 +308,11 @@ def complete_and_next(game_id: int, db: Session = Depends(get_db), current_gm=De
         game.phase_state = PhaseState.BRIEFING
     else:
         # No more phases, end game
-        game.status = GameStatus.FINISHED
-        game.phase_state = PhaseState.COMPLETE
+        _finish_game(game)
 
+    bump_state_version(db, game.id)
     db.commit()
+    publish_game_state(game)
     return {"message": "Phase completed", "next_phase_id": next_phase.id if next_phase else None}
 
 
@@ -338,12 +322,21 @@ def end_game(game_id: int, db: Session = Depends(get_db), current_gm=Depends(get
     if not game or game.gm_id != current_gm.id:
         raise HTTPException(status_code=404, detail="Game not found")
 
-    game.status = GameStatus.FINISHED
-    game.phase_state = PhaseState.COMPLETE
+    _finish_game(game)
+    bump_state_version(db, game.id)
     db.commit()
+    publish_game_state(game)
     return {"message": "Game ended"}
 
 
+def _finish_game(game: Game):
+    # Ending an already finished game keeps its original finish time
+    if game.status != GameStatus.FINISHED:
+        game.finished_at = func.now()
+    game.status = GameStatus.FINISHED
+    game.phase_state = PhaseState.COMPLETE
+
+
 @router.delete("/{game_id}")
 def delete_game(game_id: int, db: Session = Depends(get_db), current_gm=Depends(get_current_gm)):
     game = db.query(Game).filter(Game.id == game_id).first()
@@ -351,14 +344,16 @@ def delete_game(game_id: int, db: Session = Depends(get_db), current_gm=Depends(
         raise HTTPException(status_code=404, detail="Game not found")
 
     # Delete related records in the correct order to avoid foreign key violations
-    # 1. Delete player votes (references players)
+    # 1. Delete player votes and their tallies (references players)
     db.query(PlayerVote).filter(PlayerVote.game_id == game_id).delete()
+    delete_vote_tallies(db, [game_id])
     
     # 2. Delete phase decisions (references game, team, phase)
     db.query(PhaseDecision).filter(PhaseDecision.game_id == game_id).delete()
     
-    # 3. Delete score events (references game, team, phase)
+    # 3. Delete score events and their per-phase totals (references game, team, phase)
     db.query(ScoreEvent).filter(ScoreEvent.game_id == game_id).delete()
+    delete_team_phase_scores(db, [game_id])
     
     # 4. Delete phase GM notes
     db.query(PhaseGMNotes).filter(PhaseGMNotes.game_id == game_id).delete()
@@ -369,6 +364,7 @@ def delete_game(game_id: int, db: Session = Depends(get_db), current_gm=Depends(
     # 6. Delete the game (cascade will handle teams and players)
     db.delete(game)
     db.commit()
+    remove_exports(game_id)
     return {"message": "Game deleted"}
 
 
@@ -474,229 +470,151 @@ def generate_after_action_report(
     if not game or game.gm_id != current_gm.id:
         raise HTTPException(status_code=404, detail="Game not found")
     
-    # Get all phases for this scenario
-    phases = db.query(ScenarioPhase).filter(
-        ScenarioPhase.scenario_id == game.scenario_id
-    ).order_by(ScenarioPhase.order_index).all()
-    
-    # Get all votes for all phases
-    phase_analyses = []
-    all_ratings = []
-    
-    for phase in phases:
-        votes = db.query(PlayerVote).filter(
-            PlayerVote.game_id == game_id,
-            PlayerVote.phase_id == phase.id
-        ).all()
-        
-        if votes:
-            ratings = [v.effectiveness_rating for v in votes if v.effectiveness_rating is not None]
-            avg_rating = sum(ratings) / len(ratings) if ratings else None
-            
-            # Convert to risk rating (industry standard: NIST/FIRST)
-            if avg_rating:
-                if avg_rating <= 2:
-                    risk_rating = "Critical"
-                elif avg_rating <= 4:
-                    risk_rating = "High"
-                elif avg_rating <= 6:
-                    risk_rating = "Medium"
-                elif avg_rating <= 8:
-                    risk_rating = "Low"
-                else:
-                    risk_rating = "Very Low"
-            else:
-                risk_rating = "Not Rated"
-                avg_rating = 0
-            
-            if avg_rating:
-                all_ratings.append(avg_rating)
-            
-            # Get comments
-            comments = []
-            for v in votes:
-                if v.comments:
-                    player = db.query(Player).filter(Player.id == v.player_id).first()
-                    team = db.query(Team).filter(Team.id == v.team_id).first()
-                    comments.append({
-                        "player_name": player.display_name if player else "Unknown",
-                        "team_role": team.role if team else "unknown",
-                        "rating": v.effectiveness_rating,
-                        "comments": v.comments
-                    })
-            
-            # Get GM notes
-            gm_notes_obj = db.query(PhaseGMNotes).filter(
-                PhaseGMNotes.game_id == game_id,
-                PhaseGMNotes.phase_id == phase.id,
-                PhaseGMNotes.gm_id == current_gm.id
-            ).first()
-            
-            phase_analyses.append(PhaseAnalysis(
-                phase_id=phase.id,
-                phase_name=phase.name,
-                phase_order=phase.order_index,
-                average_rating=round(avg_rating, 2) if avg_rating else None,
-                risk_rating=risk_rating,
-                total_responses=len(votes),
-                comments=comments,
-                gm_notes=gm_notes_obj.notes if gm_notes_obj else None
-            ))
-        else:
-            # Phase with no votes
-            phase_analyses.append(PhaseAnalysis(
-                phase_id=phase.id,
-                phase_name=phase.name,
-                phase_order=phase.order_index,
-                average_rating=None,
-                risk_rating="Not Rated",
-                total_responses=0,
-                comments=[],
-                gm_notes=None
-            ))
-    
-    # Calculate overall risk
-    if all_ratings:
-        overall_avg = sum(all_ratings) / len(all_ratings)
-        if overall_avg <= 2:
-            overall_risk = "Critical"
-        elif overall_avg <= 4:
-            overall_risk = "High"
-        elif overall_avg <= 6:
-            overall_risk = "Medium"
-        elif overall_avg <= 8:
-            overall_risk = "Low"
-        else:
-            overall_risk = "Very Low"
-    else:
-        overall_avg = 0
-        overall_risk = "Not Rated"
-    
-    report_data = {
-        "game_id": game_id,
-        "scenario_name": game.scenario.name if game.scenario else "Unknown",
-        "generated_at": datetime.now().isoformat(),
-        "overall_risk_rating": overall_risk,
-        "overall_risk_score": round(overall_avg, 2),
-        "phase_analyses": [p.dict() for p in phase_analyses]
-    }
-    
-    # Save report
-    existing_report = db.query(AfterActionReport).filter(
-        AfterActionReport.game_id == game_id
-    ).first()
-    
-    if existing_report:
-        existing_report.report_data = report_data
-        existing_report.overall_risk_rating = overall_risk
-        existing_report.overall_risk_score = round(overall_avg, 2)
-        existing_report.generated_at = func.now()
-    else:
-        report = AfterActionReport(
-            game_id=game_id,
-            overall_risk_rating=overall_risk,
-            overall_risk_score=round(overall_avg, 2),
-            report_data=report_data,
-            gm_id=current_gm.id
-        )
-        db.add(report)
-    
-    db.commit()
+    report_data = get_or_build_report(db, game, current_gm.id)
     
     return AfterActionReportResponse(
         game_id=game_id,
-        scenario_name=game.scenario.name if game.scenario else "Unknown",
-        generated_at=datetime.now().isoformat(),
-        overall_risk_rating=overall_risk,
-        overall_risk_score=round(overall_avg, 2),
-        phase_analyses=phase_analyses
+        scenario_name=report_data["scenario_name"],
+        generated_at=report_data["generated_at"],
+        overall_risk_rating=report_data["overall_risk_rating"],
+        overall_risk_score=report_data["overall_risk_score"],
+        phase_analyses=[PhaseAnalysis(**p) for p in report_data["phase_analyses"]]
     )
 
 
+def _export_file_response(path, game_id: int, fingerprint: str, fmt: str, scenario_name: str):
+    # Generate filename
+    extension, media_type, _ = EXPORT_FORMATS[fmt]
+    scenario_name_safe = "".join(c for c in scenario_name if c.isalnum() or c in (' ', '-', '_')).strip()
+    filename = f"AAR_{scenario_name_safe}_{game_id}_{datetime.now().strftime('%Y%m%d')}.{extension}"
+    
+    return file_response(
+        path,
+        media_type=media_type,
+        headers={
+            "ETag": export_etag(fingerprint, fmt),
+            "Cache-Control": "private, no-cache",
+            "Content-Disposition": f'attachment; filename="{filename}"'
+        }
+    )
+
+
+def _not_modified(request: Request, fingerprint: str, fmt: str):
+    etag = export_etag(fingerprint, fmt)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "private, no-cache"})
+    return None
+
+
+def _export_report(game_id: int, fmt: str, request: Request, db: Session, current_gm):
+    """Serve a rendered AAR export, re-rendering only when the report data changes."""
+    game = db.query(Game).filter(Game.id == game_id).first()
+    if not game or game.gm_id != current_gm.id:
+        raise HTTPException(status_code=404, detail="Game not found")
+    
+    # Get or generate report
+    report_data = get_or_build_report(db, game, current_gm.id)
+    fingerprint = report_fingerprint(report_data)
+    not_modified = _not_modified(request, fingerprint, fmt)
+    if not_modified:
+        return not_modified
+    
+    # Legacy download links expect the file itself: wait for the render (joining
+    # one already in flight); new clients use the export job endpoints instead.
+    # The session's connection goes back to the pool for the wait.
+    db.close()
+    path = wait_for_export(game_id, report_data, fingerprint, fmt)
+    return _export_file_response(path, game_id, fingerprint, fmt, report_data.get('scenario_name', 'Report'))
+
+
+def _submit_export_job(game_id: int, report_data, fingerprint: str, fmt: str) -> ExportJobResponse:
+    job_id = submit_export(game_id, report_data, fingerprint, fmt)
+    job_status = export_job_status(game_id, fingerprint, fmt) or {"status": JOB_PENDING, "error": None}
+    return ExportJobResponse(job_id=job_id, format=fmt, **job_status)
+
+
 @router.get("/{game_id}/after-action-report/export/word")
 def export_word_report(
     game_id: int,
+    request: Request,
     db: Session = Depends(get_db),
     current_gm=Depends(get_current_gm)
 ):
     """Export After Action Report as Word document (.docx)"""
-    game = db.query(Game).filter(Game.id == game_id).first()
-    if not game or game.gm_id != current_gm.id:
-        raise HTTPException(status_code=404, detail="Game not found")
-    
-    # Get or generate report
-    existing_report = db.query(AfterActionReport).filter(
-        AfterActionReport.game_id == game_id
-    ).first()
-    
-    if not existing_report:
-        # Generate report first by calling the endpoint logic directly
-        aar_response = generate_after_action_report(game_id, db, current_gm)
-        report_data = {
-            "game_id": game_id,
-            "scenario_name": aar_response.scenario_name,
-            "generated_at": aar_response.generated_at,
-            "overall_risk_rating": aar_response.overall_risk_rating,
-            "overall_risk_score": aar_response.overall_risk_score,
-            "phase_analyses": [p.dict() for p in aar_response.phase_analyses]
-        }
-    else:
-        report_data = existing_report.report_data
-    
-    # Generate Word document
-    word_doc = generate_word_report(report_data)
-    
-    # Generate filename
-    scenario_name_safe = "".join(c for c in report_data.get('scenario_name', 'Report') if c.isalnum() or c in (' ', '-', '_')).strip()
-    filename = f"AAR_{scenario_name_safe}_{game_id}_{datetime.now().strftime('%Y%m%d')}.docx"
-    
-    return StreamingResponse(
-        word_doc,
-        media_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
-    )
+    return _export_report(game_id, "word", request, db, current_gm)
 
 
 @router.get("/{game_id}/after-action-report/export/pdf")
 def export_pdf_report(
     game_id: int,
+    request: Request,
     db: Session = Depends(get_db),
     current_gm=Depends(get_current_gm)
 ):
     """Export After Action Report as PDF document"""
+    return _export_report(game_id, "pdf", request, db, current_gm)
+
+
+@router.post("/{game_id}/after-action-report/export/{fmt}", response_model=ExportJobResponse, status_code=202)
+def start_report_export(
+    game_id: int,
+    fmt: str,
+    db: Session = Depends(get_db),
+    current_gm=Depends(get_current_gm)
+):
+    """Start rendering an After Action Report export (word or pdf) in the background"""
+    if fmt not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported export format: {fmt}")
     game = db.query(Game).filter(Game.id == game_id).first()
     if not game or game.gm_id != current_gm.id:
         raise HTTPException(status_code=404, detail="Game not found")
     
-    # Get or generate report
-    existing_report = db.query(AfterActionReport).filter(
-        AfterActionReport.game_id == game_id
-    ).first()
-    
-    if not existing_report:
-        # Generate report first by calling the endpoint logic directly
-        aar_response = generate_after_action_report(game_id, db, current_gm)
-        report_data = {
-            "game_id": game_id,
-            "scenario_name": aar_response.scenario_name,
-            "generated_at": aar_response.generated_at,
-            "overall_risk_rating": aar_response.overall_risk_rating,
-            "overall_risk_score": aar_response.overall_risk_score,
-            "phase_analyses": [p.dict() for p in aar_response.phase_analyses]
-        }
-    else:
-        report_data = existing_report.report_data
-    
-    # Generate PDF document
-    pdf_doc = generate_pdf_report(report_data)
-    
-    # Generate filename
-    scenario_name_safe = "".join(c for c in report_data.get('scenario_name', 'Report') if c.isalnum() or c in (' ', '-', '_')).strip()
-    filename = f"AAR_{scenario_name_safe}_{game_id}_{datetime.now().strftime('%Y%m%d')}.pdf"
+    report_data = get_or_build_report(db, game, current_gm.id)
+    return _submit_export_job(game_id, report_data, report_fingerprint(report_data), fmt)
+
+
+@router.get("/{game_id}/after-action-report/export-jobs/{job_id}", response_model=ExportJobResponse)
+def get_report_export_job(
+    game_id: int,
+    job_id: str,
+    db: Session = Depends(get_db),
+    current_gm=Depends(get_current_gm)
+):
+    """Get the status of a background export job"""
+    game = db.query(Game).filter(Game.id == game_id).first()
+    if not game or game.gm_id != current_gm.id:
+        raise HTTPException(status_code=404, detail="Game not found")
     
-    return StreamingResponse(
-        pdf_doc,
-        media_type="application/pdf",
-        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
-    )
+    parsed = parse_export_job_id(job_id)
+    job_status = export_job_status(game_id, parsed[1], parsed[0]) if parsed else None
+    if not job_status:
+        raise HTTPException(status_code=404, detail="Export job not found")
+    return ExportJobResponse(job_id=job_id, format=parsed[0], **job_status)
+
 
+@router.get("/{game_id}/after-action-report/export-jobs/{job_id}/download")
+def download_report_export(
+    game_id: int,
+    job_id: str,
+    request: Request,
+    db: Session = Depends(get_db),
+    current_gm=Depends(get_current_gm)
+):
+    """Download the file produced by a finished export job"""
+    game = db.query(Game).filter(Game.id == game_id).first()
+    if not game or game.gm_id != current_gm.id:
+        raise HTTPException(status_code=404, detail="Game not found")
+    
+    parsed = parse_export_job_id(job_id)
+    job_status = export_job_status(game_id, parsed[1], parsed[0]) if parsed else None
+    if not job_status:
+        raise HTTPException(status_code=404, detail="Export job not found")
+    if job_status["status"] != JOB_DONE:
+        raise HTTPException(status_code=409, detail=f"Export job is {job_status['status']}")
+    
+    fmt, fingerprint = parsed
+    not_modified = _not_modified(request, fingerprint, fmt)
+    if not_modified:
+        return not_modified
+    scenario_name = game.scenario.name if game.scenario else "Unknown"
+    return _export_file_response(export_path(game_id, fingerprint, fmt), game_id, fingerprint, fmt, scenario_name)
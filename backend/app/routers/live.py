@@ -0,0 +1,55 @@
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
+import asyncio
+import json
+from app.database import SessionLocal
+from app.models import Game
+from app.live import broker
+
+router = APIRouter()
+
+# Comment line sent when idle so proxies keep the connection open
+KEEPALIVE_SECONDS = 15
+
+
+def _resolve_game_id(game_identifier: str):
+    # Short-lived session: the stream itself must not hold a DB connection
+    db = SessionLocal()
+    try:
+        if game_identifier.isdigit():
+            return db.query(Game.id).filter(Game.id == int(game_identifier)).scalar()
+        return db.query(Game.id).filter(Game.audience_code == game_identifier).scalar()
+    finally:
+        db.close()
+
+
+@router.get("/{game_identifier}/events")
+async def stream_game_events(game_identifier: str, request: Request):
+    """Server-Sent Events stream of state changes for a game (by ID or audience code)."""
+    game_id = await asyncio.to_thread(_resolve_game_id, game_identifier)
+    if not game_id:
+        raise HTTPException(status_code=404, detail="Game not found")
+
+    queue = broker.subscribe(game_id)
+
+    async def event_stream():
+        try:
+            yield f"data: {json.dumps({'type': 'connected', 'game_id': game_id})}\n\n"
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield f"data: {json.dumps(event)}\n\n"
+        finally:
+            broker.unsubscribe(game_id, queue)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",  # Disable nginx buffering for this response
+        }
+    )
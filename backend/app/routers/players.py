@@ -1,11 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
 import sqlalchemy as sa
-from app.database import get_db
-from app.models import Game, Team, Player, ScenarioPhase, PhaseDecision, DecisionStatus, PlayerVote, Artifact, scenario_phase_artifacts, ScoreEvent
+from app.database import get_db, get_async_db
+from app.models import Game, Team, Player, ScenarioPhase, PhaseDecision, DecisionStatus, PlayerVote, Artifact, scenario_phase_artifacts
 from app.schemas import JoinRequest, JoinResponse, PlayerStateResponse, VotingStatusResponse, PlayerVoteResponse, PlayerReportCardResponse, PhaseReportCardEntry
 from typing import Optional
+from app.live import publish_game_event, bump_team_state_version
+from app.http_cache import etag_matches
+from app.score_totals import team_phase_scores
+from app.vote_tallies import all_voted, get_vote_tally
 
 router = APIRouter()
 
@@ -38,10 +43,16 @@ def join_game(join_data: JoinRequest, db: Session = Depends(get_db)):
             display_name=join_data.display_name
         )
         db.add(player)
-        db.commit()
-        db.refresh(player)
+        # The roster count is only shown to the player's own team
+        bump_team_state_version(db, team.id)
+        db.flush()
 
-    return JoinResponse(
+    # Build the response before committing so the commit is the last query: the
+    # session then hands its connection back here. Under a join burst, lazy loads
+    # after the commit kept a read transaction (and a pooled connection) open until
+    # FastAPI got a threadpool thread to serialize the response, while every thread
+    # was busy in another join waiting for a connection.
+    join_response = JoinResponse(
         player_id=player.id,
         team_id=team.id,
         game_id=game.id,
@@ -51,10 +62,46 @@ def join_game(join_data: JoinRequest, db: Session = Depends(get_db)):
             "game_status": game.status.value,
         }
     )
+    db.commit()
+    if not existing_player:
+        # ids from the response: the committed (expired) objects would reload
+        publish_game_event(
+            join_response.game_id, "player_joined",
+            team_id=join_response.team_id, player_id=join_response.player_id,
+            display_name=join_data.display_name
+        )
+
+    return join_response
 
 
 @router.get("/games/{game_id}/player/{player_id}/state", response_model=PlayerStateResponse)
-def get_player_state(game_id: int, player_id: int, db: Session = Depends(get_db)):
+async def get_player_state(game_id: int, player_id: int, request: Request, response: Response, db: AsyncSession = Depends(get_async_db)):
+    # Polled by every player: runs on the async engine instead of a threadpool thread.
+    # Cheap version check first: unchanged state is answered with 304 and no further queries.
+    # The ETag combines the game's version with the team's, so the other team's
+    # votes and joins don't invalidate it.
+    versions = (await db.execute(
+        select(Game.state_version, Team.state_version)
+        .select_from(Player)
+        .join(Game, Game.id == Player.game_id)
+        .join(Team, Team.id == Player.team_id)
+        .where(Player.id == player_id, Player.game_id == game_id)
+    )).one_or_none()
+    if versions is None:
+        # Unknown game or player: the full build raises the matching 404
+        return await db.run_sync(_build_player_state, game_id, player_id)
+
+    etag = f'W/"{game_id}-{player_id}-{versions[0]}-{versions[1]}"'
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "no-cache"
+
+    # The state is assembled with ORM relationship loads, which run_sync allows on the async connection
+    return await db.run_sync(_build_player_state, game_id, player_id)
+
+
+def _build_player_state(db: Session, game_id: int, player_id: int) -> PlayerStateResponse:
     player = db.query(Player).filter(Player.id == player_id, Player.game_id == game_id).first()
     if not player:
         raise HTTPException(status_code=404, detail="Player not found")
@@ -83,13 +130,8 @@ def get_player_state(game_id: int, player_id: int, db: Session = Depends(get_db)
                     (scenario_phase_artifacts.c.team_role.is_(None))
                 )
             ).scalars().all()
+            # Artifact.content is deferred: players get metadata and content_hash only
             artifacts = db.query(Artifact).filter(Artifact.id.in_(artifact_ids)).all() if artifact_ids else []
-            # Debug: Log artifacts found
-            import logging
-            logger = logging.getLogger(__name__)
-            logger.info(f"Phase {current_phase.id}: Found {len(artifacts)} artifacts for {player.team.role} team")
-            for artifact in artifacts:
-                logger.info(f"  - {artifact.name} (ID: {artifact.id}): content={bool(artifact.content)}, content_len={len(artifact.content) if artifact.content else 0}")
             if player.team.role == "red":
                 team_objective = current_phase.red_objective
             else:
@@ -116,24 +158,21 @@ def get_player_state(game_id: int, player_id: int, db: Session = Depends(get_db)
         
         # Get team voting status
         if game.phase_state.value == "open_for_decisions":
-            team_players = db.query(Player).filter(
-                Player.game_id == game_id,
-                Player.team_id == player.team_id
-            ).all()
-            
-            votes = db.query(PlayerVote).filter(
+            tally = get_vote_tally(db, game_id, game.current_phase_id, player.team_id)
+            votes = db.query(PlayerVote, Player.display_name).outerjoin(
+                Player, Player.id == PlayerVote.player_id
+            ).filter(
                 PlayerVote.game_id == game_id,
                 PlayerVote.phase_id == game.current_phase_id,
                 PlayerVote.team_id == player.team_id
-            ).all()
+            ).order_by(PlayerVote.id).all()
             
             vote_responses = []
-            for v in votes:
-                p = db.query(Player).filter(Player.id == v.player_id).first()
+            for v, player_name in votes:
                 vote_responses.append(PlayerVoteResponse(
                     id=v.id,
                     player_id=v.player_id,
-                    player_name=p.display_name if p else "Unknown",
+                    player_name=player_name or "Unknown",
                     selected_action=v.selected_action,
                     effectiveness_rating=v.effectiveness_rating,
                     comments=v.comments,
@@ -141,14 +180,23 @@ def get_player_state(game_id: int, player_id: int, db: Session = Depends(get_db)
                     voted_at=v.voted_at
                 ))
             
+            if tally:
+                total_players = tally.total_players
+            else:
+                total_players = db.query(func.count(Player.id)).filter(
+                    Player.game_id == game_id,
+                    Player.team_id == player.team_id
+                ).scalar()
+            
             team_voting_status = VotingStatusResponse(
                 team_id=player.team_id,
                 team_name=player.team.name,
                 team_role=player.team.role,
-                total_players=len(team_players),
-                votes_submitted=len(votes),
+                total_players=total_players,
+                votes_submitted=tally.votes_submitted if tally else 0,
                 votes=vote_responses,
-                all_voted=len(votes) == len(team_players) and len(team_players) > 0
+                vote_counts=tally.action_counts if tally else {},
+                all_voted=all_voted(tally)
             )
 
     # Get phase-specific actions if available
@@ -176,15 +224,6 @@ def get_player_state(game_id: int, player_id: int, db: Session = Depends(get_db)
             logger.error(f"Error extracting available_actions: {e}", exc_info=True)
             available_actions = None
     
-    # Debug: Verify artifacts have content before returning
-    import logging
-    logger = logging.getLogger(__name__)
-    for artifact in artifacts:
-        logger.info(f"Returning artifact {artifact.id} ({artifact.name}): content={bool(artifact.content)}, content_len={len(artifact.content) if artifact.content else 0}")
-        # Force load content if it's not loaded (lazy loading issue)
-        if hasattr(artifact, 'content'):
-            _ = artifact.content  # Access to ensure it's loaded
-    
     return PlayerStateResponse(
         current_phase=current_phase,
         phase_state=game.phase_state,
@@ -217,6 +256,9 @@ def get_player_report_card(game_id: int, player_id: int, db: Session = Depends(g
         ScenarioPhase.scenario_id == game.scenario_id
     ).order_by(ScenarioPhase.order_index).all()
 
+    # Team's per-phase totals from the rollup in one query
+    scores_by_phase = team_phase_scores(db, game_id, player.team_id).get(player.team_id, {})
+
     phase_entries = []
     total_score = 0
     effectiveness_ratings = []
@@ -236,14 +278,8 @@ def get_player_report_card(game_id: int, player_id: int, db: Session = Depends(g
             PhaseDecision.phase_id == phase.id
         ).first()
 
-        # Get score for this phase
-        phase_score = db.query(func.coalesce(func.sum(ScoreEvent.delta), 0)).filter(
-            ScoreEvent.game_id == game_id,
-            ScoreEvent.team_id == player.team_id,
-            ScoreEvent.phase_id == phase.id
-        ).scalar() or 0
-
-        total_score += int(phase_score)
+        phase_score = scores_by_phase.get(phase.id, 0)
+        total_score += phase_score
 
         # Extract team decision action
         team_decision_action = None
@@ -288,6 +324,6 @@ def get_player_report_card(game_id: int, player_id: int, db: Session = Depends(g
         total_score=total_score,
         average_effectiveness_rating=average_effectiveness_rating,
         phases=phase_entries,
-        game_completed_at=game.updated_at if game.status.value == "finished" else None
+        game_completed_at=game.finished_at
     )
 
@@ -1,12 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from sqlalchemy import and_
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy import and_, func, distinct
+from typing import List, Optional
 from app.database import get_db
 from app.auth import get_current_gm
 from app.models import Scenario, ScenarioPhase, Artifact, scenario_phase_artifacts, ScenarioTemplate
+from app.live import bump_scenario_state_versions
+from app.scoring_rules import scoring_rules
 from app.schemas import (
-    ScenarioResponse, ScenarioCreate, ScenarioUpdate,
+    ScenarioResponse, ScenarioSummaryResponse, ScenarioSummaryPage, ScenarioCreate, ScenarioUpdate,
     ScenarioPhaseCreate, PhaseArtifactLink,
     ScenarioTemplateCreate, ScenarioTemplateResponse
 )
@@ -14,15 +16,67 @@ from app.schemas import (
 router = APIRouter()
 
 
+# Page size limits for the scenario list
+DEFAULT_SCENARIO_PAGE_SIZE = 50
+MAX_SCENARIO_PAGE_SIZE = 200
+
+
+def _scenario_tree_options():
+    """Eager loading for scenarios with their phases and artifacts (including content)."""
+    return selectinload(Scenario.phases).selectinload(ScenarioPhase.artifacts).undefer(
+        Artifact.content_text
+    ).undefer(Artifact.content_blob)
+
+
 @router.get("", response_model=List[ScenarioResponse])
 def list_scenarios(db: Session = Depends(get_db), current_gm: dict = Depends(get_current_gm)):
-    scenarios = db.query(Scenario).all()
-    return scenarios
+    """List all scenarios with their phases and artifacts (see /summary for the lightweight list)."""
+    return db.query(Scenario).options(_scenario_tree_options()).all()
+
+
+@router.get("/summary", response_model=ScenarioSummaryPage)
+def list_scenario_summaries(
+    after_id: Optional[int] = Query(None, description="Return scenarios with id greater than this (next_cursor of the previous page)"),
+    limit: int = Query(DEFAULT_SCENARIO_PAGE_SIZE, ge=1, le=MAX_SCENARIO_PAGE_SIZE),
+    db: Session = Depends(get_db),
+    current_gm: dict = Depends(get_current_gm)
+):
+    """List scenario summaries (no phases or artifacts), paginated by id."""
+    # One aggregate query; fetch one extra row to know whether there is a next page
+    query = db.query(
+        Scenario.id,
+        Scenario.name,
+        Scenario.description,
+        Scenario.created_at,
+        func.count(distinct(ScenarioPhase.id)).label("phase_count"),
+        func.count(distinct(scenario_phase_artifacts.c.artifact_id)).label("artifact_count")
+    ).outerjoin(
+        ScenarioPhase, ScenarioPhase.scenario_id == Scenario.id
+    ).outerjoin(
+        scenario_phase_artifacts, scenario_phase_artifacts.c.phase_id == ScenarioPhase.id
+    )
+    if after_id is not None:
+        query = query.filter(Scenario.id > after_id)
+    rows = query.group_by(Scenario.id).order_by(Scenario.id).limit(limit + 1).all()
+    
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    return ScenarioSummaryPage(
+        items=[ScenarioSummaryResponse(**row._asdict()) for row in rows],
+        next_cursor=rows[-1].id if has_more else None
+    )
+
+
+def _load_scenario_tree(db: Session, scenario_id: int):
+    """Load a scenario with its phases and artifacts (including content) eagerly."""
+    return db.query(Scenario).options(
+        _scenario_tree_options()
+    ).filter(Scenario.id == scenario_id).populate_existing().first()
 
 
 @router.get("/{scenario_id}", response_model=ScenarioResponse)
 def get_scenario(scenario_id: int, db: Session = Depends(get_db), current_gm: dict = Depends(get_current_gm)):
-    scenario = db.query(Scenario).filter(Scenario.id == scenario_id).first()
+    scenario = _load_scenario_tree(db, scenario_id)
     if not scenario:
         raise HTTPException(status_code=404, detail="Scenario not found")
     return scenario
@@ -57,6 +111,7 @@ def create_scenario(
                 default_duration_seconds=phase_data.default_duration_seconds,
                 miro_frame_url=phase_data.miro_frame_url,
                 available_actions=phase_data.available_actions,
+                action_scores=phase_data.action_scores,
                 gm_prompt_questions=phase_data.gm_prompt_questions
             )
             db.add(phase)
@@ -99,8 +154,7 @@ def create_scenario(
                     )
         
         db.commit()
-        db.refresh(scenario)
-        return scenario
+        return _load_scenario_tree(db, scenario.id)
         
     except Exception as e:
         db.rollback()
@@ -146,6 +200,7 @@ def update_scenario(
                     default_duration_seconds=phase_data.default_duration_seconds,
                     miro_frame_url=phase_data.miro_frame_url,
                     available_actions=phase_data.available_actions,
+                    action_scores=phase_data.action_scores,
                     gm_prompt_questions=phase_data.gm_prompt_questions
                 )
                 db.add(phase)
@@ -184,9 +239,11 @@ def update_scenario(
                             )
                         )
         
+        # Games running this scenario must not serve cached player state
+        bump_scenario_state_versions(db, scenario.id)
         db.commit()
-        db.refresh(scenario)
-        return scenario
+        scoring_rules.invalidate(scenario.id)
+        return _load_scenario_tree(db, scenario.id)
         
     except Exception as e:
         db.rollback()
@@ -216,6 +273,7 @@ def delete_scenario(
     try:
         db.delete(scenario)
         db.commit()
+        scoring_rules.invalidate(scenario_id)
         return {"message": "Scenario deleted successfully"}
     except Exception as e:
         db.rollback()
@@ -32,6 +32,20 @@ class ArtifactResponse(ArtifactBase):
         from_attributes = True
 
 
+class PlayerArtifactResponse(BaseModel):
+    # Metadata only; the body is fetched from /artifacts/content/{id}?v={content_hash}
+    id: int
+    name: str
+    type: ArtifactType
+    description: Optional[str] = None
+    file_url: Optional[str] = None
+    embed_url: Optional[str] = None
+    content_hash: Optional[str] = None  # None if the artifact has no text content
+
+    class Config:
+        from_attributes = True
+
+
 class ArtifactCreate(ArtifactBase):
     notes_for_gm: Optional[str] = None
 
@@ -62,6 +76,20 @@ class ScenarioPhaseResponse(ScenarioPhaseBase):
     scenario_id: int
     artifacts: List[ArtifactResponse] = []
     available_actions: Optional[Dict[str, List[Dict[str, str]]]] = None  # {"red": [{"name": "...", "description": "..."}], "blue": [...]}
+    action_scores: Optional[Dict[str, Dict[str, int]]] = None  # {"red": {"action name": points}, "blue": {...}}
+
+    class Config:
+        from_attributes = True
+
+
+class PlayerScenarioPhaseResponse(ScenarioPhaseBase):
+    # No action_scores: scoring weights would reveal the best answer.
+    # No artifacts: players get their team's artifacts (metadata only) in
+    # PlayerStateResponse.artifacts. Leaving the fields out (rather than
+    # excluding them) keeps validation from loading them off the ORM object.
+    id: int
+    scenario_id: int
+    available_actions: Optional[Dict[str, List[Dict[str, str]]]] = None
 
     class Config:
         from_attributes = True
@@ -82,6 +110,20 @@ class ScenarioResponse(ScenarioBase):
         from_attributes = True
 
 
+class ScenarioSummaryResponse(BaseModel):
+    id: int
+    name: str
+    description: Optional[str] = None
+    created_at: Optional[datetime] = None
+    phase_count: int
+    artifact_count: int
+
+
+class ScenarioSummaryPage(BaseModel):
+    items: List[ScenarioSummaryResponse]
+    next_cursor: Optional[int] = None  # Pass as after_id to fetch the next page
+
+
 # Schema for linking artifacts to phases
 class PhaseArtifactLink(BaseModel):
     artifact_id: Optional[int] = None  # For existing artifacts
@@ -96,6 +138,7 @@ class PhaseArtifactLink(BaseModel):
 
 class ScenarioPhaseCreate(ScenarioPhaseBase):
     available_actions: Optional[Dict[str, List[Dict[str, str]]]] = None
+    action_scores: Optional[Dict[str, Dict[str, int]]] = None
     artifacts: List[PhaseArtifactLink] = []  # Links to artifacts (existing or new)
 
 
@@ -108,6 +151,7 @@ class ScenarioPhaseUpdate(BaseModel):
     default_duration_seconds: Optional[int] = None
     miro_frame_url: Optional[str] = None
     available_actions: Optional[Dict[str, List[Dict[str, str]]]] = None
+    action_scores: Optional[Dict[str, Dict[str, int]]] = None
     gm_prompt_questions: Optional[List[str]] = None
     artifacts: Optional[List[PhaseArtifactLink]] = None
 
@@ -176,11 +220,11 @@ class JoinResponse(BaseModel):
 
 
 class PlayerStateResponse(BaseModel):
-    current_phase: Optional[ScenarioPhaseResponse] = None
+    current_phase: Optional[PlayerScenarioPhaseResponse] = None
     phase_state: PhaseState
     phase_briefing_text: Optional[str] = None
     team_objective: Optional[str] = None
-    artifacts: List[ArtifactResponse] = []
+    artifacts: List[PlayerArtifactResponse] = []
     decision: Optional["DecisionResponse"] = None
     game_status: GameStatus
     team_role: Optional[str] = None
@@ -248,6 +292,7 @@ class VotingStatusResponse(BaseModel):
     total_players: int
     votes_submitted: int
     votes: List[PlayerVoteResponse] = []
+    vote_counts: Dict[str, int] = {}  # {selected_action: votes}
     all_voted: bool
 
 
@@ -345,6 +390,13 @@ class AfterActionReportResponse(BaseModel):
     phase_analyses: List[PhaseAnalysis]
 
 
+class ExportJobResponse(BaseModel):
+    job_id: str
+    format: str
+    status: str  # pending, done, failed
+    error: Optional[str] = None
+
+
 # Player Report Card schemas
 class PhaseReportCardEntry(BaseModel):
     phase_id: int
@@ -0,0 +1,61 @@
+"""
+Per-team, per-phase score totals.
+TeamPhaseScore holds SUM(score_events.delta) for each (game, team, phase) and
+is updated by ScoreEvent mapper events in the same transaction as the event
+(see app.models), so reading scores costs the same however many events a game
+has. rebuild_team_phase_scores() recomputes it from score_events.
+"""
+from collections import defaultdict
+from typing import Dict, Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.models import ScoreEvent, TeamPhaseScore
+
+
+def team_phase_scores(db: Session, game_id: int, team_id: Optional[int] = None) -> Dict[int, Dict[int, int]]:
+    """Score totals for a game as {team_id: {phase_id: score}} (optionally one team)."""
+    query = db.query(TeamPhaseScore.team_id, TeamPhaseScore.phase_id, TeamPhaseScore.score).filter(
+        TeamPhaseScore.game_id == game_id
+    )
+    if team_id is not None:
+        query = query.filter(TeamPhaseScore.team_id == team_id)
+    scores: Dict[int, Dict[int, int]] = defaultdict(dict)
+    for row in query.all():
+        scores[row.team_id][row.phase_id] = row.score
+    return scores
+
+
+def delete_team_phase_scores(db: Session, game_ids):
+    """Remove the totals of deleted games (needed when score events are bulk-deleted)."""
+    db.query(TeamPhaseScore).filter(TeamPhaseScore.game_id.in_(game_ids)).delete(synchronize_session=False)
+
+
+def rebuild_team_phase_scores(db: Session, game_id: Optional[int] = None) -> int:
+    """Recompute totals from score_events for one game or all games. Returns the number of rows written."""
+    totals = db.query(TeamPhaseScore)
+    events = db.query(
+        ScoreEvent.game_id,
+        ScoreEvent.team_id,
+        ScoreEvent.phase_id,
+        func.sum(ScoreEvent.delta).label("score"),
+        func.count(ScoreEvent.id).label("event_count"),
+        func.max(ScoreEvent.created_at).label("updated_at")
+    )
+    if game_id is not None:
+        totals = totals.filter(TeamPhaseScore.game_id == game_id)
+        events = events.filter(ScoreEvent.game_id == game_id)
+    totals.delete(synchronize_session=False)
+
+    rows = events.group_by(ScoreEvent.game_id, ScoreEvent.team_id, ScoreEvent.phase_id).all()
+    db.bulk_insert_mappings(TeamPhaseScore, [{
+        "game_id": row.game_id,
+        "team_id": row.team_id,
+        "phase_id": row.phase_id,
+        "score": int(row.score or 0),
+        "event_count": row.event_count,
+        "updated_at": row.updated_at,
+    } for row in rows])
+    db.flush()
+    return len(rows)
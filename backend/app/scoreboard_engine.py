@@ -0,0 +1,173 @@
+"""
+Scoreboard engine.
+Builds the full ScoreboardResponse for a game from a fixed number of grouped
+queries, independent of how many teams and phases the game has.
+"""
+import logging
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+from sqlalchemy import func, desc
+from sqlalchemy.orm import Session
+
+from app.models import Game, Team, ScoreEvent, Player, VoteTally, PhaseDecision, ScenarioPhase, Scenario, PhaseState
+from app.schemas import ScoreboardResponse, TeamScore
+from app.score_totals import team_phase_scores
+
+logger = logging.getLogger(__name__)
+
+# Number of recent events shown per team and in the global feed
+TEAM_RECENT_EVENTS = 5
+GLOBAL_RECENT_EVENTS = 10
+
+
+def _event_dict(event) -> dict:
+    return {
+        "delta": event.delta,
+        "reason": event.reason,
+        "created_at": event.created_at.isoformat() if event.created_at else None
+    }
+
+
+def _load_recent_events(db: Session, game_id: int) -> Dict[int, list]:
+    """
+    Load the most recent score events per team with a single windowed query.
+    The global feed is a subset of the union of each team's top N events,
+    so ranking per team up to GLOBAL_RECENT_EVENTS covers both views.
+    """
+    rank = func.row_number().over(
+        partition_by=ScoreEvent.team_id,
+        order_by=(desc(ScoreEvent.created_at), desc(ScoreEvent.id))
+    ).label("rank")
+    ranked = db.query(
+        ScoreEvent.id,
+        ScoreEvent.team_id,
+        ScoreEvent.delta,
+        ScoreEvent.reason,
+        ScoreEvent.created_at,
+        rank
+    ).filter(ScoreEvent.game_id == game_id).subquery()
+
+    rows = db.query(ranked).filter(
+        ranked.c.rank <= GLOBAL_RECENT_EVENTS
+    ).order_by(desc(ranked.c.created_at), desc(ranked.c.id)).all()
+
+    events_by_team: Dict[int, list] = defaultdict(list)
+    for row in rows:
+        events_by_team[row.team_id].append(row)
+    return events_by_team
+
+
+def build_scoreboard(db: Session, game: Game) -> ScoreboardResponse:
+    """Build the scoreboard for a game using a constant number of queries."""
+    teams = db.query(Team).filter(Team.game_id == game.id).order_by(Team.id).all()
+
+    phases: List[ScenarioPhase] = []
+    scenario_name = "Unknown"
+    if game.scenario_id:
+        phases = db.query(ScenarioPhase).filter(
+            ScenarioPhase.scenario_id == game.scenario_id
+        ).order_by(ScenarioPhase.order_index).all()
+        scenario_name = db.query(Scenario.name).filter(Scenario.id == game.scenario_id).scalar() or "Unknown"
+        if not phases:
+            logger.warning(f"Game {game.id} scenario {game.scenario_id} has no phases")
+
+    current_phase_name: Optional[str] = None
+    if game.current_phase_id:
+        current_phase_name = next((p.name for p in phases if p.id == game.current_phase_id), None)
+        if current_phase_name is None:
+            current_phase_name = db.query(ScenarioPhase.name).filter(
+                ScenarioPhase.id == game.current_phase_id
+            ).scalar()
+
+    # Per (team, phase) totals from the rollup; team totals are derived from the same rows
+    phase_scores = team_phase_scores(db, game.id)
+    total_scores = {team_id: sum(scores.values()) for team_id, scores in phase_scores.items()}
+
+    events_by_team = _load_recent_events(db, game.id)
+
+    # Latest decision per team for the current phase
+    decisions_by_team: Dict[int, PhaseDecision] = {}
+    if game.current_phase_id:
+        decisions = db.query(PhaseDecision).filter(
+            PhaseDecision.game_id == game.id,
+            PhaseDecision.phase_id == game.current_phase_id
+        ).order_by(PhaseDecision.submitted_at).all()
+        for decision in decisions:
+            decisions_by_team[decision.team_id] = decision
+
+    players_by_team: Dict[int, List[str]] = defaultdict(list)
+    player_rows = db.query(Player.team_id, Player.display_name).filter(
+        Player.game_id == game.id
+    ).order_by(Player.id).all()
+    for row in player_rows:
+        players_by_team[row.team_id].append(row.display_name)
+
+    votes_by_team: Optional[Dict[int, int]] = None
+    if game.current_phase_id and game.phase_state == PhaseState.OPEN_FOR_DECISIONS:
+        vote_rows = db.query(VoteTally.team_id, VoteTally.votes_submitted).filter(
+            VoteTally.game_id == game.id,
+            VoteTally.phase_id == game.current_phase_id
+        ).all()
+        votes_by_team = {team_id: count for team_id, count in vote_rows}
+
+    team_scores = []
+    for team in teams:
+        score_history = [{
+            "phase_name": phase.name,
+            "phase_order": phase.order_index,
+            "score": phase_scores[team.id].get(phase.id, 0)
+        } for phase in phases]
+
+        recent_decision = None
+        decision = decisions_by_team.get(team.id)
+        if decision:
+            selected_action = None
+            if isinstance(decision.actions, dict) and "selected" in decision.actions:
+                selected_action = decision.actions["selected"][0] if decision.actions["selected"] else None
+            recent_decision = {
+                "action": selected_action,
+                "score_awarded": decision.score_awarded,
+                "submitted_at": decision.submitted_at.isoformat() if decision.submitted_at else None
+            }
+
+        team_members = players_by_team.get(team.id, [])
+        voting_status = None
+        if votes_by_team is not None:
+            votes_submitted = votes_by_team.get(team.id, 0)
+            voting_status = {
+                "total_players": len(team_members),
+                "votes_submitted": votes_submitted,
+                "all_voted": votes_submitted == len(team_members) and len(team_members) > 0
+            }
+
+        team_scores.append(TeamScore(
+            team_id=team.id,
+            team_name=team.name,
+            team_role=team.role,
+            total_score=total_scores.get(team.id, 0),
+            team_members=team_members,
+            recent_events=[_event_dict(e) for e in events_by_team.get(team.id, [])[:TEAM_RECENT_EVENTS]],
+            score_history=score_history,
+            recent_decision=recent_decision,
+            voting_status=voting_status
+        ))
+
+    # Global feed: merge each team's ranked events and keep the newest
+    teams_by_id = {team.id: team for team in teams}
+    all_events = [e for events in events_by_team.values() for e in events]
+    all_events.sort(key=lambda e: (e.created_at is not None, e.created_at, e.id), reverse=True)
+
+    return ScoreboardResponse(
+        game_id=game.id,
+        scenario_name=scenario_name,
+        current_phase_name=current_phase_name,
+        phase_state=game.phase_state,
+        teams=team_scores,
+        recent_events=[{
+            "team_id": event.team_id,
+            "team_name": teams_by_id[event.team_id].name if event.team_id in teams_by_id else "Unknown",
+            "team_role": teams_by_id[event.team_id].role if event.team_id in teams_by_id else "unknown",
+            **_event_dict(event)
+        } for event in all_events[:GLOBAL_RECENT_EVENTS]]
+    )
@@ -2,8 +2,11 @@
 Automated scoring system for team decisions.
 Awards points based on how well selected actions align with phase objectives.
 """
+import logging
 from typing import Dict, List, Tuple, Optional
 
+logger = logging.getLogger(__name__)
+
 # Scoring configuration: (scenario_name, phase_order_index, team_role) -> Dict of (action_name, points)
 # Points: 10 = optimal, 7 = good, 4 = acceptable, 1 = poor, 0 = counterproductive
 
@@ -684,6 +687,103 @@ SCORING_MATRICES: Dict[str, Dict[Tuple[int, str], Dict[str, int]]] = {
 }
 
 
+# Scenario used when a game's scenario has no scoring matrix
+FALLBACK_SCENARIO = "Ransomware Incident Response"
+
+# Compiled lookup: (scenario_name, phase_order_index, team_role, normalized_action) -> points
+ScoringIndexKey = Tuple[str, int, str, str]
+
+
+def normalize_action(action: str) -> str:
+    """Normalize an action name for lookup (case- and surrounding-whitespace-insensitive)."""
+    return action.strip().lower()
+
+
+def stored_action_scores(action_scores) -> Dict[str, Dict[str, int]]:
+    """
+    A phase's stored weights (action_scores) by team role. Roles with no
+    weights (e.g. {"red": {}} saved from an empty form) count as not stored,
+    so the built-in matrix still applies to them.
+    """
+    if not isinstance(action_scores, dict):
+        return {}
+    return {
+        team_role: actions for team_role, actions in action_scores.items()
+        if isinstance(actions, dict) and actions
+    }
+
+
+def compile_scoring_index(
+    matrices: Dict[str, Dict[Tuple[int, str], Dict[str, int]]]
+) -> Tuple[Dict[ScoringIndexKey, int], set]:
+    """
+    Flatten scoring matrices into a single hash index.
+    Returns (index, scored_keys) where scored_keys holds every
+    (scenario_name, phase_order_index, team_role) that has a matrix entry.
+    """
+    index: Dict[ScoringIndexKey, int] = {}
+    scored_keys = set()
+    for scenario_name, matrix in matrices.items():
+        for (phase_order_index, team_role), actions in matrix.items():
+            scored_keys.add((scenario_name, phase_order_index, team_role))
+            for action_name, points in actions.items():
+                key = (scenario_name, phase_order_index, team_role, normalize_action(action_name))
+                if key in index and index[key] != points:
+                    logger.warning(
+                        "Scoring matrix for '%s' phase %s role '%s' has conflicting entries for action '%s'",
+                        scenario_name, phase_order_index, team_role, action_name
+                    )
+                    continue
+                index[key] = points
+    return index, scored_keys
+
+
+SCORING_INDEX, SCORED_KEYS = compile_scoring_index(SCORING_MATRICES)
+
+
+def validate_scoring_index(scenarios) -> List[str]:
+    """
+    Check scenarios' phase available_actions against their scoring weights.
+    Weights stored on the phase (action_scores) take precedence over the
+    compiled index. Reports phases with no weights for a role and offered
+    actions that would score 0.
+    Takes an iterable of Scenario models (with phases loaded or lazily loadable).
+    Returns the list of problems found; each is also logged as a warning.
+    """
+    problems = []
+    for scenario in scenarios:
+        has_matrix = scenario.name in SCORING_MATRICES
+        for phase in scenario.phases:
+            if not isinstance(phase.available_actions, dict):
+                continue
+            stored = stored_action_scores(phase.action_scores)
+            for team_role, actions in phase.available_actions.items():
+                if team_role in stored:
+                    known = {normalize_action(name) for name in stored[team_role]}
+                elif has_matrix and (scenario.name, phase.order_index, team_role) in SCORED_KEYS:
+                    known = None
+                else:
+                    problems.append(
+                        f"Scenario '{scenario.name}' phase {phase.order_index} role '{team_role}' has no scoring entry"
+                    )
+                    continue
+                for action in actions or []:
+                    action_name = action.get("name", "") if isinstance(action, dict) else str(action)
+                    normalized = normalize_action(action_name)
+                    if known is not None:
+                        scored = normalized in known
+                    else:
+                        scored = (scenario.name, phase.order_index, team_role, normalized) in SCORING_INDEX
+                    if not scored:
+                        problems.append(
+                            f"Scenario '{scenario.name}' phase {phase.order_index} role '{team_role}' "
+                            f"offers unscored action '{action_name}'"
+                        )
+    for problem in problems:
+        logger.warning(problem)
+    return problems
+
+
 def get_optimal_score(
     scenario_name: str,
     phase_order_index: int,
@@ -694,39 +794,21 @@ def get_optimal_score(
     Get the score for a selected action based on scenario, phase and team role.
     Returns 0 if action not found in matrix.
     """
-    # Get the appropriate scoring matrix for this scenario
-    scoring_matrix = SCORING_MATRICES.get(scenario_name)
-    if not scoring_matrix:
-        # Fallback to ransomware scoring if scenario not found
-        import logging
-        logger = logging.getLogger(__name__)
-        logger.warning(f"Scenario '{scenario_name}' not found in SCORING_MATRICES, using fallback")
-        scoring_matrix = RANSOMWARE_SCORING
-    
-    key = (phase_order_index, team_role)
-    if key not in scoring_matrix:
-        import logging
-        logger = logging.getLogger(__name__)
-        logger.warning(f"Key {key} not found in scoring matrix for scenario '{scenario_name}'")
-        return 0
-    
-    # Try exact match first
-    score = scoring_matrix[key].get(selected_action, None)
+    if scenario_name not in SCORING_MATRICES:
+        logger.warning("Scenario '%s' not found in SCORING_MATRICES, using fallback", scenario_name)
+        scenario_name = FALLBACK_SCENARIO
+
+    score = SCORING_INDEX.get((scenario_name, phase_order_index, team_role, normalize_action(selected_action)))
     if score is not None:
         return score
-    
-    # Try case-insensitive match
-    for action_name, action_score in scoring_matrix[key].items():
-        if action_name.lower().strip() == selected_action.lower().strip():
-            import logging
-            logger = logging.getLogger(__name__)
-            logger.warning(f"Action name mismatch (case/whitespace): '{selected_action}' matched '{action_name}'")
-            return action_score
-    
-    # No match found
-    import logging
-    logger = logging.getLogger(__name__)
-    logger.warning(f"Action '{selected_action}' not found in scoring matrix for scenario '{scenario_name}', phase {phase_order_index}, role '{team_role}'. Available actions: {list(scoring_matrix[key].keys())}")
+
+    if (scenario_name, phase_order_index, team_role) not in SCORED_KEYS:
+        logger.warning("Key %s not found in scoring matrix for scenario '%s'", (phase_order_index, team_role), scenario_name)
+    else:
+        logger.warning(
+            "Action '%s' not found in scoring matrix for scenario '%s', phase %s, role '%s'",
+            selected_action, scenario_name, phase_order_index, team_role
+        )
     return 0
 
 
@@ -752,20 +834,21 @@ def calculate_team_decision_score(
         return (0, "Invalid action format")
     
     score = get_optimal_score(scenario_name, phase_order_index, team_role, primary_action)
-    
-    # Determine explanation
+    return (score, describe_score(score, primary_action))
+
+
+def describe_score(score: int, action: str) -> str:
+    """Human-readable explanation for the points awarded to an action."""
     if score >= 9:
-        explanation = f"Excellent choice: {primary_action} perfectly aligns with phase objectives"
+        return f"Excellent choice: {action} perfectly aligns with phase objectives"
     elif score >= 7:
-        explanation = f"Good choice: {primary_action} effectively supports phase objectives"
+        return f"Good choice: {action} effectively supports phase objectives"
     elif score >= 4:
-        explanation = f"Acceptable choice: {primary_action} somewhat supports objectives"
+        return f"Acceptable choice: {action} somewhat supports objectives"
     elif score >= 1:
-        explanation = f"Poor choice: {primary_action} doesn't align well with phase objectives"
+        return f"Poor choice: {action} doesn't align well with phase objectives"
     else:
-        explanation = f"Invalid or counterproductive action: {primary_action}"
-    
-    return (score, explanation)
+        return f"Invalid or counterproductive action: {action}"
 
 
 def calculate_weighted_score(
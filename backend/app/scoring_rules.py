@@ -0,0 +1,140 @@
+"""
+Scoring rule store.
+Scoring weights are stored per ScenarioPhase (action_scores) and cached per
+scenario in process memory, so scoring a decision is a single dictionary
+lookup. Phases without stored weights fall back to the built-in matrices
+in app.scoring. Cache entries are invalidated in every worker when a
+scenario is updated or deleted.
+"""
+import logging
+import threading
+from typing import Dict, List, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.live import event_relay
+from app.models import Scenario, ScenarioPhase
+from app.scoring import SCORING_MATRICES, FALLBACK_SCENARIO, normalize_action, describe_score, stored_action_scores
+
+logger = logging.getLogger(__name__)
+
+# Notification channel used to invalidate cached rules across workers
+INVALIDATE_CHANNEL = "scoring_rules"
+
+
+class ScenarioRules:
+    """Compiled scoring weights for one scenario."""
+
+    def __init__(self, scenario_id: int, scenario_name: str):
+        self.scenario_id = scenario_id
+        self.scenario_name = scenario_name
+        # (phase_order_index, team_role, normalized_action) -> points
+        self.scores: Dict[Tuple[int, str, str], int] = {}
+        # (phase_order_index, team_role) pairs that have any weights
+        self.scored_keys = set()
+
+    def add(self, phase_order_index: int, team_role: str, actions: Dict[str, int]):
+        self.scored_keys.add((phase_order_index, team_role))
+        for action_name, points in actions.items():
+            self.scores.setdefault((phase_order_index, team_role, normalize_action(action_name)), int(points))
+
+    def get_score(self, phase_order_index: int, team_role: str, selected_action: str) -> int:
+        """Points for an action, or 0 if it has no weight."""
+        score = self.scores.get((phase_order_index, team_role, normalize_action(selected_action)))
+        if score is not None:
+            return score
+        if (phase_order_index, team_role) not in self.scored_keys:
+            logger.warning(
+                "No scoring weights for scenario '%s' phase %s role '%s'",
+                self.scenario_name, phase_order_index, team_role
+            )
+        else:
+            logger.warning(
+                "Action '%s' has no scoring weight for scenario '%s' phase %s role '%s'",
+                selected_action, self.scenario_name, phase_order_index, team_role
+            )
+        return 0
+
+    def calculate_team_decision_score(
+        self,
+        phase_order_index: int,
+        team_role: str,
+        selected_actions: List[str]
+    ) -> Tuple[int, str]:
+        """
+        Calculate score for a team's decision.
+        Returns (score, explanation). Scores the primary (first) action.
+        """
+        if not selected_actions:
+            return (0, "No action selected")
+
+        primary_action = selected_actions[0]
+        if not primary_action or not isinstance(primary_action, str):
+            return (0, "Invalid action format")
+
+        score = self.get_score(phase_order_index, team_role, primary_action)
+        return (score, describe_score(score, primary_action))
+
+
+def load_scenario_rules(db: Session, scenario_id: int) -> ScenarioRules:
+    """Build the scoring rules for a scenario from its phases' stored weights."""
+    scenario_name = db.query(Scenario.name).filter(Scenario.id == scenario_id).scalar() or FALLBACK_SCENARIO
+    rules = ScenarioRules(scenario_id, scenario_name)
+
+    phases = db.query(ScenarioPhase.order_index, ScenarioPhase.action_scores).filter(
+        ScenarioPhase.scenario_id == scenario_id
+    ).all()
+
+    # Built-in matrix covers phases (or roles) without stored weights
+    matrix = SCORING_MATRICES.get(scenario_name)
+    has_stored_weights = any(stored_action_scores(p.action_scores) for p in phases)
+    if matrix is None and not has_stored_weights:
+        logger.warning(f"Scenario '{scenario_name}' has no scoring weights, using '{FALLBACK_SCENARIO}' matrix")
+        matrix = SCORING_MATRICES[FALLBACK_SCENARIO]
+
+    for phase in phases:
+        stored = stored_action_scores(phase.action_scores)
+        for team_role, actions in stored.items():
+            rules.add(phase.order_index, team_role, actions)
+        if matrix:
+            for (order_index, team_role), actions in matrix.items():
+                if order_index == phase.order_index and team_role not in stored:
+                    rules.add(order_index, team_role, actions)
+    return rules
+
+
+class ScoringRuleStore:
+    """Process-level cache of ScenarioRules keyed by scenario id."""
+
+    def __init__(self):
+        self._rules: Dict[int, ScenarioRules] = {}
+        # Bumped by every invalidation, so a load that overlapped one isn't cached
+        self._generations: Dict[int, int] = {}
+        self._lock = threading.Lock()
+
+    def get_rules(self, db: Session, scenario_id: int) -> ScenarioRules:
+        rules = self._rules.get(scenario_id)
+        if rules is None:
+            with self._lock:
+                generation = self._generations.get(scenario_id, 0)
+            # Loaded outside the lock; an invalidation arriving meanwhile may be for
+            # weights this load read before they changed, so its result is then
+            # used for this call only
+            rules = load_scenario_rules(db, scenario_id)
+            with self._lock:
+                if self._generations.get(scenario_id, 0) == generation:
+                    self._rules[scenario_id] = rules
+        return rules
+
+    def invalidate(self, scenario_id: int):
+        """Drop cached rules for a scenario in every worker."""
+        event_relay.send(INVALIDATE_CHANNEL, {"scenario_id": scenario_id})
+
+    def invalidate_local(self, scenario_id: int):
+        with self._lock:
+            self._generations[scenario_id] = self._generations.get(scenario_id, 0) + 1
+            self._rules.pop(scenario_id, None)
+
+
+scoring_rules = ScoringRuleStore()
+event_relay.add_channel(INVALIDATE_CHANNEL, lambda message: scoring_rules.invalidate_local(message["scenario_id"]))
@@ -0,0 +1,89 @@
+"""
+Per-team vote tallies for a phase.
+VoteTally holds the number of votes, the team roster size and the votes per
+action for each (game, phase, team). PlayerVote and Player mapper events keep it
+up to date in the same transaction as the vote (see app.models), so voting
+status and the "all voted" check read one row per team instead of every
+player and vote. Votes upserted with Core statements go through record_vote().
+rebuild_vote_tallies() recomputes it from player_votes.
+"""
+from collections import Counter, defaultdict
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.models import Player, PlayerVote, VoteTally, _adjust_vote_tally
+
+
+def all_voted(tally: Optional[VoteTally]) -> bool:
+    """Whether every player on the team has voted (False for an empty team)."""
+    return tally is not None and tally.total_players > 0 and tally.votes_submitted >= tally.total_players
+
+
+def record_vote(connection, game_id: int, phase_id: int, team_id: int,
+                selected_action: str, previous_action: Optional[str] = None) -> Tuple[int, int]:
+    """
+    Count a vote written by a bulk/Core statement (which mapper events don't see) in its team's tally.
+    previous_action is the action a re-vote replaced, None for a first vote.
+    Returns the team's (votes_submitted, total_players).
+    """
+    action_changes = Counter({selected_action: 1})
+    if previous_action is not None:
+        action_changes[previous_action] -= 1
+    return _adjust_vote_tally(
+        connection, game_id, phase_id, team_id, 1 if previous_action is None else 0, action_changes
+    )
+
+
+def get_vote_tally(db: Session, game_id: int, phase_id: int, team_id: int) -> Optional[VoteTally]:
+    """The team's tally for a phase, None until the first vote."""
+    return db.query(VoteTally).filter(
+        VoteTally.game_id == game_id,
+        VoteTally.phase_id == phase_id,
+        VoteTally.team_id == team_id
+    ).first()
+
+
+def delete_vote_tallies(db: Session, game_ids):
+    """Remove the tallies of deleted games (needed when votes are bulk-deleted)."""
+    db.query(VoteTally).filter(VoteTally.game_id.in_(game_ids)).delete(synchronize_session=False)
+
+
+def rebuild_vote_tallies(db: Session, game_id: Optional[int] = None) -> int:
+    """Recompute tallies from player_votes for one game or all games. Returns the number of rows written."""
+    tallies = db.query(VoteTally)
+    votes = db.query(
+        PlayerVote.game_id,
+        PlayerVote.phase_id,
+        PlayerVote.team_id,
+        PlayerVote.selected_action,
+        func.count(PlayerVote.id).label("votes")
+    )
+    rosters = db.query(Player.game_id, Player.team_id, func.count(Player.id))
+    if game_id is not None:
+        tallies = tallies.filter(VoteTally.game_id == game_id)
+        votes = votes.filter(PlayerVote.game_id == game_id)
+        rosters = rosters.filter(Player.game_id == game_id)
+    tallies.delete(synchronize_session=False)
+
+    roster_sizes = {
+        (row_game_id, team_id): count
+        for row_game_id, team_id, count in rosters.group_by(Player.game_id, Player.team_id).all()
+    }
+    action_counts: Dict[tuple, Counter] = defaultdict(Counter)
+    for row in votes.group_by(
+        PlayerVote.game_id, PlayerVote.phase_id, PlayerVote.team_id, PlayerVote.selected_action
+    ).all():
+        action_counts[(row.game_id, row.phase_id, row.team_id)][row.selected_action] = row.votes
+
+    db.bulk_insert_mappings(VoteTally, [{
+        "game_id": key[0],
+        "phase_id": key[1],
+        "team_id": key[2],
+        "votes_submitted": sum(counts.values()),
+        "total_players": roster_sizes.get((key[0], key[2]), 0),
+        "action_counts": dict(counts),
+    } for key, counts in action_counts.items()])
+    db.flush()
+    return len(action_counts)
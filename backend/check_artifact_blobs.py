@@ -0,0 +1,88 @@
+"""
+Check and maintain the content-addressed artifact blob store.
+
+Usage:
+    python check_artifact_blobs.py                  # verify every blob (size check)
+    python check_artifact_blobs.py --rehash         # also recompute each blob's sha256
+    python check_artifact_blobs.py --import-legacy  # copy /app/artifacts/files uploads into the blob store
+    python check_artifact_blobs.py --import-legacy --delete-legacy  # ...and delete the originals
+    python check_artifact_blobs.py --gc [--dry-run] # remove blobs no artifact references
+"""
+import argparse
+import sys
+sys.path.insert(0, '/app')
+
+from app.database import SessionLocal
+from app.models import Artifact, ArtifactBlob
+from app.artifact_blobs import store_blob, blob_url, verify_blob, recount_references, collect_garbage
+from app.routers.artifacts import ARTIFACTS_DIR
+
+parser = argparse.ArgumentParser(description="Check and maintain the artifact blob store")
+parser.add_argument("--rehash", action="store_true", help="Recompute sha256 of every blob")
+parser.add_argument("--import-legacy", action="store_true", help="Store legacy uploads as blobs and repoint artifacts")
+parser.add_argument("--delete-legacy", action="store_true", help="With --import-legacy, delete the imported legacy files")
+parser.add_argument("--gc", action="store_true", help="Delete unreferenced blobs")
+parser.add_argument("--dry-run", action="store_true", help="With --gc, only list what would be deleted")
+args = parser.parse_args()
+
+db = SessionLocal()
+
+try:
+    if args.import_legacy:
+        print("=" * 60)
+        print(f"IMPORTING LEGACY UPLOADS FROM {ARTIFACTS_DIR}")
+        print("=" * 60)
+        imported = set()
+        for artifact in db.query(Artifact).filter(Artifact.file_url.like("/api/artifacts/files/%")).all():
+            filename = artifact.file_url.split("/")[-1]
+            path = ARTIFACTS_DIR / filename
+            if not path.is_file():
+                print(f"  ⚠️  {artifact.name} (ID: {artifact.id}): {filename} missing, skipped")
+                continue
+            with open(path, "rb") as f:
+                blob = store_blob(db, f, filename)
+            artifact.file_url = blob_url(blob.sha256, filename)
+            imported.add(path)
+            print(f"  ✓ {artifact.name} (ID: {artifact.id}): {filename} -> {blob.sha256[:12]}")
+        db.commit()
+        if args.delete_legacy:
+            # Only once the artifacts point at their blobs; old /files/ links stop working
+            for path in sorted(imported):
+                path.unlink(missing_ok=True)
+                print(f"  - deleted {path}")
+        print()
+
+    recount_references(db)
+    db.commit()
+
+    print("=" * 60)
+    print("VERIFYING BLOBS" + (" (rehash)" if args.rehash else ""))
+    print("=" * 60)
+    blobs = db.query(ArtifactBlob).order_by(ArtifactBlob.uploaded_at).all()
+    bad = 0
+    for blob in blobs:
+        ok = verify_blob(blob, rehash=args.rehash)
+        bad += 0 if ok else 1
+        print(f"  {'✓' if ok else '❌'} {blob.sha256[:12]}  {blob.size:>10} bytes  refs={blob.ref_count}  {blob.media_type or ''}")
+    print()
+    print(f"{len(blobs)} blobs, {bad} failed verification, {sum(1 for b in blobs if b.ref_count <= 0)} unreferenced")
+
+    if args.gc:
+        print()
+        removed = collect_garbage(db, dry_run=args.dry_run)
+        action = "Would remove" if args.dry_run else "Removed"
+        print(f"{action} {len(removed)} unreferenced blobs")
+        for sha256 in removed:
+            print(f"  - {sha256}")
+
+    if bad:
+        sys.exit(1)
+
+except Exception as e:
+    print(f"❌ Error: {e}")
+    import traceback
+    traceback.print_exc()
+    db.rollback()
+    sys.exit(1)
+finally:
+    db.close()
@@ -0,0 +1,84 @@
+"""
+Check that the game hot-path queries are served by their indexes.
+Runs EXPLAIN for each query and verifies the plan uses the expected index
+(see migration d3e4f5a6b7c8). Works against Postgres and SQLite.
+
+On Postgres, sequential scans are disabled for the check: small dev tables
+would otherwise be scanned whatever indexes exist, and the point is that a
+usable index is there once the tables grow.
+"""
+import sys
+sys.path.insert(0, '/app')
+
+from sqlalchemy import func, text
+from app.database import SessionLocal, engine
+from app.models import PlayerVote, ScoreEvent, PhaseDecision, Player, Team, ScenarioPhase
+
+db = SessionLocal()
+
+# (description, query, index expected in the plan)
+HOT_QUERIES = [
+    ("Team votes for a phase", db.query(PlayerVote).filter(
+        PlayerVote.game_id == 1, PlayerVote.phase_id == 1, PlayerVote.team_id == 1
+    ), "ix_player_votes_game_phase_team"),
+    ("Player's vote for a phase", db.query(PlayerVote).filter(
+        PlayerVote.player_id == 1, PlayerVote.phase_id == 1
+    ), "uq_player_votes_player_phase"),
+    ("Score totals per team and phase", db.query(
+        ScoreEvent.team_id, ScoreEvent.phase_id, func.sum(ScoreEvent.delta)
+    ).filter(ScoreEvent.game_id == 1).group_by(ScoreEvent.team_id, ScoreEvent.phase_id),
+        "ix_score_events_game_team_phase"),
+    ("Team decision for a phase", db.query(PhaseDecision).filter(
+        PhaseDecision.game_id == 1, PhaseDecision.phase_id == 1, PhaseDecision.team_id == 1
+    ), "ix_phase_decisions_game_phase_team"),
+    ("Team roster", db.query(Player).filter(
+        Player.game_id == 1, Player.team_id == 1
+    ), "ix_players_game_team"),
+    ("Team by join code", db.query(Team).filter(Team.code == "ABC123"), "ix_teams_code"),
+    ("Scenario phases in order", db.query(ScenarioPhase).filter(
+        ScenarioPhase.scenario_id == 1
+    ).order_by(ScenarioPhase.order_index), "ix_scenario_phases_scenario_order"),
+]
+
+
+def explain(query) -> str:
+    sql = str(query.statement.compile(engine, compile_kwargs={"literal_binds": True}))
+    if engine.dialect.name == "postgresql":
+        rows = db.execute(text(f"EXPLAIN {sql}")).all()
+        return "\n".join(row[0] for row in rows)
+    rows = db.execute(text(f"EXPLAIN QUERY PLAN {sql}")).all()
+    return "\n".join(row[-1] for row in rows)
+
+
+try:
+    print("=" * 60)
+    print(f"HOT QUERY PLANS ({engine.dialect.name})")
+    print("=" * 60)
+
+    if engine.dialect.name == "postgresql":
+        db.execute(text("SET LOCAL enable_seqscan = off"))
+
+    failures = 0
+    for description, query, index_name in HOT_QUERIES:
+        plan = explain(query)
+        ok = index_name in plan
+        failures += 0 if ok else 1
+        print(f"{'✓' if ok else '❌'} {description}: expects {index_name}")
+        if not ok:
+            for line in plan.splitlines():
+                print(f"      {line}")
+
+    print()
+    print(f"{len(HOT_QUERIES) - failures}/{len(HOT_QUERIES)} hot queries use their index")
+    if failures:
+        print("❌ Run 'alembic upgrade head' to create the missing indexes")
+        sys.exit(1)
+
+except Exception as e:
+    print(f"❌ Error: {e}")
+    import traceback
+    traceback.print_exc()
+    sys.exit(1)
+finally:
+    db.rollback()
+    db.close()
@@ -0,0 +1,307 @@
+"""
+Simulate a full game session under load and report per-endpoint latency.
+
+Drives the real FastAPI app in-process (httpx ASGITransport, no network) through a
+scripted game: the GM creates and starts a game, N players join each team, and
+every phase is opened, voted on and locked while players, audience screens and
+the GM dashboard poll. Reports p50/p95/p99 latency and SQL statements per request
+for each endpoint.
+
+One simulator process behaves like one uvicorn worker (one event loop, the same
+threadpool for sync endpoints, the same pools), so divide a session's load by the
+worker count when sizing.
+
+Usage:
+    python load_simulator.py                                   # DATABASE_URL, 20 players per team
+    python load_simulator.py --players-per-team 100 --audience 4
+    python load_simulator.py --database-url sqlite:////tmp/load_sim.db --time-scale 0.1
+    python load_simulator.py --player-poll 30 --gm-poll 15 --audience-poll 15   # current frontend safety-net polling
+
+Polling defaults (8 s players, 3 s GM and audience) are the polling-only
+frontend's intervals, i.e. the worst case; the live event stream is not simulated.
+--time-scale shrinks every interval and delay (0.1 = ten times faster).
+SQLite allows one writer at a time, so large sessions there end in "database is
+locked" errors; size against Postgres.
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from collections import defaultdict
+from contextvars import ContextVar
+sys.path.insert(0, '/app')
+
+parser = argparse.ArgumentParser(description="Simulate a game session under load and report endpoint latency")
+parser.add_argument("--database-url", help="Database to run against (default: DATABASE_URL)")
+parser.add_argument("--players-per-team", type=int, default=20, help="Players joining each of the red and blue teams")
+parser.add_argument("--audience", type=int, default=2, help="Audience screens polling the scoreboard")
+parser.add_argument("--phases", type=int, default=3, help="Phases in the simulated scenario")
+parser.add_argument("--player-poll", type=float, default=8.0, help="Seconds between player state polls")
+parser.add_argument("--gm-poll", type=float, default=3.0, help="Seconds between GM dashboard polls")
+parser.add_argument("--audience-poll", type=float, default=3.0, help="Seconds between audience scoreboard polls")
+parser.add_argument("--briefing", type=float, default=10.0, help="Seconds each phase stays in briefing before voting opens")
+parser.add_argument("--vote-window", type=float, default=30.0, help="Players vote at random times within this many seconds")
+parser.add_argument("--revote-rate", type=float, default=0.1, help="Share of players who change their vote once")
+parser.add_argument("--time-scale", type=float, default=1.0, help="Multiply every interval and delay by this factor")
+parser.add_argument("--seed", type=int, default=None, help="Random seed for reproducible runs")
+args = parser.parse_args()
+
+if args.database_url:
+    os.environ["DATABASE_URL"] = args.database_url
+
+import httpx
+from sqlalchemy import event
+
+from app.main import app
+from app.database import SessionLocal, engine, async_engine
+from app.models import GMUser
+from app.auth import get_password_hash
+
+GM_USERNAME = "load-simulator"
+GM_PASSWORD = "load-simulator"
+ACTIONS = {
+    "red": ["Phish finance", "Deploy ransomware", "Cover tracks"],
+    "blue": ["Isolate host", "Reset credentials", "Escalate to IR"],
+}
+
+# Endpoint label of the request being served, so SQL statements can be attributed to it
+current_endpoint: ContextVar[str] = ContextVar("current_endpoint", default="(setup)")
+latencies = defaultdict(list)     # endpoint -> [seconds]
+client_errors = defaultdict(int)  # endpoint -> 4xx responses (e.g. a vote landing just after the lock)
+errors = defaultdict(int)         # endpoint -> 5xx responses
+statements = defaultdict(int)     # endpoint -> SQL statements executed
+
+
+def _count_statement(conn, cursor, statement, parameters, context, executemany):
+    statements[current_endpoint.get()] += 1
+
+
+event.listen(engine, "before_cursor_execute", _count_statement)
+event.listen(async_engine.sync_engine, "before_cursor_execute", _count_statement)
+
+
+def scaled(seconds: float) -> float:
+    return seconds * args.time_scale
+
+
+async def call(client: httpx.AsyncClient, endpoint: str, method: str, url: str, **kwargs) -> httpx.Response:
+    """Make one request, recording its latency and statement count under endpoint."""
+    token = current_endpoint.set(endpoint)
+    started = time.perf_counter()
+    try:
+        response = await client.request(method, url, **kwargs)
+    finally:
+        latencies[endpoint].append(time.perf_counter() - started)
+        current_endpoint.reset(token)
+    if response.status_code >= 500:
+        errors[endpoint] += 1
+    elif response.status_code >= 400:
+        client_errors[endpoint] += 1
+    return response
+
+
+def percentile(values, pct: float) -> float:
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+class Session:
+    """Shared state of the simulated game, updated by the GM task."""
+
+    def __init__(self):
+        self.game_id = None
+        self.phase_id = None
+        self.voting_open = asyncio.Event()
+        self.finished = asyncio.Event()
+
+
+async def poll_player(client, session, player):
+    etag = None
+    await asyncio.sleep(random.uniform(0, scaled(args.player_poll)))
+    while not session.finished.is_set():
+        request_headers = {"If-None-Match": etag} if etag else {}
+        response = await call(client, "GET player state", "GET",
+                              f"/games/{session.game_id}/player/{player['player_id']}/state", headers=request_headers)
+        etag = response.headers.get("etag", etag)
+        await asyncio.sleep(scaled(args.player_poll))
+
+
+async def vote_each_phase(client, session, player):
+    voted_phase = None
+    while not session.finished.is_set():
+        await session.voting_open.wait()
+        if session.finished.is_set():
+            break
+        phase_id = session.phase_id
+        if phase_id == voted_phase:
+            await asyncio.sleep(scaled(0.5))
+            continue
+        voted_phase = phase_id
+        await asyncio.sleep(random.uniform(0, scaled(args.vote_window)))
+        revote = random.random() < args.revote_rate
+        for _ in range(2 if revote else 1):
+            if not session.voting_open.is_set() or session.phase_id != phase_id:
+                break
+            await call(client, "POST vote", "POST", f"/games/{session.game_id}/phases/{phase_id}/votes", json={
+                "player_id": player["player_id"],
+                "selected_action": random.choice(ACTIONS[player["team_role"]]),
+                "effectiveness_rating": random.randint(1, 10),
+                "comments": "Simulated vote",
+            })
+            if revote:
+                await asyncio.sleep(random.uniform(0, scaled(args.vote_window) / 4))
+
+
+async def poll_audience(client, session):
+    await asyncio.sleep(random.uniform(0, scaled(args.audience_poll)))
+    while not session.finished.is_set():
+        await call(client, "GET scoreboard", "GET", f"/games/{session.game_id}/scoreboard")
+        await asyncio.sleep(scaled(args.audience_poll))
+
+
+async def poll_gm(client, session, headers):
+    while not session.finished.is_set():
+        await call(client, "GET game", "GET", f"/games/{session.game_id}", headers=headers)
+        if session.voting_open.is_set() and not session.finished.is_set():
+            phase_id = session.phase_id
+            await call(client, "GET voting status", "GET", f"/games/{session.game_id}/phases/{phase_id}/voting-status")
+            await call(client, "GET decisions", "GET", f"/games/{session.game_id}/phases/{phase_id}/decisions", headers=headers)
+            await call(client, "GET phase comments", "GET", f"/games/{session.game_id}/phases/{phase_id}/comments", headers=headers)
+        await asyncio.sleep(scaled(args.gm_poll))
+
+
+async def run_phases(client, session, headers, total_players):
+    game_id = session.game_id
+    await call(client, "POST start game", "POST", f"/games/{game_id}/start", headers=headers)
+    session.phase_id = (await call(client, "GET game", "GET", f"/games/{game_id}", headers=headers)).json()["current_phase_id"]
+    phase_number = 1
+    while session.phase_id:
+        print(f"  Phase {phase_number}: briefing")
+        await asyncio.sleep(scaled(args.briefing))
+        await call(client, "POST open decisions", "POST", f"/games/{game_id}/phase/open_for_decisions", headers=headers)
+        session.voting_open.set()
+        print(f"  Phase {phase_number}: voting open")
+
+        # Lock once every team has voted, or when the window (plus a grace period) runs out
+        deadline = time.monotonic() + scaled(args.vote_window) * 1.5 + scaled(args.gm_poll)
+        while time.monotonic() < deadline:
+            status = (await call(client, "GET voting status", "GET",
+                                 f"/games/{game_id}/phases/{session.phase_id}/voting-status")).json()
+            if sum(team["votes_submitted"] for team in status) >= total_players:
+                break
+            await asyncio.sleep(scaled(args.gm_poll))
+
+        session.voting_open.clear()
+        response = await call(client, "POST lock decisions", "POST", f"/games/{game_id}/phase/lock_decisions", headers=headers)
+        print(f"  Phase {phase_number}: locked ({response.status_code})")
+        session.phase_id = response.json().get("next_phase_id") if response.status_code == 200 else None
+        phase_number += 1
+    session.finished.set()
+
+
+async def simulate():
+    db = SessionLocal()
+    if not db.query(GMUser).filter(GMUser.username == GM_USERNAME).first():
+        db.add(GMUser(username=GM_USERNAME, password_hash=get_password_hash(GM_PASSWORD)))
+        db.commit()
+    db.close()
+
+    await app.router.startup()
+    # Unhandled app errors come back as 500s (counted) instead of aborting the run
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://load-simulator", timeout=None) as client:
+            token = await call(client, "POST login", "POST", "/auth/login",
+                               data={"username": GM_USERNAME, "password": GM_PASSWORD})
+            headers = {"Authorization": f"Bearer {token.json()['access_token']}"}
+
+            scenario = await call(client, "POST scenario", "POST", "/scenarios", headers=headers, json={
+                "name": "Load simulation",
+                "description": "Created by load_simulator.py",
+                "phases": [{
+                    "order_index": index,
+                    "name": f"Simulated phase {index + 1}",
+                    "briefing_text": "Simulated briefing",
+                    "available_actions": {
+                        role: [{"name": action, "description": ""} for action in actions]
+                        for role, actions in ACTIONS.items()
+                    },
+                    "action_scores": {
+                        role: {action: 10 - 3 * rank for rank, action in enumerate(actions)}
+                        for role, actions in ACTIONS.items()
+                    },
+                } for index in range(args.phases)],
+            })
+            game = (await call(client, "POST game", "POST", "/games", headers=headers,
+                               json={"scenario_id": scenario.json()["id"]})).json()
+
+            session = Session()
+            session.game_id = game["id"]
+            print(f"Game {session.game_id}: {args.players_per_team} players per team joining")
+            players = await asyncio.gather(*[
+                call(client, "POST join", "POST", "/join", json={"team_code": code, "display_name": f"Player {n + 1}"})
+                for code in (game["red_team_code"], game["blue_team_code"])
+                for n in range(args.players_per_team)
+            ])
+            players = [response.json() for response in players if response.status_code == 200]
+
+            started = time.perf_counter()
+            tasks = [asyncio.create_task(poll_gm(client, session, headers))]
+            tasks += [asyncio.create_task(poll_audience(client, session)) for _ in range(args.audience)]
+            for player in players:
+                tasks.append(asyncio.create_task(poll_player(client, session, player)))
+                tasks.append(asyncio.create_task(vote_each_phase(client, session, player)))
+            await run_phases(client, session, headers, len(players))
+            # Wake voters still waiting for a phase so they see the game has finished
+            session.voting_open.set()
+            await asyncio.gather(*tasks)
+            return time.perf_counter() - started, len(players)
+    finally:
+        await app.router.shutdown()
+
+
+def print_report(duration: float, player_count: int):
+    print()
+    print("=" * 98)
+    print(f"LOAD SIMULATION: {player_count} players, {args.audience} audience screens, "
+          f"{args.phases} phases, {duration:.1f}s ({engine.dialect.name})")
+    print("=" * 98)
+    print(f"{'Endpoint':<22} {'Requests':>8} {'4xx':>5} {'5xx':>5} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+          f"{'max ms':>8} {'SQL/req':>8} {'req/s':>7}")
+    total_requests = 0
+    for endpoint in sorted(latencies, key=lambda name: -len(latencies[name])):
+        samples = latencies[endpoint]
+        total_requests += len(samples)
+        print(f"{endpoint:<22} {len(samples):>8} {client_errors[endpoint]:>5} {errors[endpoint]:>5} "
+              f"{percentile(samples, 50) * 1000:>8.1f} {percentile(samples, 95) * 1000:>8.1f} "
+              f"{percentile(samples, 99) * 1000:>8.1f} {max(samples) * 1000:>8.1f} "
+              f"{statements[endpoint] / len(samples):>8.1f} {len(samples) / duration:>7.1f}")
+    print()
+    print(f"{total_requests} requests, {total_requests / duration:.1f} req/s, "
+          f"{sum(client_errors.values())} client errors, {sum(errors.values())} server errors, "
+          f"{sum(statements.values())} SQL statements")
+    if statements["(setup)"]:
+        print(f"({statements['(setup)']} statements outside requests: seeding, startup, background work)")
+
+
+try:
+    if args.seed is not None:
+        random.seed(args.seed)
+    duration, player_count = asyncio.run(simulate())
+    print_report(duration, player_count)
+    if any(errors.values()):
+        print("❌ Some requests failed with server errors")
+        sys.exit(1)
+    print("✓ Simulation complete")
+
+except KeyboardInterrupt:
+    print("Interrupted")
+    sys.exit(1)
+except Exception as e:
+    print(f"❌ Error: {e}")
+    import traceback
+    traceback.print_exc()
+    sys.exit(1)
@@ -14,6 +14,8 @@ from app.models import (
     AfterActionReport
 )
 from app.models import scenario_phase_artifacts
+from app.score_totals import delete_team_phase_scores
+from app.vote_tallies import delete_vote_tallies
 
 db: Session = SessionLocal()
 
@@ -42,6 +44,7 @@ try:
             db.execute(delete(PlayerVote).where(PlayerVote.game_id.in_(game_ids)))
             db.flush()
             print(f"  ✓ Deleted {votes_count} player votes")
+        delete_vote_tallies(db, game_ids)
         
         # Delete phase decisions (references game_id, team_id, phase_id)
         decisions_count = db.query(PhaseDecision).filter(PhaseDecision.game_id.in_(game_ids)).count()
@@ -56,6 +59,7 @@ try:
             db.execute(delete(ScoreEvent).where(ScoreEvent.game_id.in_(game_ids)))
             db.flush()
             print(f"  ✓ Deleted {scores_count} score events")
+        delete_team_phase_scores(db, game_ids)
         
         # Delete GM notes (references game_id, phase_id, gm_id)
         notes_count = db.query(PhaseGMNotes).filter(PhaseGMNotes.game_id.in_(game_ids)).count()
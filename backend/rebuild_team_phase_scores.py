@@ -0,0 +1,33 @@
+"""
+Rebuild the team_phase_scores totals from score_events.
+Run after editing score_events directly in the database.
+
+Usage:
+    python rebuild_team_phase_scores.py            # all games
+    python rebuild_team_phase_scores.py <game_id>  # one game
+"""
+import sys
+sys.path.insert(0, '/app')
+
+from app.database import SessionLocal
+from app.score_totals import rebuild_team_phase_scores
+
+db = SessionLocal()
+
+try:
+    game_id = int(sys.argv[1]) if len(sys.argv) > 1 else None
+    print("=" * 60)
+    print(f"REBUILDING TEAM PHASE SCORES ({f'game {game_id}' if game_id else 'all games'})")
+    print("=" * 60)
+    rows = rebuild_team_phase_scores(db, game_id)
+    db.commit()
+    print(f"✓ Wrote {rows} team/phase totals")
+
+except Exception as e:
+    print(f"❌ Error: {e}")
+    import traceback
+    traceback.print_exc()
+    db.rollback()
+    sys.exit(1)
+finally:
+    db.close()
@@ -0,0 +1,33 @@
+"""
+Rebuild the vote_tallies counts from player_votes.
+Run after editing player_votes or players directly in the database.
+
+Usage:
+    python rebuild_vote_tallies.py            # all games
+    python rebuild_vote_tallies.py <game_id>  # one game
+"""
+import sys
+sys.path.insert(0, '/app')
+
+from app.database import SessionLocal
+from app.vote_tallies import rebuild_vote_tallies
+
+db = SessionLocal()
+
+try:
+    game_id = int(sys.argv[1]) if len(sys.argv) > 1 else None
+    print("=" * 60)
+    print(f"REBUILDING VOTE TALLIES ({f'game {game_id}' if game_id else 'all games'})")
+    print("=" * 60)
+    rows = rebuild_vote_tallies(db, game_id)
+    db.commit()
+    print(f"✓ Wrote {rows} team/phase tallies")
+
+except Exception as e:
+    print(f"❌ Error: {e}")
+    import traceback
+    traceback.print_exc()
+    db.rollback()
+    sys.exit(1)
+finally:
+    db.close()
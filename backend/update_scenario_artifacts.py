@@ -16,7 +16,7 @@ Deletion order respects all foreign key constraints:
 from app.database import SessionLocal
 from app.models import (
     Scenario, ScenarioPhase, Artifact, scenario_phase_artifacts,
-    PhaseDecision, PlayerVote, ScoreEvent, Game, Team, Player
+    PhaseDecision, PlayerVote, VoteTally, ScoreEvent, TeamPhaseScore, Game, Team, Player
 )
 from sqlalchemy import delete
 
@@ -63,6 +63,9 @@ try:
                 ).delete(synchronize_session=False)
                 if player_votes_count2 > 0:
                     print(f"Deleted {player_votes_count2} additional player votes by phase")
+            db.query(VoteTally).filter(
+                VoteTally.game_id.in_(game_ids)
+            ).delete(synchronize_session=False)
             
             # Step 3: Delete phase_decisions (references phase_id, game_id, team_id)
             if phase_id_list:
@@ -77,6 +80,9 @@ try:
                     ScoreEvent.phase_id.in_(phase_id_list)
                 ).delete(synchronize_session=False)
                 print(f"Deleted {score_events_count} score events")
+                db.query(TeamPhaseScore).filter(
+                    TeamPhaseScore.phase_id.in_(phase_id_list)
+                ).delete(synchronize_session=False)
             
             # Step 5: Delete players (references game_id, team_id)
             if player_ids:
@@ -17,7 +17,7 @@ try:
     for artifact_id in artifact_ids:
         # Query directly with SQL to see raw database value
         result = db.execute(
-            text("SELECT id, name, content IS NULL as content_is_null, LENGTH(content) as content_length FROM artifacts WHERE id = :id"),
+            text("SELECT id, name, content IS NULL as content_is_null, LENGTH(content) as content_length, content_encoding, LENGTH(content_blob) as compressed_length FROM artifacts WHERE id = :id"),
             {"id": artifact_id}
         ).first()
         
@@ -25,6 +25,7 @@ try:
             print(f"Artifact ID {artifact_id} ({result.name}):")
             print(f"  Content is NULL: {result.content_is_null}")
             print(f"  Content length: {result.content_length}")
+            print(f"  Content encoding: {result.content_encoding} (compressed length: {result.compressed_length})")
             
             # Also check via ORM
             artifact = db.query(Artifact).filter(Artifact.id == artifact_id).first()
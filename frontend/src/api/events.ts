@@ -0,0 +1,34 @@
+// Server-pushed game events (Server-Sent Events)
+// The backend publishes a small event whenever game state or votes change,
+// so views can refetch immediately instead of waiting for the next poll.
+const API_BASE_URL = import.meta.env.VITE_API_BASE_URL || '/api'
+
+export interface GameEvent {
+  type: string
+  game_id: number
+  [key: string]: any
+}
+
+export function subscribeToGameEvents(
+  gameIdentifier: string,
+  onEvent: (event: GameEvent) => void
+): () => void {
+  if (typeof EventSource === 'undefined') {
+    return () => {}
+  }
+
+  // EventSource reconnects automatically if the connection drops
+  const source = new EventSource(`${API_BASE_URL}/games/${gameIdentifier}/events`)
+  source.onmessage = (message) => {
+    try {
+      const event: GameEvent = JSON.parse(message.data)
+      if (event.type !== 'connected') {
+        onEvent(event)
+      }
+    } catch (err) {
+      console.error('Failed to parse game event:', err)
+    }
+  }
+
+  return () => source.close()
+}
@@ -0,0 +1,39 @@
+// After Action Report exports
+// Rendering runs in a background job on the server; start it, poll until the
+// file is ready, then download it.
+import apiClient from './client'
+
+export type ExportFormat = 'word' | 'pdf'
+
+interface ExportJob {
+  job_id: string
+  format: ExportFormat
+  status: 'pending' | 'done' | 'failed'
+  error?: string | null
+}
+
+const POLL_INTERVAL_MS = 500
+const MAX_WAIT_MS = 5 * 60 * 1000
+
+export async function exportAfterActionReport(gameId: string, format: ExportFormat): Promise<Blob> {
+  let job: ExportJob = (await apiClient.post(`/games/${gameId}/after-action-report/export/${format}`)).data
+  const started = Date.now()
+
+  while (job.status === 'pending') {
+    if (Date.now() - started > MAX_WAIT_MS) {
+      throw new Error('Timed out waiting for export')
+    }
+    await new Promise((resolve) => setTimeout(resolve, POLL_INTERVAL_MS))
+    job = (await apiClient.get(`/games/${gameId}/after-action-report/export-jobs/${job.job_id}`)).data
+  }
+
+  if (job.status === 'failed') {
+    throw new Error(job.error || 'Export failed')
+  }
+
+  const response = await apiClient.get(
+    `/games/${gameId}/after-action-report/export-jobs/${job.job_id}/download`,
+    { responseType: 'blob' }
+  )
+  return response.data
+}
@@ -0,0 +1,55 @@
+import { useEffect, useState } from 'react'
+import apiClient from '../api/client'
+
+// Artifact bodies keyed by content hash; a hash never changes meaning, so
+// each body is fetched at most once per session
+const contentCache = new Map<string, string>()
+
+interface ArtifactContentProps {
+  artifactId: number
+  contentHash: string
+}
+
+export function artifactContentUrl(artifactId: number, contentHash: string): string {
+  return `/artifacts/content/${artifactId}?v=${contentHash}`
+}
+
+export default function ArtifactContent({ artifactId, contentHash }: ArtifactContentProps) {
+  const [content, setContent] = useState<string | null>(contentCache.get(contentHash) ?? null)
+  const [error, setError] = useState(false)
+
+  useEffect(() => {
+    const cached = contentCache.get(contentHash)
+    if (cached !== undefined) {
+      setContent(cached)
+      return
+    }
+
+    let cancelled = false
+    setContent(null)
+    setError(false)
+    apiClient
+      .get<string>(artifactContentUrl(artifactId, contentHash), { responseType: 'text' })
+      .then((response) => {
+        contentCache.set(contentHash, response.data)
+        if (!cancelled) setContent(response.data)
+      })
+      .catch((err) => {
+        console.error('Failed to load artifact content:', err)
+        if (!cancelled) setError(true)
+      })
+    return () => {
+      cancelled = true
+    }
+  }, [artifactId, contentHash])
+
+  if (error) {
+    return <p className="text-sm text-red-600">Failed to load artifact content</p>
+  }
+
+  return (
+    <pre className="whitespace-pre-wrap text-xs font-mono text-gray-800">
+      {content ?? 'Loading...'}
+    </pre>
+  )
+}
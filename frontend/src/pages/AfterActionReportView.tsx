@@ -1,6 +1,7 @@
 import { useEffect, useState } from 'react'
 import { useParams, useNavigate } from 'react-router-dom'
 import apiClient from '../api/client'
+import { exportAfterActionReport } from '../api/exports'
 
 interface PhaseAnalysis {
   phase_id: number
@@ -131,10 +132,8 @@ export default function AfterActionReportView() {
               <button
                 onClick={async () => {
                   try {
-                    const response = await apiClient.get(`/games/${id}/after-action-report/export/word`, {
-                      responseType: 'blob'
-                    })
-                    const url = window.URL.createObjectURL(new Blob([response.data]))
+                    const blob = await exportAfterActionReport(id!, 'word')
+                    const url = window.URL.createObjectURL(blob)
                     const link = document.createElement('a')
                     link.href = url
                     link.setAttribute('download', `AAR_${report.scenario_name.replace(/[^a-z0-9]/gi, '_')}_${id}_${new Date().toISOString().split('T')[0]}.docx`)
@@ -154,10 +153,8 @@ export default function AfterActionReportView() {
               <button
                 onClick={async () => {
                   try {
-                    const response = await apiClient.get(`/games/${id}/after-action-report/export/pdf`, {
-                      responseType: 'blob'
-                    })
-                    const url = window.URL.createObjectURL(new Blob([response.data]))
+                    const blob = await exportAfterActionReport(id!, 'pdf')
+                    const url = window.URL.createObjectURL(blob)
                     const link = document.createElement('a')
                     link.href = url
                     link.setAttribute('download', `AAR_${report.scenario_name.replace(/[^a-z0-9]/gi, '_')}_${id}_${new Date().toISOString().split('T')[0]}.pdf`)
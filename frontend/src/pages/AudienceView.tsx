@@ -1,6 +1,7 @@
 import { useEffect, useState, useRef } from 'react'
 import { useParams } from 'react-router-dom'
 import apiClient from '../api/client'
+import { subscribeToGameEvents, GameEvent } from '../api/events'
 import { Scoreboard, TeamScore } from '../types'
 
 interface AnimatedScore {
@@ -68,9 +69,20 @@ export default function AudienceView() {
     })
     
     fetchScoreboard()
-    const interval = setInterval(fetchScoreboard, 3000) // Poll every 3 seconds for more real-time feel
+    // Pushed events drive refreshes; slow polling is only a safety net
+    const interval = setInterval(fetchScoreboard, 15000)
+    // Refetch on state transitions and completed votes (a decision was made);
+    // other votes and joins only move the counts and rosters shown
+    const unsubscribe = subscribeToGameEvents(gameIdentifier, (event) => {
+      if (event.type === 'game_state' || (event.type === 'vote' && event.all_voted)) {
+        fetchScoreboard()
+      } else if (event.type === 'vote' || event.type === 'player_joined') {
+        applyTeamEvent(event)
+      }
+    })
     return () => {
       clearInterval(interval)
+      unsubscribe()
       if (phaseTransitionSoundRef.current) {
         phaseTransitionSoundRef.current.pause()
         phaseTransitionSoundRef.current = null
@@ -242,6 +254,35 @@ export default function AudienceView() {
     })
   }, [scoreboard, previousPhase, previousPhaseState])
 
+  const applyTeamEvent = (event: GameEvent) => {
+    setScoreboard(prev => prev && {
+      ...prev,
+      teams: prev.teams.map(team => {
+        if (team.team_id !== event.team_id) return team
+        if (event.type === 'vote') {
+          return team.voting_status ? {
+            ...team,
+            voting_status: {
+              ...team.voting_status,
+              votes_submitted: event.votes_submitted,
+              total_players: event.total_players,
+              all_voted: event.all_voted,
+            },
+          } : team
+        }
+        return {
+          ...team,
+          team_members: event.display_name ? [...team.team_members, event.display_name] : team.team_members,
+          voting_status: team.voting_status && {
+            ...team.voting_status,
+            total_players: team.voting_status.total_players + 1,
+            all_voted: false,
+          },
+        }
+      }),
+    })
+  }
+
   const fetchScoreboard = async () => {
     try {
       const response = await apiClient.get<Scoreboard>(
@@ -1,10 +1,10 @@
 import { useEffect, useState } from 'react'
 import { useNavigate } from 'react-router-dom'
 import apiClient from '../api/client'
-import { Scenario, Game } from '../types'
+import { ScenarioSummary, ScenarioSummaryPage, Game } from '../types'
 
 export default function GMCreateGame() {
-  const [scenarios, setScenarios] = useState<Scenario[]>([])
+  const [scenarios, setScenarios] = useState<ScenarioSummary[]>([])
   const [selectedScenarioId, setSelectedScenarioId] = useState<number | null>(null)
   const [loading, setLoading] = useState(false)
   const navigate = useNavigate()
@@ -15,10 +15,19 @@ export default function GMCreateGame() {
 
   const fetchScenarios = async () => {
     try {
-      const response = await apiClient.get<Scenario[]>('/scenarios')
-      setScenarios(response.data)
-      if (response.data.length > 0) {
-        setSelectedScenarioId(response.data[0].id)
+      // The list is paginated; follow next_cursor until every summary is loaded
+      const allScenarios: ScenarioSummary[] = []
+      let afterId: number | null | undefined = undefined
+      do {
+        const response: { data: ScenarioSummaryPage } = await apiClient.get<ScenarioSummaryPage>('/scenarios/summary', {
+          params: afterId ? { after_id: afterId, limit: 200 } : { limit: 200 },
+        })
+        allScenarios.push(...response.data.items)
+        afterId = response.data.next_cursor
+      } while (afterId)
+      setScenarios(allScenarios)
+      if (allScenarios.length > 0) {
+        setSelectedScenarioId(allScenarios[0].id)
       }
     } catch (err) {
       console.error('Failed to fetch scenarios:', err)
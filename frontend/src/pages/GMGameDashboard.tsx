@@ -1,8 +1,11 @@
-import { useEffect, useState } from 'react'
+import { useEffect, useState, useRef } from 'react'
 import { useParams, useNavigate } from 'react-router-dom'
 import apiClient from '../api/client'
+import { subscribeToGameEvents, GameEvent } from '../api/events'
 import { Game, Decision, VotingStatus } from '../types'
 
+const VOTE_DETAILS_DEBOUNCE_MS = 2000
+
 export default function GMGameDashboard() {
   const { id } = useParams<{ id: string }>()
   const navigate = useNavigate()
@@ -14,6 +17,7 @@ export default function GMGameDashboard() {
   const [phaseComments, setPhaseComments] = useState<any[]>([])
   const [gmNotes, setGmNotes] = useState<Record<number, string>>({})
   const [gmNotesLoading, setGmNotesLoading] = useState<Record<number, boolean>>({})
+  const voteDetailsTimeoutRef = useRef<ReturnType<typeof setTimeout> | null>(null)
 
   useEffect(() => {
     if (!id) return
@@ -34,11 +38,71 @@ export default function GMGameDashboard() {
         fetchDecisions()
         fetchVotingStatus()
         fetchPhaseComments()
-      }, 3000) // Poll every 3 seconds for real-time comments
-      return () => clearInterval(interval)
+      }, 15000) // Pushed events drive refreshes; slow polling is only a safety net
+      // Vote and join counts come from the pushed events; decisions and comments are
+      // refetched when the game state changes or a team has finished voting
+      const unsubscribe = subscribeToGameEvents(id!, (event) => {
+        if (event.type === 'game_state') {
+          fetchGame()
+          refreshPhaseDetails()
+        } else if (event.type === 'vote' && event.all_voted) {
+          refreshPhaseDetails()
+        } else if (event.type === 'vote' || event.type === 'player_joined') {
+          applyTeamEvent(event)
+          if (event.type === 'vote') {
+            scheduleVoteDetailsRefresh()
+          }
+        }
+      })
+      return () => {
+        clearInterval(interval)
+        unsubscribe()
+        if (voteDetailsTimeoutRef.current) {
+          clearTimeout(voteDetailsTimeoutRef.current)
+          voteDetailsTimeoutRef.current = null
+        }
+      }
     }
   }, [game?.current_phase_id])
 
+  const refreshPhaseDetails = () => {
+    if (voteDetailsTimeoutRef.current) {
+      clearTimeout(voteDetailsTimeoutRef.current)
+      voteDetailsTimeoutRef.current = null
+    }
+    fetchDecisions()
+    fetchVotingStatus()
+    fetchPhaseComments()
+  }
+
+  // Individual votes and comments are not in the event payload: fetch them once a
+  // burst of votes has settled rather than once per vote
+  const scheduleVoteDetailsRefresh = () => {
+    if (voteDetailsTimeoutRef.current) {
+      clearTimeout(voteDetailsTimeoutRef.current)
+    }
+    voteDetailsTimeoutRef.current = setTimeout(() => {
+      voteDetailsTimeoutRef.current = null
+      fetchVotingStatus()
+      fetchPhaseComments()
+    }, VOTE_DETAILS_DEBOUNCE_MS)
+  }
+
+  const applyTeamEvent = (event: GameEvent) => {
+    setVotingStatus(prev => prev.map(status => {
+      if (status.team_id !== event.team_id) return status
+      if (event.type === 'vote') {
+        return {
+          ...status,
+          votes_submitted: event.votes_submitted,
+          total_players: event.total_players,
+          all_voted: event.all_voted,
+        }
+      }
+      return { ...status, total_players: status.total_players + 1, all_voted: false }
+    }))
+  }
+
   const fetchGame = async () => {
     try {
       const response = await apiClient.get<Game>(`/games/${id}`)
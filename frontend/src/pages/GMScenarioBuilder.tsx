@@ -565,16 +565,48 @@ function PhaseEditor({
   onCancel: () => void
   onDelete: () => void
 }) {
-  const [redActions, setRedActions] = useState(phase.available_actions?.red || [])
-  const [blueActions, setBlueActions] = useState(phase.available_actions?.blue || [])
+  // Weights are matched on the normalized action name, as when scoring (app.scoring.normalize_action)
+  const normalizeAction = (name: string) => name.trim().toLowerCase()
+
+  const withPoints = (
+    actions: Array<{ name: string; description: string }> | undefined,
+    scores: Record<string, number> | undefined
+  ): EditableAction[] => {
+    const normalizedScores: Record<string, number> = {}
+    Object.entries(scores || {}).forEach(([name, points]) => {
+      normalizedScores[normalizeAction(name)] = points
+    })
+    return (actions || []).map(action => ({ ...action, points: normalizedScores[normalizeAction(action.name)] }))
+  }
+
+  const [redActions, setRedActions] = useState(withPoints(phase.available_actions?.red, phase.action_scores?.red))
+  const [blueActions, setBlueActions] = useState(withPoints(phase.available_actions?.blue, phase.action_scores?.blue))
   const [gmQuestions, setGmQuestions] = useState(phase.gm_prompt_questions || ['', ''])
 
+  const toScores = (actions: EditableAction[]): Record<string, number> => {
+    const scores: Record<string, number> = {}
+    actions.forEach(action => {
+      if (action.name.trim() && action.points !== undefined) {
+        scores[normalizeAction(action.name)] = action.points
+      }
+    })
+    return scores
+  }
+
   const handleSave = () => {
+    // Roles without any points are left out so the built-in scoring matrix still applies
+    const actionScores: NonNullable<ScenarioPhaseCreate['action_scores']> = {}
+    const redScores = toScores(redActions)
+    const blueScores = toScores(blueActions)
+    if (Object.keys(redScores).length > 0) actionScores.red = redScores
+    if (Object.keys(blueScores).length > 0) actionScores.blue = blueScores
+
     onUpdate({
       available_actions: {
-        red: redActions,
-        blue: blueActions
+        red: redActions.map(({ name, description }) => ({ name, description })),
+        blue: blueActions.map(({ name, description }) => ({ name, description }))
       },
+      action_scores: actionScores,
       gm_prompt_questions: gmQuestions.filter(q => q.trim() !== '')
     })
     onSave()
@@ -695,19 +727,26 @@ function PhaseEditor({
   )
 }
 
+// Action being edited, with its scoring weight (0-10, used for auto-scoring)
+interface EditableAction {
+  name: string
+  description: string
+  points?: number
+}
+
 // Action List Editor Component
 function ActionListEditor({
   actions,
   onChange
 }: {
-  actions: Array<{ name: string; description: string }>
-  onChange: (actions: Array<{ name: string; description: string }>) => void
+  actions: EditableAction[]
+  onChange: (actions: EditableAction[]) => void
 }) {
   const handleAdd = () => {
     onChange([...actions, { name: '', description: '' }])
   }
 
-  const handleUpdate = (index: number, updates: Partial<{ name: string; description: string }>) => {
+  const handleUpdate = (index: number, updates: Partial<EditableAction>) => {
     const updated = [...actions]
     updated[index] = { ...updated[index], ...updates }
     onChange(updated)
@@ -735,6 +774,15 @@ function ActionListEditor({
             className="w-full px-2 py-1 border border-gray-300 rounded text-sm"
             rows={2}
           />
+          <input
+            type="number"
+            min={0}
+            max={10}
+            value={action.points ?? ''}
+            onChange={(e) => handleUpdate(index, { points: e.target.value === '' ? undefined : parseInt(e.target.value) })}
+            placeholder="Points (0-10)"
+            className="w-full px-2 py-1 border border-gray-300 rounded mt-1 text-sm"
+          />
           <button
             onClick={() => handleDelete(index)}
             className="mt-1 text-xs text-red-600 hover:text-red-800"
@@ -1,8 +1,10 @@
 import { useEffect, useState, useRef } from 'react'
 import { useParams, useNavigate } from 'react-router-dom'
 import apiClient from '../api/client'
+import { subscribeToGameEvents, GameEvent } from '../api/events'
 import { PlayerState } from '../types'
 import PlayerReportCardView from './PlayerReportCard'
+import ArtifactContent, { artifactContentUrl } from '../components/ArtifactContent'
 
 interface ActionInfo {
   name: string
@@ -68,10 +70,29 @@ export default function PlayerView() {
   useEffect(() => {
     if (!gameId || !playerId) return
     fetchState()
-    const interval = setInterval(fetchState, 8000) // Poll every 8 seconds
-    return () => clearInterval(interval)
+    // Pushed events drive refreshes; slow polling is only a safety net
+    const interval = setInterval(fetchState, 30000)
+    // Every player receives every event: only a state transition needs a refetch,
+    // votes and joins just move our team's counts (other teams' are ignored)
+    const unsubscribe = subscribeToGameEvents(gameId, (event) => {
+      if (event.type === 'game_state') {
+        fetchState()
+      } else if (event.type === 'vote' || event.type === 'player_joined') {
+        applyTeamEvent(event)
+      }
+    })
+    return () => {
+      clearInterval(interval)
+      unsubscribe()
+    }
   }, [gameId, playerId])
 
+  // Latest state for the event handler, which is set up once per player
+  const stateRef = useRef<PlayerState | null>(null)
+  useEffect(() => {
+    stateRef.current = state
+  }, [state])
+
   // Track previous phase ID to detect phase changes
   const prevPhaseIdRef = useRef<number | null>(null)
   const prevHasVotedRef = useRef<boolean>(false)
@@ -143,6 +164,27 @@ export default function PlayerView() {
     }
   }
 
+  const applyTeamEvent = (event: GameEvent) => {
+    const teamStatus = stateRef.current?.team_voting_status
+    if (!teamStatus || teamStatus.team_id !== event.team_id) return
+    if (event.type === 'vote') {
+      if (event.phase_id !== stateRef.current?.current_phase?.id) return
+      if (event.all_voted) {
+        // Team complete: its decision has been aggregated, so fetch it
+        fetchState()
+        return
+      }
+    }
+    // Teammates' individual votes show up with the next fetch
+    setState(prev => {
+      if (!prev?.team_voting_status) return prev
+      const counts = event.type === 'vote'
+        ? { votes_submitted: event.votes_submitted, total_players: event.total_players, all_voted: event.all_voted }
+        : { total_players: prev.team_voting_status.total_players + 1, all_voted: false }
+      return { ...prev, team_voting_status: { ...prev.team_voting_status, ...counts } }
+    })
+  }
+
   const handleSubmit = async () => {
     if (!gameId || !playerId || !state?.current_phase) return
     if (!selectedAction) {
@@ -253,15 +295,13 @@ export default function PlayerView() {
                       <p className="text-sm text-gray-600 mb-3">{artifact.description}</p>
                     )}
                     {/* Display content from database if available (preferred) */}
-                    {artifact.content ? (
+                    {artifact.content_hash ? (
                       <div className="mt-3">
                         <div className="bg-gray-50 border border-gray-200 rounded-md p-4 max-h-96 overflow-y-auto">
-                          <pre className="whitespace-pre-wrap text-xs font-mono text-gray-800">
-                            {artifact.content}
-                          </pre>
+                          <ArtifactContent artifactId={artifact.id} contentHash={artifact.content_hash} />
                         </div>
                         <a
-                          href={`${window.location.origin}/api/artifacts/content/${artifact.id}`}
+                          href={`${window.location.origin}/api${artifactContentUrl(artifact.id, artifact.content_hash)}`}
                           target="_blank"
                           rel="noopener noreferrer"
                           className="text-blue-600 hover:text-blue-800 text-sm mt-2 inline-flex items-center"
@@ -12,6 +12,20 @@ export interface Scenario {
   phases: ScenarioPhase[]
 }
 
+export interface ScenarioSummary {
+  id: number
+  name: string
+  description?: string
+  created_at?: string
+  phase_count: number
+  artifact_count: number
+}
+
+export interface ScenarioSummaryPage {
+  items: ScenarioSummary[]
+  next_cursor?: number | null
+}
+
 export interface ScenarioPhase {
   id: number
   scenario_id: number
@@ -27,6 +41,10 @@ export interface ScenarioPhase {
     red?: Array<{ name: string; description: string }>
     blue?: Array<{ name: string; description: string }>
   }
+  action_scores?: {
+    red?: Record<string, number>
+    blue?: Record<string, number>
+  }  // Scoring weights per action (0-10)
   gm_prompt_questions?: string[]  // List of 2 prompt questions for GM
 }
 
@@ -41,6 +59,17 @@ export interface Artifact {
   notes_for_gm?: string
 }
 
+// Artifact as sent to players: metadata only, body fetched by content hash
+export interface PlayerArtifact {
+  id: number
+  name: string
+  type: string
+  description?: string
+  file_url?: string
+  embed_url?: string
+  content_hash?: string | null
+}
+
 export type ArtifactType = 'log_snippet' | 'screenshot' | 'email' | 'tool_output' | 'intel_report'
 
 export interface ArtifactCreate {
@@ -71,6 +100,10 @@ export interface ScenarioPhaseCreate {
     red?: Array<{ name: string; description: string }>
     blue?: Array<{ name: string; description: string }>
   }
+  action_scores?: {
+    red?: Record<string, number>
+    blue?: Record<string, number>
+  }
   gm_prompt_questions?: string[]
   artifacts: PhaseArtifactLink[]
 }
@@ -160,6 +193,7 @@ export interface VotingStatus {
   total_players: number
   votes_submitted: number
   votes: PlayerVote[]
+  vote_counts: Record<string, number>
   all_voted: boolean
 }
 
@@ -168,7 +202,7 @@ export interface PlayerState {
   phase_state: string
   phase_briefing_text?: string
   team_objective?: string
-  artifacts: Artifact[]
+  artifacts: PlayerArtifact[]
   decision?: Decision
   game_status: string
   team_role?: string